@@ -0,0 +1,382 @@
+"""Fleet scale benchmark of input parsing, synth and plan validation
+
+Generates a fleet of synthetic inputs (parameter groups of --parameters
+parameters, replicas, event notifications and enhanced monitoring) and
+measures, for each fleet size, parse_model, the Stack construction,
+app.synth() and RDSPlanValidator.validate(). The validator talks to a
+canned AWS API: botocore still validates and paginates every call, only the
+HTTP request is answered in process.
+
+The results are compared with benchmarks/fleet_baseline.json, --save
+replaces it. Compare runs of the same machine, the baseline is not portable.
+
+    python -m benchmarks.fleet [--databases 1 100 1000] [--parameters 10 500]
+        [--backend jsii|native] [--tolerance 1.25] [--save]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from external_resources_io.input import parse_model
+from external_resources_io.terraform import TerraformJsonPlanParser
+from validate_plan import AWSApi, RDSPlanValidator
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.lookup_cache import LookupCache
+
+BASELINE_FILE = Path(__file__).parent / "fleet_baseline.json"
+REGION = "us-east-1"
+METRICS = ("parse_ms", "stack_ms", "synth_ms", "validate_ms")
+# Items per page of the canned describe_db_parameter_groups
+PAGE_SIZE = 100
+
+
+def generate_input(i: int, parameters: int) -> dict[str, Any]:
+    """Input of the i-th database of the fleet
+
+    One in four databases is a replica of the previous one, one in three has
+    event notifications and one in two enhanced monitoring.
+    """
+    identifier = f"fleet-db-{i}"
+    data: dict[str, Any] = {
+        "identifier": identifier,
+        "engine": "postgres",
+        "engine_version": "15.4",
+        "allow_major_version_upgrade": True,
+        "name": "postgres",
+        "username": "postgres",
+        "instance_class": "db.t4g.micro",
+        "allocated_storage": 20,
+        "backup_retention_period": 7,
+        "storage_type": "gp3",
+        "region": REGION,
+        "output_resource_name": f"{identifier}-credentials",
+        "output_prefix": identifier,
+        "ca_cert": {"path": "app-interface/global/rds-ca-cert", "field": REGION},
+        "parameter_group": {
+            "name": f"{identifier}-pg",
+            "family": "postgres15",
+            "parameters": [
+                {"name": f"param_{p}", "value": str(p), "apply_method": "immediate"}
+                for p in range(parameters)
+            ],
+        },
+        "tags": {"app": "fleet", "environment": "benchmark", "db": identifier},
+        "default_tags": [{"tags": {"app": "fleet"}}],
+    }
+    if i % 4 == 1:
+        data["replica_source"] = {"region": REGION, "identifier": f"fleet-db-{i - 1}"}
+    if i % 3 == 0:
+        data["event_notifications"] = [
+            {"destination": "rds-events", "event_categories": ["failure"]},
+            {"destination": "rds-maintenance", "event_categories": ["maintenance"]},
+        ]
+    if i % 2 == 0:
+        data["enhanced_monitoring"] = True
+        data["monitoring_interval"] = 60
+    return {
+        "data": data,
+        "provision": {
+            "provision_provider": "aws",
+            "provisioner": "fleet-account",
+            "provider": "rds",
+            "identifier": identifier,
+            "target_cluster": "fleet-cluster",
+            "target_namespace": "fleet",
+            "target_secret_name": f"{identifier}-credentials",
+            "module_provision_data": {
+                "tf_state_bucket": "fleet-terraform-state",
+                "tf_state_region": REGION,
+                "tf_state_dynamodb_table": "fleet-terraform-lock",
+                "tf_state_key": f"aws/fleet-account/rds/{identifier}/terraform.tfstate",
+            },
+        },
+    }
+
+
+def generate_plan(i: int) -> dict[str, Any]:
+    """Plan of a minor upgrade of the i-th database
+
+    Even databases update their parameter group in the same plan, the odd
+    ones keep it and the validator looks it up in the region inventory.
+    """
+    identifier = f"fleet-db-{i}"
+    before = {
+        "engine": "postgres",
+        "engine_version": "15.4",
+        "parameter_group_name": f"{identifier}-pg",
+    }
+    changes: list[dict[str, Any]] = [
+        {
+            "address": f"aws_db_instance.{identifier}",
+            "type": "aws_db_instance",
+            "name": identifier,
+            "change": {
+                "actions": ["update"],
+                "before": before,
+                "after": {**before, "engine_version": "15.7"},
+                "after_unknown": {},
+            },
+        }
+    ]
+    if i % 2 == 0:
+        group = {"name": f"{identifier}-pg", "family": "postgres15"}
+        changes.append({
+            "address": f"aws_db_parameter_group.{identifier}-pg",
+            "type": "aws_db_parameter_group",
+            "name": f"{identifier}-pg",
+            "change": {
+                "actions": ["update"],
+                "before": group,
+                "after": group,
+                "after_unknown": {},
+            },
+        })
+    return {"resource_changes": changes}
+
+
+class CannedRDS:
+    """Answers the RDS calls of the plan validator for a fleet of databases"""
+
+    def __init__(self, databases: int) -> None:
+        self.groups = [
+            {
+                "DBParameterGroupName": f"fleet-db-{i}-pg",
+                "DBParameterGroupFamily": "postgres15",
+            }
+            for i in range(databases)
+        ]
+        self.calls = 0
+
+    def respond(self, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+        """The response of operation"""
+        self.calls += 1
+        if operation == "DescribeDBEngineVersions":
+            return {
+                "DBEngineVersions": [
+                    {
+                        "Engine": params["Engine"],
+                        "EngineVersion": params["EngineVersion"],
+                        "ValidUpgradeTarget": [
+                            {"EngineVersion": v}
+                            for v in ("15.5", "15.6", "15.7", "16.3")
+                        ],
+                    }
+                ]
+            }
+        if operation == "DescribeDBParameterGroups":
+            start = int(params.get("Marker", 0))
+            page: dict[str, Any] = {
+                "DBParameterGroups": self.groups[start : start + PAGE_SIZE]
+            }
+            if start + PAGE_SIZE < len(self.groups):
+                page["Marker"] = str(start + PAGE_SIZE)
+            return page
+        msg = f"No canned response for {operation}"
+        raise NotImplementedError(msg)
+
+    def install(self, registry: ClientRegistry) -> None:
+        """Answers the calls of the RDS client of registry"""
+        from botocore.awsrequest import AWSResponse  # noqa: PLC0415
+
+        def before_call(
+            model: Any,  # noqa: ANN401
+            params: dict[str, Any],
+            **_: Any,  # noqa: ANN401
+        ) -> tuple[AWSResponse, dict[str, Any]]:
+            # The serialized query body carries the call parameters
+            return AWSResponse(None, 200, {}, None), self.respond(
+                model.name, params["body"]
+            )
+
+        registry.rds(REGION).meta.events.register("before-call.rds.*", before_call)
+
+
+@dataclass
+class FleetResult:
+    """Timings of a fleet size"""
+
+    databases: int
+    parameters: int
+    backend: str
+    parse_ms: float
+    stack_ms: float
+    synth_ms: float
+    validate_ms: float
+    aws_calls: int
+
+    @property
+    def key(self) -> str:
+        """Baseline key of the result"""
+        return f"{self.backend}/{self.databases}x{self.parameters}"
+
+
+class _Timer:
+    def __init__(self) -> None:
+        self.ms = 0.0
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ms += (time.perf_counter() - start) * 1000
+
+
+def _synth_jsii(
+    ai_input: AppInterfaceInput, outdir: str, stack: _Timer, synth: _Timer
+) -> None:
+    from er_aws_rds.app import init_cdktf_app  # noqa: PLC0415
+
+    with stack.measure():
+        app = init_cdktf_app(ai_input, outdir=outdir)
+    with synth.measure():
+        app.synth()
+
+
+def _synth_native(
+    ai_input: AppInterfaceInput, _: str, stack: _Timer, synth: _Timer
+) -> None:
+    from er_aws_rds.native import build_stacks, stable_stringify  # noqa: PLC0415
+
+    with stack.measure():
+        stacks = build_stacks(ai_input)
+    with synth.measure():
+        for s in stacks:
+            stable_stringify(s.to_terraform())
+
+
+SYNTH: dict[str, Callable[[AppInterfaceInput, str, _Timer, _Timer], None]] = {
+    "jsii": _synth_jsii,
+    "native": _synth_native,
+}
+
+
+def run(databases: int, parameters: int, backend: str = "jsii") -> FleetResult:
+    """Parses, synthesizes and validates a fleet of databases"""
+    raw = [generate_input(i, parameters) for i in range(databases)]
+    parse, stack, synth, validate = _Timer(), _Timer(), _Timer(), _Timer()
+    with parse.measure():
+        inputs = [parse_model(AppInterfaceInput, data) for data in raw]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The cdktf import and jsii startup are benchmarks.startup business
+        SYNTH[backend](
+            parse_model(AppInterfaceInput, generate_input(0, 1)),
+            str(Path(tmp, "warm-up")),
+            _Timer(),
+            _Timer(),
+        )
+        for i, ai_input in enumerate(inputs):
+            SYNTH[backend](
+                ai_input.model_copy(deep=True), str(Path(tmp, str(i))), stack, synth
+            )
+
+        canned = CannedRDS(databases)
+        registry = ClientRegistry()
+        canned.install(registry)
+        # One API and cache for the fleet, as validate_plans shares them
+        api = AWSApi(
+            config_options={"region_name": REGION},
+            registry=registry,
+            cache=LookupCache(),
+        )
+        for i, ai_input in enumerate(inputs):
+            plan_path = Path(tmp, f"plan-{i}.json")
+            plan_path.write_text(json.dumps(generate_plan(i)), encoding="utf-8")
+            validator = RDSPlanValidator(
+                TerraformJsonPlanParser(str(plan_path)), ai_input, aws_api=api
+            )
+            with validate.measure():
+                validator.validate()
+            if validator.errors:
+                msg = f"Unexpected plan errors: {validator.errors}"
+                raise RuntimeError(msg)
+
+    return FleetResult(
+        databases=databases,
+        parameters=parameters,
+        backend=backend,
+        parse_ms=round(parse.ms, 1),
+        stack_ms=round(stack.ms, 1),
+        synth_ms=round(synth.ms, 1),
+        validate_ms=round(validate.ms, 1),
+        aws_calls=canned.calls,
+    )
+
+
+def compare(
+    results: Sequence[FleetResult], baseline: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Metrics slower than tolerance times their baseline"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result.key)
+        if not base:
+            continue
+        for metric in METRICS:
+            current, previous = getattr(result, metric), base[metric]
+            if previous and current > previous * tolerance:
+                regressions.append(
+                    f"{result.key} {metric}: {current}ms, baseline {previous}ms"
+                )
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Prints a JSON report, fails on regressions against the baseline"""
+    parser = argparse.ArgumentParser(prog="benchmarks.fleet")
+    parser.add_argument("--databases", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--parameters", type=int, nargs="+", default=[10, 500])
+    parser.add_argument("--backend", choices=sorted(SYNTH), default="jsii")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="Slowdown against the baseline reported as a regression",
+    )
+    parser.add_argument("--save", action="store_true", help="Update the baseline")
+    args = parser.parse_args(argv)
+
+    results = [
+        run(databases, parameters, args.backend)
+        for databases in args.databases
+        for parameters in args.parameters
+    ]
+    baseline = (
+        json.loads(args.baseline.read_text(encoding="utf-8"))
+        if args.baseline.exists()
+        else {}
+    )
+    regressions = compare(results, baseline, args.tolerance)
+    print(  # noqa: T201
+        json.dumps(
+            {
+                "results": [asdict(r) for r in results],
+                "regressions": regressions,
+            },
+            indent=2,
+        )
+    )
+    if args.save:
+        baseline.update({r.key: asdict(r) for r in results})
+        args.baseline.write_text(
+            json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Time and memory benchmark of the Terraform plan parsers
+
+Generates a synthetic plan with many resource changes and a large
+prior_state/planned_values, then parses it with TerraformJsonPlanParser and
+StreamingPlanParser, each in a fresh interpreter so the peak RSS of one does
+not hide the other. The plan is generated in a child process too, the peak
+RSS of a process survives the fork and exec of its children.
+
+    python -m benchmarks.plan_parsing [--resources N] [--plan PATH]
+"""
+
+import argparse
+import json
+import subprocess  # noqa: S404
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).parents[1]
+
+PARSERS = {
+    "full": (
+        "from external_resources_io.terraform import TerraformJsonPlanParser\n"
+        "plan = TerraformJsonPlanParser(sys.argv[1]).plan\n"
+        "changes = [c for c in plan.resource_changes if c.type == 'aws_db_instance']\n"
+    ),
+    "streaming": (
+        "from er_aws_rds.plan import StreamingPlanParser\n"
+        "plan = StreamingPlanParser(sys.argv[1], types={'aws_db_instance'}).plan\n"
+        "changes = plan.resource_changes\n"
+    ),
+}
+
+
+def _values(i: int) -> dict[str, Any]:
+    return {
+        "identifier": f"db-{i}",
+        "engine": "postgres",
+        "engine_version": "15.7",
+        "instance_class": "db.t4g.micro",
+        "allocated_storage": 20,
+        "tags": {f"tag-{t}": f"value-{i}-{t}" for t in range(8)},
+        "parameters": [{"name": f"param_{p}", "value": str(p)} for p in range(16)],
+    }
+
+
+def generate_plan(path: Path, resources: int) -> None:
+    """Writes a plan with resources changes, one in ten an aws_db_instance"""
+    changes = []
+    state = []
+    for i in range(resources):
+        type_ = "aws_db_instance" if i % 10 == 0 else "aws_db_parameter_group"
+        values = _values(i)
+        changes.append({
+            "address": f"{type_}.r{i}",
+            "type": type_,
+            "name": f"r{i}",
+            "change": {
+                "actions": ["update"],
+                "before": values,
+                "after": {**values, "engine_version": "16.3"},
+                "after_unknown": {},
+            },
+        })
+        state.append({"address": f"{type_}.r{i}", "type": type_, "values": values})
+    path.write_text(
+        json.dumps({
+            "format_version": "1.2",
+            "prior_state": {"values": {"root_module": {"resources": state}}},
+            "planned_values": {"root_module": {"resources": state}},
+            "resource_changes": changes,
+        }),
+        encoding="utf-8",
+    )
+
+
+def _run(code: str, *args: str) -> str:
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def measure(parser: str, plan_path: Path) -> dict[str, Any]:
+    """Parse time and peak RSS of parser in a fresh interpreter"""
+    code = (
+        "import resource, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{PARSERS[parser]}"
+        "print(len(changes), (time.perf_counter() - start) * 1000,"
+        " resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    changes, parse_ms, peak_kib = _run(code, str(plan_path)).split()
+    return {
+        "parser": parser,
+        "changes": int(changes),
+        "parse_ms": round(float(parse_ms), 1),
+        "peak_rss_mib": round(int(peak_kib) / 1024, 1),
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Prints a JSON report of both parsers"""
+    parser = argparse.ArgumentParser(prog="benchmarks.plan_parsing")
+    parser.add_argument("--resources", type=int, default=20000)
+    parser.add_argument(
+        "--plan", type=Path, help="Plan file instead of a synthetic one"
+    )
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        plan_path = args.plan
+        if not plan_path:
+            plan_path = Path(tmp) / "plan.json"
+            start = time.perf_counter()
+            _run(
+                "import sys\n"
+                "from pathlib import Path\n"
+                "from benchmarks.plan_parsing import generate_plan\n"
+                "generate_plan(Path(sys.argv[1]), int(sys.argv[2]))\n",
+                str(plan_path),
+                str(args.resources),
+            )
+            generate_ms = (time.perf_counter() - start) * 1000
+        results = [measure(name, plan_path) for name in PARSERS]
+        report = {
+            "plan_mib": round(plan_path.stat().st_size / 2**20, 1),
+            "generate_ms": None if args.plan else round(generate_ms, 1),
+            "results": results,
+        }
+    print(json.dumps(report, indent=2))  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
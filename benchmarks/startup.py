@@ -0,0 +1,112 @@
+"""Import time benchmark of the entry points
+
+Imports every module listed in startup_budget.json in a fresh interpreter with
+`python -X importtime` and fails when it exceeds its budget or loads one of its
+forbidden modules (e.g. cdktf on the input parsing path).
+
+    python -m benchmarks.startup [--runs N] [--factor F]
+"""
+
+import argparse
+import json
+import subprocess  # noqa: S404
+import sys
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+BUDGET_FILE = Path(__file__).parent / "startup_budget.json"
+
+
+@dataclass
+class StartupResult:
+    """Import time of an entry point against its budget"""
+
+    module: str
+    import_ms: float
+    wall_ms: float
+    budget_ms: float
+    forbidden_loaded: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """Within budget and without forbidden imports"""
+        return self.import_ms <= self.budget_ms and not self.forbidden_loaded
+
+
+def import_profile(module: str) -> tuple[float, float, set[str]]:
+    """Cumulative import ms of module, process wall ms and every module loaded"""
+    start = time.perf_counter()
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    loaded: set[str] = set()
+    import_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        loaded.add(name.strip())
+        if name.strip() == module:
+            import_us = int(cumulative)
+    return import_us / 1000, wall_ms, loaded
+
+
+def measure(
+    module: str, budget_ms: float, forbidden: Sequence[str], runs: int = 3
+) -> StartupResult:
+    """Best of runs import time of module"""
+    profiles = [import_profile(module) for _ in range(runs)]
+    import_ms = min(p[0] for p in profiles)
+    wall_ms = min(p[1] for p in profiles)
+    loaded = set.union(*(p[2] for p in profiles))
+    return StartupResult(
+        module=module,
+        import_ms=round(import_ms, 1),
+        wall_ms=round(wall_ms, 1),
+        budget_ms=budget_ms,
+        forbidden_loaded=sorted(
+            name
+            for name in loaded
+            if any(name == f or name.startswith(f + ".") for f in forbidden)
+        ),
+    )
+
+
+def run(runs: int = 3, factor: float = 1.0) -> list[StartupResult]:
+    """Measures every entry point of the budget file"""
+    budget = json.loads(BUDGET_FILE.read_text())
+    return [
+        measure(module, spec["max_ms"] * factor, spec["forbidden"], runs=runs)
+        for module, spec in budget.items()
+    ]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Prints a JSON report, exits 1 if any entry point is over budget"""
+    parser = argparse.ArgumentParser(prog="benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--factor",
+        type=float,
+        default=1.0,
+        help="Budget multiplier for slow machines",
+    )
+    args = parser.parse_args(argv)
+    results = run(runs=args.runs, factor=args.factor)
+    report = [{**asdict(r), "ok": r.ok} for r in results]
+    print(json.dumps(report, indent=2))  # noqa: T201
+    return 0 if all(r.ok for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,259 @@
+import argparse
+import json
 import os
+import sys
+from collections.abc import Sequence
+from pathlib import Path
 
-from cdktf import App
-from external_resources_io.input import parse_model, read_input_from_file
+from er_aws_rds.app import BACKENDS, get_ai_input, synth
+from er_aws_rds.cache import SynthCache, synth_cache_from_env
 
-from er_aws_rds.input import AppInterfaceInput
-from er_aws_rds.rds import Stack
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parses the command line arguments"""
+    parser = argparse.ArgumentParser(prog="er_aws_rds")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the synth cache enabled with ER_SYNTH_CACHE_DIR",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=None,
+        help="Synth backend (default: $ER_SYNTH_BACKEND or jsii)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser(
+        "batch", help="Synthesize many inputs in a single process"
+    )
+    batch.add_argument(
+        "source",
+        help='Directory with JSON inputs, a JSONL file or "-" to read JSONL from stdin',
+    )
+    batch.add_argument(
+        "--outdir",
+        required=True,
+        help="Base output directory. Every input is written to <outdir>/<identifier>",
+    )
+
+    worker = subparsers.add_parser(
+        "worker", help="Run a warm synth worker (JSON lines on stdio or a Unix socket)"
+    )
+    worker.add_argument("--socket", help="Listen on this Unix socket instead of stdio")
+    worker.add_argument(
+        "--max-jobs",
+        type=int,
+        default=None,
+        help="Recycle the worker after this number of synth jobs",
+    )
+
+    validate = subparsers.add_parser(
+        "validate-input",
+        help="Validate inputs without synthesizing them. Reports JSON errors",
+    )
+    validate.add_argument(
+        "sources", nargs="+", help="Input JSON files or directories of them"
+    )
+    validate.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Size of the validation process pool (default: number of CPUs)",
+    )
+
+    graph = subparsers.add_parser(
+        "upgrade-graph",
+        help="Build the offline engine upgrade graph used by validate_plan.py",
+    )
+    graph.add_argument("--output", required=True, help="Graph file to write")
+    graph.add_argument(
+        "--dump",
+        action="append",
+        default=[],
+        help="Output of `aws rds describe-db-engine-versions --include-all` to build from (repeatable)",
+    )
+    graph.add_argument("--region", help="Build from the API of this region")
+    graph.add_argument(
+        "--engine",
+        action="append",
+        default=[],
+        help="Engine to fetch from the API (repeatable)",
+    )
+    graph.add_argument("--partition", default="aws")
+
+    preflight = subparsers.add_parser(
+        "preflight",
+        help="Check the replica sources and snapshots of inputs exist. Reports JSON issues",
+    )
+    preflight.add_argument(
+        "sources", nargs="+", help="Input JSON files or directories of them"
+    )
+    preflight.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Regions looked up concurrently",
+    )
+
+    cleanup = subparsers.add_parser(
+        "cleanup",
+        help="Find the resources no database uses any more. Reports JSON",
+    )
+    cleanup.add_argument(
+        "sources",
+        nargs="+",
+        help="Every input JSON file of the account, or directories of them",
+    )
+    cleanup.add_argument(
+        "--region",
+        action="append",
+        default=[],
+        help="Also look in this region, e.g. one of deleted databases only (repeatable)",
+    )
+    cleanup.add_argument(
+        "--delete", action="store_true", help="Delete the retired resources"
+    )
+    return parser.parse_args(argv)
+
+
+def get_cache(args: argparse.Namespace) -> SynthCache | None:
+    """The synth cache, unless bypassed"""
+    return None if args.no_cache else synth_cache_from_env()
 
 
-def get_ai_input() -> AppInterfaceInput:
-    """Get the AppInterfaceInput from the input file."""
-    return parse_model(
-        AppInterfaceInput,
-        read_input_from_file(
-            file_path=os.environ.get("ER_INPUT_FILE", "/inputs/input.json"),
-        ),
+def batch(args: argparse.Namespace) -> int:
+    """Batch synth entry point"""
+    from er_aws_rds.batch import report, synth_batch  # noqa: PLC0415
+
+    results = synth_batch(
+        args.source, args.outdir, cache=get_cache(args), backend=args.backend
     )
+    summary = report(results)
+    print(json.dumps(summary, indent=2))  # noqa: T201
+    return 1 if summary["failed"] else 0
+
+
+def worker(args: argparse.Namespace) -> int:
+    """Warm synth worker entry point"""
+    from er_aws_rds.worker import serve_socket, serve_stdio  # noqa: PLC0415
+
+    cache = get_cache(args)
+    if args.socket:
+        serve_socket(
+            args.socket, max_jobs=args.max_jobs, cache=cache, backend=args.backend
+        )
+        return 0
+    return serve_stdio(max_jobs=args.max_jobs, cache=cache, backend=args.backend)
+
+
+def validate_input(args: argparse.Namespace) -> int:
+    """Input validation entry point"""
+    from er_aws_rds.validate_input import report, validate_inputs  # noqa: PLC0415
+
+    summary = report(validate_inputs(args.sources, workers=args.workers))
+    print(json.dumps(summary, indent=2))  # noqa: T201
+    return 1 if summary["invalid"] else 0
+
+
+def upgrade_graph(args: argparse.Namespace) -> int:
+    """Upgrade graph build entry point"""
+    from er_aws_rds.upgrade_graph import UpgradeGraph  # noqa: PLC0415
 
+    if args.dump:
+        items = [
+            item
+            for dump in args.dump
+            for item in json.loads(Path(dump).read_text(encoding="utf-8"))[
+                "DBEngineVersions"
+            ]
+        ]
+        graph = UpgradeGraph.from_engine_versions(
+            items, partition=args.partition, region=args.region
+        )
+    elif args.region and args.engine:
+        from er_aws_rds.aws import default_registry  # noqa: PLC0415
 
-def init_cdktf_app(ai_input: AppInterfaceInput, id_: str = "CDKTF") -> App:
-    """Initialize the CDKTF app and all the stacks."""
-    app = App(outdir=os.environ.get("ER_OUTDIR", None))
-    Stack(app, id_, ai_input)
-    return app
+        graph = UpgradeGraph.from_api(
+            default_registry().rds(args.region), args.engine, partition=args.partition
+        )
+    else:
+        print("Either --dump or --region and --engine are required", file=sys.stderr)  # noqa: T201
+        return 2
+    graph.dump(args.output)
+    return 0
 
 
-def main() -> None:
+def preflight(args: argparse.Namespace) -> int:
+    """Pre-flight lookup entry point"""
+    from er_aws_rds.preflight import (  # noqa: PLC0415
+        check_references,
+        load_references,
+        report,
+    )
+    from er_aws_rds.validate_input import expand_sources  # noqa: PLC0415
+
+    refs, issues = load_references(expand_sources(args.sources))
+    issues += check_references(refs, workers=args.workers)
+    print(json.dumps(report(refs, issues), indent=2))  # noqa: T201
+    return 1 if issues else 0
+
+
+def cleanup(args: argparse.Namespace) -> int:
+    """Retired resources cleanup entry point"""
+    from external_resources_io.input import (  # noqa: PLC0415
+        parse_model,
+        read_input_from_file,
+    )
+
+    from er_aws_rds.cleanup import (  # noqa: PLC0415
+        delete_resources,
+        report,
+        retired_resources,
+    )
+    from er_aws_rds.input import AppInterfaceInput  # noqa: PLC0415
+    from er_aws_rds.validate_input import expand_sources  # noqa: PLC0415
+
+    # Every input must parse, a missing one would retire the resources it wants
+    inputs = [
+        parse_model(AppInterfaceInput, read_input_from_file(source)).data
+        for source in expand_sources(args.sources)
+    ]
+    retired = retired_resources(inputs, regions=args.region)
+    errors = delete_resources(retired) if args.delete else []
+    print(json.dumps(report(retired, errors, deleted=args.delete), indent=2))  # noqa: T201
+    return 1 if errors else 0
+
+
+def main(argv: Sequence[str] | None = None) -> None:
     """Proper entry point for the CDKTF app."""
-    app = init_cdktf_app(get_ai_input())
-    app.synth()
+    args = parse_args(argv)
+    if args.command == "batch":
+        sys.exit(batch(args))
+    if args.command == "worker":
+        sys.exit(worker(args))
+    if args.command == "validate-input":
+        sys.exit(validate_input(args))
+    if args.command == "upgrade-graph":
+        sys.exit(upgrade_graph(args))
+    if args.command == "preflight":
+        sys.exit(preflight(args))
+    if args.command == "cleanup":
+        sys.exit(cleanup(args))
+
+    ai_input = get_ai_input()
+    if os.environ.get("ER_PREFLIGHT", "off").lower() == "on":
+        from er_aws_rds.preflight import (  # noqa: PLC0415
+            check_references,
+            references,
+        )
+
+        if issues := check_references(references(ai_input.data)):
+            for issue in issues:
+                print(issue.msg, file=sys.stderr)  # noqa: T201
+            sys.exit(1)
+    synth(ai_input, cache=get_cache(args), backend=args.backend)
 
 
 if __name__ == "__main__":
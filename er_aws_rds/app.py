@@ -0,0 +1,162 @@
+import os
+from typing import TYPE_CHECKING
+
+from external_resources_io.input import parse_model, read_input_from_file
+
+from er_aws_rds.cache import SynthCache, cache_key
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.profiling import (
+    SynthProfiler,
+    profile_phase,
+    synth_profiler_from_env,
+)
+from er_aws_rds.resolver import ArnResolver, arn_resolver_from_env, resolve_arns
+from er_aws_rds.shared import (
+    destroying,
+    monitoring_role_name,
+    parameter_group_name,
+    shared_parameter_groups,
+    shared_stack_id,
+    uses_shared_monitoring_role,
+)
+
+if TYPE_CHECKING:
+    from cdktf import App, TerraformStack
+
+DEFAULT_OUTDIR = "cdktf.out"
+BACKENDS = ("jsii", "native")
+
+
+def get_ai_input() -> AppInterfaceInput:
+    """Get the AppInterfaceInput from the input file."""
+    return parse_model(
+        AppInterfaceInput,
+        read_input_from_file(
+            file_path=os.environ.get("ER_INPUT_FILE", "/inputs/input.json"),
+        ),
+    )
+
+
+def resolve_outdir(outdir: str | None = None) -> str:
+    """The directory a synth writes to
+
+    outdir, ER_OUTDIR, CDKTF_OUTDIR (cdktf synth --output) or DEFAULT_OUTDIR,
+    the first one set.
+    """
+    return (
+        outdir
+        or os.environ.get("ER_OUTDIR")
+        or os.environ.get("CDKTF_OUTDIR")
+        or DEFAULT_OUTDIR
+    )
+
+
+def init_cdktf_app(  # noqa: PLR0913
+    ai_input: AppInterfaceInput,
+    id_: str = "CDKTF",
+    outdir: str | None = None,
+    profiler: SynthProfiler | None = None,
+    *,
+    split_stacks: bool | None = None,
+    destroy: bool | None = None,
+) -> "App":
+    """Initialize the CDKTF app and all the stacks.
+
+    split_stacks, the split_stacks of the input when not given, splits the
+    database into sub-stacks with their own state, see er_aws_rds.sub_stacks.
+    destroy, ACTION=Destroy when not given, leaves the shared stacks out, see
+    er_aws_rds.shared.
+    """
+    with profile_phase(profiler, "import_cdktf"):
+        # cdktf is imported here, a synth cache hit must not pay the jsii startup
+        from cdktf import App  # noqa: PLC0415
+
+        from er_aws_rds.rds import (  # noqa: PLC0415
+            SharedMonitoringRoleStack,
+            SharedParameterGroupStack,
+            Stack,
+        )
+
+    app = App(outdir=outdir or os.environ.get("ER_OUTDIR", None))
+    if destroy is None:
+        destroy = destroying()
+    shared: list[TerraformStack] = [
+        SharedParameterGroupStack(
+            app, shared_stack_id(id_, parameter_group_name(pg)), ai_input, pg
+        )
+        for pg in ([] if destroy else shared_parameter_groups(ai_input.data))
+    ]
+    if not destroy and uses_shared_monitoring_role(ai_input.data):
+        shared.append(
+            SharedMonitoringRoleStack(
+                app,
+                shared_stack_id(id_, monitoring_role_name(ai_input.data.aws_partition)),
+                ai_input,
+            )
+        )
+    if split_stacks is None:
+        split_stacks = ai_input.data.split_stacks
+    stack = Stack(app, id_, ai_input, profiler=profiler, split_stacks=split_stacks)
+    for shared_stack in shared:
+        stack.add_dependency(shared_stack)
+    return app
+
+
+def synth(  # noqa: PLR0913
+    ai_input: AppInterfaceInput,
+    outdir: str | None = None,
+    id_: str = "CDKTF",
+    cache: SynthCache | None = None,
+    backend: str | None = None,
+    *,
+    resolver: ArnResolver | None = None,
+    profiler: SynthProfiler | None = None,
+) -> bool:
+    """Synthesizes ai_input into outdir. Returns True if it was restored from cache
+
+    backend is "jsii" (cdktf, the default) or "native" (er_aws_rds.native),
+    ER_SYNTH_BACKEND sets it when not given. resolver, ER_RESOLVE_ARNS when
+    not given, embeds the KMS key and SNS topic ARNs instead of data sources.
+    profiler, ER_SYNTH_PROFILE=on when not given, writes a per phase timing
+    report into outdir, it is never cached.
+    """
+    # The jsii App only gets an explicit outdir, cdktf prefers it over CDKTF_OUTDIR
+    app_outdir = outdir
+    outdir = resolve_outdir(outdir)
+    backend = backend or os.environ.get("ER_SYNTH_BACKEND") or "jsii"
+    if backend not in BACKENDS:
+        msg = f"Unknown synth backend: {backend}"
+        raise ValueError(msg)
+    profiler = profiler or synth_profiler_from_env()
+    resolver = resolver or arn_resolver_from_env()
+    if resolver:
+        with profile_phase(profiler, "resolve_arns"):
+            ai_input = resolve_arns(ai_input, resolver)
+    destroy = destroying()
+    key = (
+        cache_key(ai_input, id_, {"backend": backend, "destroy": destroy})
+        if cache
+        else None
+    )
+    with profile_phase(profiler, "cache_get"):
+        hit = bool(cache and key and cache.get(key, outdir))
+    if not hit:
+        if backend == "native":
+            from er_aws_rds.native import synth_native  # noqa: PLC0415
+
+            synth_native(ai_input, outdir, id_=id_, profiler=profiler, destroy=destroy)
+        else:
+            app = init_cdktf_app(
+                ai_input,
+                id_=id_,
+                outdir=app_outdir,
+                profiler=profiler,
+                destroy=destroy,
+            )
+            with profile_phase(profiler, "app_synth"):
+                app.synth()
+        if cache and key:
+            cache.put(key, outdir)
+    if profiler:
+        profiler.write(outdir, backend=backend, cache_hit=hit)
+    return hit
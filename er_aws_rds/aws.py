@@ -0,0 +1,106 @@
+import threading
+import time
+from collections.abc import Mapping
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from er_aws_rds.metrics import Metrics, default_metrics
+from er_aws_rds.rate_limit import RateLimiter, rate_limiter_from_env
+
+if TYPE_CHECKING:
+    from mypy_boto3_rds import RDSClient
+
+DEFAULT_MAX_POOL_CONNECTIONS = 20
+DEFAULT_MAX_ATTEMPTS = 10
+
+
+class ClientRegistry:
+    """boto3 clients shared per (service, region)
+
+    Every client keeps its own endpoint resolution and connection pool, so
+    building one per call wastes the TLS handshakes. The registry builds each
+    client once, with a bounded connection pool and adaptive retries, and
+    hands the same instance to every caller. boto3 clients are thread safe,
+    sessions are not: clients are created under a lock. With metrics, the
+    creation time and the calls of every client are recorded. With a
+    rate_limiter, the calls of every client are limited per account, region
+    and operation. account is looked up with STS when the credentials do not
+    carry it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        config_options: Mapping[str, Any] | None = None,
+        metrics: Metrics | None = None,
+        *,
+        rate_limiter: RateLimiter | None = None,
+        account: str | None = None,
+    ) -> None:
+        # boto3 is imported here, input parsing must not pay its import time
+        from boto3 import Session  # noqa: PLC0415
+        from botocore.config import Config  # noqa: PLC0415
+
+        self.session = Session()
+        self.config = Config(
+            max_pool_connections=max_pool_connections,
+            retries={"mode": "adaptive", "max_attempts": max_attempts},
+            **(config_options or {}),
+        )
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter
+        self.account = account
+        self._clients: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def client(self, service: str, region: str) -> Any:  # noqa: ANN401
+        """The client of service in region"""
+        key = (service, region)
+        # Lock free on the hot path, clients are never replaced once created
+        if client := self._clients.get(key):
+            return client
+        with self._lock:
+            if key not in self._clients:
+                start = time.perf_counter()
+                client = self.session.client(
+                    service, region_name=region, config=self.config
+                )
+                if self.metrics:
+                    self.metrics.observe(
+                        "aws_client_create_seconds",
+                        time.perf_counter() - start,
+                        service=service,
+                        region=region,
+                    )
+                    self.metrics.instrument_client(client)
+                if self.rate_limiter:
+                    self.rate_limiter.install(client, self._account(region), region)
+                self._clients[key] = client
+            return self._clients[key]
+
+    def _account(self, region: str) -> str:
+        """Account of the session credentials"""
+        if self.account is None:
+            credentials = self.session.get_credentials()
+            self.account = (
+                getattr(credentials, "account_id", None)
+                or (
+                    self.session.client(
+                        "sts", region_name=region, config=self.config
+                    ).get_caller_identity()["Account"]
+                )
+            )
+        return self.account
+
+    def rds(self, region: str) -> "RDSClient":
+        """The RDS client of region"""
+        return self.client("rds", region)
+
+
+@cache
+def default_registry() -> ClientRegistry:
+    """Process wide ClientRegistry"""
+    return ClientRegistry(
+        metrics=default_metrics(), rate_limiter=rate_limiter_from_env()
+    )
@@ -0,0 +1,139 @@
+import json
+import sys
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from external_resources_io.input import parse_model
+
+from er_aws_rds.app import synth
+from er_aws_rds.cache import SynthCache
+from er_aws_rds.input import AppInterfaceInput
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a single input synthesized in a batch"""
+
+    source: str
+    ok: bool
+    outdir: str | None = None
+    cached: bool = False
+    error: str | None = None
+    duration: float = 0.0
+
+
+def iter_inputs(source: str) -> Iterator[tuple[str, dict[str, Any] | Exception]]:
+    """Yields (source_name, raw_input) pairs from a directory or a JSONL stream
+
+    source can be a directory with one JSON input per file, a JSONL file
+    with one input per line or "-" to read JSONL from stdin. Unreadable
+    entries are yielded as the exception so the caller can report them.
+    """
+    path = Path(source)
+    if source != "-" and path.is_dir():
+        for f in sorted(path.glob("*.json")):
+            try:
+                yield str(f), json.loads(f.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                yield str(f), e
+        return
+
+    try:
+        stream = sys.stdin if source == "-" else path.open(encoding="utf-8")
+    except OSError as e:
+        yield source, e
+        return
+    try:
+        for lineno, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield f"{source}:{lineno}", json.loads(line)
+            except ValueError as e:
+                yield f"{source}:{lineno}", e
+    except (OSError, ValueError) as e:
+        # The stream itself failed, e.g. an I/O or a decoding error
+        yield source, e
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def synth_one(
+    ai_input: AppInterfaceInput,
+    outdir: Path,
+    id_: str = "CDKTF",
+    cache: SynthCache | None = None,
+    backend: str | None = None,
+) -> bool:
+    """Synthesizes a single input into outdir using its own App and Stack
+
+    Returns True if the output was restored from cache.
+    """
+    outdir.mkdir(parents=True, exist_ok=True)
+    return synth(ai_input, outdir=str(outdir), id_=id_, cache=cache, backend=backend)
+
+
+def _target_dir(ai_input: AppInterfaceInput, outdir: str, seen: set[str]) -> Path:
+    identifier = ai_input.provision.identifier
+    if identifier in seen:
+        msg = f"Duplicated identifier in batch: {identifier}"
+        raise ValueError(msg)
+    seen.add(identifier)
+    return Path(outdir) / identifier
+
+
+def synth_batch(
+    source: str,
+    outdir: str,
+    id_: str = "CDKTF",
+    cache: SynthCache | None = None,
+    backend: str | None = None,
+) -> list[BatchResult]:
+    """Synthesizes every input from source into outdir/<identifier>
+
+    Every input gets its own App and Stack. A failing input is reported in
+    its BatchResult and does not abort the rest of the batch.
+    """
+    results: list[BatchResult] = []
+    seen: set[str] = set()
+    for name, raw_input in iter_inputs(source):
+        start = time.perf_counter()
+        if isinstance(raw_input, Exception):
+            results.append(BatchResult(source=name, ok=False, error=str(raw_input)))
+            continue
+        try:
+            ai_input = parse_model(AppInterfaceInput, raw_input)
+            target = _target_dir(ai_input, outdir, seen)
+            cached = synth_one(ai_input, target, id_=id_, cache=cache, backend=backend)
+            results.append(
+                BatchResult(
+                    source=name,
+                    ok=True,
+                    outdir=str(target),
+                    cached=cached,
+                    duration=time.perf_counter() - start,
+                )
+            )
+        except Exception as e:  # noqa: BLE001
+            results.append(
+                BatchResult(
+                    source=name,
+                    ok=False,
+                    error=f"{type(e).__name__}: {e}",
+                    duration=time.perf_counter() - start,
+                )
+            )
+    return results
+
+
+def report(results: list[BatchResult]) -> dict[str, Any]:
+    """Builds the JSON batch report"""
+    return {
+        "total": len(results),
+        "failed": sum(1 for r in results if not r.ok),
+        "results": [asdict(r) for r in results],
+    }
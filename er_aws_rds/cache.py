@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from er_aws_rds.input import AppInterfaceInput
+
+# Packages whose version changes the synthesized output
+VERSIONED_PACKAGES = (
+    "cdktf",
+    "cdktf-cdktf-provider-aws",
+    "cdktf-cdktf-provider-random",
+    "external-resources-io",
+    "pydantic",
+)
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+def canonical_dump(value: Any) -> Any:  # noqa: ANN401
+    """JSON compatible dump of a model, including the fields excluded from model_dump"""
+    if isinstance(value, BaseModel):
+        data = {
+            name: canonical_dump(getattr(value, name))
+            for name in type(value).model_fields
+        }
+        data.update({
+            k: canonical_dump(v) for k, v in (value.model_extra or {}).items()
+        })
+        return data
+    if isinstance(value, dict):
+        return {str(k): canonical_dump(v) for k, v in value.items()}
+    if isinstance(value, list | tuple):
+        return [canonical_dump(v) for v in value]
+    return value
+
+
+@cache
+def module_fingerprint() -> dict[str, str]:
+    """Versions of the packages and the module sources involved in the synth"""
+    versions = {}
+    for package in VERSIONED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = "none"
+    # The module itself is not installed as a distribution in the image,
+    # hash its sources instead of relying on a package version.
+    sources = hashlib.sha256()
+    root = Path(__file__).parent
+    for f in sorted(root.rglob("*.py")):
+        sources.update(str(f.relative_to(root)).encode())
+        sources.update(f.read_bytes())
+    versions["er-aws-rds"] = sources.hexdigest()
+    return versions
+
+
+def cache_key(
+    ai_input: AppInterfaceInput, id_: str, options: dict[str, Any] | None = None
+) -> str:
+    """Cache key for the synth of ai_input"""
+    payload = json.dumps(
+        {
+            "input": canonical_dump(ai_input),
+            "id": id_,
+            "options": options or {},
+            "versions": module_fingerprint(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SynthCache:
+    """Content addressed cache of synthesized outdirs
+
+    Every entry is a copy of a synth outdir stored under <directory>/<key>.
+    Entries are evicted when they have not been used for max_age seconds and,
+    least recently used first, while the cache exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / key
+
+    def get(self, key: str, outdir: str | Path) -> bool:
+        """Restores the cached output for key into outdir. Returns True on a hit"""
+        entry = self._entry(key)
+        if not entry.is_dir():
+            return False
+        if time.time() - entry.stat().st_mtime > self.max_age:
+            shutil.rmtree(entry, ignore_errors=True)
+            return False
+        shutil.copytree(entry, outdir, dirs_exist_ok=True)
+        os.utime(entry)
+        return True
+
+    def put(self, key: str, outdir: str | Path) -> None:
+        """Stores outdir as the cached output for key"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(key)
+        tmp = Path(tempfile.mkdtemp(dir=self.directory, prefix=".tmp-"))
+        try:
+            shutil.copytree(outdir, tmp, dirs_exist_ok=True)
+            tmp.replace(entry)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes expired entries and the least recently used ones over max_bytes"""
+        now = time.time()
+        entries = []
+        for entry in self.directory.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            mtime = entry.stat().st_mtime
+            if now - mtime > self.max_age:
+                shutil.rmtree(entry, ignore_errors=True)
+                continue
+            size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+            entries.append((mtime, size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+def synth_cache_from_env() -> SynthCache | None:
+    """SynthCache configured by the ER_SYNTH_CACHE_* environment variables
+
+    ER_SYNTH_CACHE_DIR enables the cache, ER_SYNTH_CACHE=off bypasses it.
+    """
+    directory = os.environ.get("ER_SYNTH_CACHE_DIR")
+    if not directory or os.environ.get("ER_SYNTH_CACHE", "on").lower() == "off":
+        return None
+    return SynthCache(
+        directory,
+        max_bytes=int(os.environ.get("ER_SYNTH_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        max_age=float(os.environ.get("ER_SYNTH_CACHE_MAX_AGE", DEFAULT_MAX_AGE)),
+    )
@@ -0,0 +1,197 @@
+"""Cleanup of the parameter groups and roles Terraform leaves in the account
+
+With split_stacks, the parameter groups of a database set skip_destroy (see
+er_aws_rds.sub_stacks): a renamed or replaced group, and every group of a
+deleted database, leaves the sub-stack state but stays in the account. The
+groups are tagged with OWNER_TAG. Shared parameter groups and shared
+enhanced monitoring roles (see er_aws_rds.shared) are never destroyed by
+Terraform. They are all reference counted: a group is retired once no
+instance of its region uses it and no input wants it, a role once no
+instance of the scanned regions uses it and no input wants it. Every input
+of the account must be given: the groups of a database missing from the
+inputs are retired as soon as no instance uses them.
+
+retired_resources finds them, one region at a time, delete_resources
+deletes them.
+"""
+
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+from er_aws_rds.aws import ClientRegistry, default_registry
+from er_aws_rds.input import Rds
+from er_aws_rds.shared import (
+    db_parameter_group_name,
+    is_shared_monitoring_role,
+    is_shared_parameter_group,
+    monitoring_role_name,
+    uses_shared_monitoring_role,
+)
+from er_aws_rds.sub_stacks import OWNER_TAG
+
+DB_PARAMETER_GROUP = "db_parameter_group"
+IAM_ROLE = "iam_role"
+# Owner of the shared resources
+SHARED = "shared"
+
+
+@dataclass(frozen=True)
+class Retired:
+    """A resource no database uses any more"""
+
+    kind: str
+    region: str
+    name: str
+    owner: str
+
+
+@dataclass
+class CleanupError:
+    """A retired resource that could not be deleted"""
+
+    kind: str
+    region: str
+    name: str
+    msg: str
+
+
+def wanted_parameter_groups(data: Rds) -> set[str]:
+    """Names of the parameter groups data synthesizes or references"""
+    return {
+        db_parameter_group_name(pg, data.identifier)
+        for pg in (data.parameter_group, data.old_parameter_group)
+        if pg
+    }
+
+
+def _in_use(registry: ClientRegistry, region: str) -> tuple[set[str], set[str]]:
+    """Names of the parameter groups and of the monitoring roles of the instances of region"""
+    groups: set[str] = set()
+    roles: set[str] = set()
+    paginator = registry.rds(region).get_paginator("describe_db_instances")
+    for page in paginator.paginate():
+        for instance in page["DBInstances"]:
+            groups.update(
+                pg["DBParameterGroupName"]
+                for pg in instance.get("DBParameterGroups", [])
+            )
+            if arn := instance.get("MonitoringRoleArn"):
+                roles.add(arn.rsplit("/", 1)[-1])
+    return groups, roles
+
+
+def _owned_parameter_groups(registry: ClientRegistry, region: str) -> dict[str, str]:
+    """Owner of the shared parameter groups and of the ones tagged with OWNER_TAG, by name"""
+    paginator = registry.rds(region).get_paginator("describe_db_parameter_groups")
+    owned = {
+        pg["DBParameterGroupName"]: SHARED
+        for page in paginator.paginate()
+        for pg in page["DBParameterGroups"]
+        if is_shared_parameter_group(pg["DBParameterGroupName"])
+    }
+    paginator = registry.client("resourcegroupstaggingapi", region).get_paginator(
+        "get_resources"
+    )
+    for page in paginator.paginate(
+        TagFilters=[{"Key": OWNER_TAG}], ResourceTypeFilters=["rds:pg"]
+    ):
+        for resource in page["ResourceTagMappingList"]:
+            # arn:<partition>:rds:<region>:<account>:pg:<name>
+            name = resource["ResourceARN"].split(":", 6)[6]
+            tags = {tag["Key"]: tag["Value"] for tag in resource.get("Tags", [])}
+            owned[name] = tags[OWNER_TAG]
+    return owned
+
+
+def _shared_monitoring_roles(registry: ClientRegistry, region: str) -> set[str]:
+    paginator = registry.client("iam", region).get_paginator("list_roles")
+    return {
+        role["RoleName"]
+        for page in paginator.paginate()
+        for role in page["Roles"]
+        if is_shared_monitoring_role(role["RoleName"])
+    }
+
+
+def retired_resources(
+    inputs: Iterable[Rds],
+    regions: Iterable[str] = (),
+    registry: ClientRegistry | None = None,
+) -> list[Retired]:
+    """The retired resources of the regions of inputs and of regions
+
+    IAM is global, the shared monitoring roles are looked up once, with the
+    client of the first region, and reported with that region.
+    """
+    registry = registry or default_registry()
+    inputs = list(inputs)
+    wanted = set().union(*(wanted_parameter_groups(data) for data in inputs))
+    wanted_roles = {
+        monitoring_role_name(data.aws_partition)
+        for data in inputs
+        if uses_shared_monitoring_role(data)
+    }
+    retired: list[Retired] = []
+    roles_in_use: set[str] = set()
+    scanned = sorted({data.region for data in inputs} | set(regions))
+    for region in scanned:
+        in_use, roles = _in_use(registry, region)
+        roles_in_use |= roles
+        retired.extend(
+            Retired(DB_PARAMETER_GROUP, region, name, owner)
+            for name, owner in sorted(_owned_parameter_groups(registry, region).items())
+            if name not in in_use and name not in wanted
+        )
+    if scanned:
+        retired.extend(
+            Retired(IAM_ROLE, scanned[0], name, SHARED)
+            for name in sorted(_shared_monitoring_roles(registry, scanned[0]))
+            if name not in roles_in_use and name not in wanted_roles
+        )
+    return retired
+
+
+def _delete(registry: ClientRegistry, resource: Retired) -> None:
+    if resource.kind == IAM_ROLE:
+        iam = registry.client("iam", resource.region)
+        paginator = iam.get_paginator("list_attached_role_policies")
+        for page in paginator.paginate(RoleName=resource.name):
+            for policy in page["AttachedPolicies"]:
+                iam.detach_role_policy(
+                    RoleName=resource.name, PolicyArn=policy["PolicyArn"]
+                )
+        iam.delete_role(RoleName=resource.name)
+        return
+    registry.rds(resource.region).delete_db_parameter_group(
+        DBParameterGroupName=resource.name
+    )
+
+
+def delete_resources(
+    retired: Iterable[Retired], registry: ClientRegistry | None = None
+) -> list[CleanupError]:
+    """Deletes retired, a failed deletion is reported and the rest go on"""
+    registry = registry or default_registry()
+    errors: list[CleanupError] = []
+    for resource in retired:
+        try:
+            _delete(registry, resource)
+        except ClientError as e:
+            errors.append(
+                CleanupError(resource.kind, resource.region, resource.name, str(e))
+            )
+    return errors
+
+
+def report(
+    retired: Sequence[Retired], errors: Sequence[CleanupError], *, deleted: bool
+) -> dict[str, Any]:
+    """JSON serializable summary of the cleanup"""
+    return {
+        "retired": [asdict(resource) for resource in retired],
+        "deleted": deleted,
+        "errors": [asdict(error) for error in errors],
+    }
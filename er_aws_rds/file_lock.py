@@ -0,0 +1,25 @@
+"""Advisory file locks, shared by the processes of a host"""
+
+import fcntl
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[IO[str]]:
+    """Holds an exclusive flock on path, created if missing, and yields it open
+
+    flock locks belong to the open file, so threads of the same process
+    exclude each other too.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a+", encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            # Buffered writes must land before another process reads the file
+            f.flush()
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from typing import Any, Literal
 
 from external_resources_io.input import AppInterfaceProvision
@@ -6,6 +6,7 @@ from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PrivateAttr,
     computed_field,
     field_validator,
     model_validator,
@@ -20,6 +21,37 @@ class EventNotification(BaseModel):
     destination: str = Field(..., alias="destination")
     source_type: str | None = Field(default="all", alias="source_type")
     event_categories: list[str] | None = Field(..., alias="event_categories")
+    # ARN of destination, set by er_aws_rds.resolver
+    arn: str | None = Field(default=None, exclude=True)
+
+
+def merge_event_notifications(
+    notifications: Iterable[EventNotification],
+) -> list[EventNotification]:
+    """One notification per (destination, source_type), in first seen order
+
+    The event_categories of a group are merged. A notification without
+    event_categories subscribes to every category, and so does its group.
+    """
+    groups: dict[tuple[str, str | None], EventNotification] = {}
+    for en in notifications:
+        key = (en.destination, en.source_type)
+        seen = groups.get(key)
+        if seen is None:
+            groups[key] = en.model_copy()
+            continue
+        categories = None
+        if seen.event_categories is not None and en.event_categories is not None:
+            categories = sorted(set(seen.event_categories) | set(en.event_categories))
+        groups[key] = seen.model_copy(
+            update={"event_categories": categories, "arn": seen.arn or en.arn}
+        )
+    return list(groups.values())
+
+
+def event_source_type(en: EventNotification) -> str | None:
+    """source_type of the subscription of en, None ("all") subscribes to every source"""
+    return None if en.source_type in {None, "all"} else en.source_type
 
 
 class DataClassification(BaseModel):
@@ -56,13 +88,57 @@ class Parameter(BaseModel):
         return str(v)
 
 
+def index_parameters(parameters: Iterable[Parameter]) -> dict[str, Parameter]:
+    """Parameters by name. Identical duplicates are dropped, conflicting ones rejected"""
+    index: dict[str, Parameter] = {}
+    for parameter in parameters:
+        seen = index.setdefault(parameter.name, parameter)
+        if seen != parameter:
+            msg = f"Conflicting duplicates of parameter {parameter.name}: {seen.value!r} ({seen.apply_method}) and {parameter.value!r} ({parameter.apply_method})"
+            raise ValueError(msg)
+    return index
+
+
 class ParameterGroup(BaseModel):
     "db_parameter_group"
 
     family: str
     name: str | None = None
     description: str | None = None
+    # Unique by name and sorted by name, a stable order avoids perpetual diffs
     parameters: list[Parameter] | None = Field(default=None, exclude=True)
+    # Opt-in. Shared groups are named after their content and reused by every
+    # database in the same account and region. See er_aws_rds.shared
+    shared: bool = False
+    _index: dict[str, Parameter] = PrivateAttr(default_factory=dict)
+
+    @field_validator("parameters")
+    @classmethod
+    def unique_parameters(cls, v: list[Parameter] | None) -> list[Parameter] | None:
+        """Drops identical duplicates, rejects conflicting ones and sorts by name"""
+        if v is None:
+            return None
+        return sorted(index_parameters(v).values(), key=lambda p: p.name)
+
+    def model_post_init(self, _context: Any, /) -> None:  # noqa: ANN401
+        """Indexes the parameters by name"""
+        self._index = {p.name: p for p in self.parameters or []}
+
+    def parameter(self, name: str) -> Parameter | None:
+        """The parameter called name, if any"""
+        return self._index.get(name)
+
+    def merge(self, overrides: Iterable[Parameter]) -> "ParameterGroup":
+        """A copy of the group with overrides applied
+
+        An override replaces the parameter with the same name, new names are
+        added. Conflicting duplicates within overrides are rejected.
+        """
+        merged = self._index | index_parameters(overrides)
+        return ParameterGroup.model_validate({
+            **self.model_dump(exclude={"parameters"}),
+            "parameters": list(merged.values()),
+        })
 
     # This was used to populate DbParameterGroup(self, **pg.model_dump()) directy
     # but it did not work. "parameters" come from App-Interface but terraform needs "parameter" (singular)
@@ -98,9 +174,19 @@ class RdsAppInterface(BaseModel):
     aws_partition: str | None = Field(default="aws", exclude=True)
     region: str = Field(exclude=True)
     parameter_group: ParameterGroup | None = Field(default=None, exclude=True)
+    # Per database overrides of the parameter_group parameters
+    parameter_group_overrides: list[Parameter] | None = Field(
+        default=None, exclude=True
+    )
     old_parameter_group: ParameterGroup | None = Field(default=None, exclude=True)
     replica_source: ReplicaSource | None = Field(default=None, exclude=True)
     enhanced_monitoring: bool | None = Field(default=None, exclude=True)
+    # Opt-in. Reference the account wide enhanced monitoring role instead of a
+    # role per database. See er_aws_rds.shared
+    shared_enhanced_monitoring: bool = Field(default=False, exclude=True)
+    # Opt-in. Synthesize the parameter groups and the enhanced monitoring role
+    # into stacks with their own state. See er_aws_rds.sub_stacks
+    split_stacks: bool = Field(default=False, exclude=True)
     reset_password: str | None = Field(default=None, exclude=True)
     ca_cert: VaultSecret | None = Field(default=None, exclude=True)
     annotations: str | None = Field(default=None, exclude=True)
@@ -132,6 +218,7 @@ class Rds(RdsAppInterface):
     allow_major_version_upgrade: bool | None = False
     availability_zone: str | None = None
     monitoring_interval: int | None = 0
+    monitoring_role_arn: str | None = None
     apply_immediately: bool | None = False
     multi_az: bool | None = False
     replicate_source_db: str | None = None
@@ -204,18 +291,27 @@ class Rds(RdsAppInterface):
                 raise ValueError(msg)
         return self
 
+    @model_validator(mode="after")
+    def override_parameter_group_parameters(self) -> "Rds":
+        """Applies parameter_group_overrides to parameter_group"""
+        if self.parameter_group_overrides:
+            if not self.parameter_group:
+                msg = "parameter_group_overrides requires parameter_group"
+                raise ValueError(msg)
+            self.parameter_group = self.parameter_group.merge(
+                self.parameter_group_overrides
+            )
+        return self
+
     @model_validator(mode="after")
     def validate_parameter_group_parameters(self) -> "Rds":
         """Validate that every parameter complies with our requirements"""
         if not self.parameter_group:
             return self
-        for parameter in self.parameter_group.parameters or []:
-            if (
-                parameter.name == "rds.logical_replication"
-                and parameter.apply_method != "pending-reboot"
-            ):
-                msg = "rds.logical_replication must be set to pending-reboot"
-                raise RDSLogicalReplicationError(msg)
+        parameter = self.parameter_group.parameter("rds.logical_replication")
+        if parameter and parameter.apply_method != "pending-reboot":
+            msg = "rds.logical_replication must be set to pending-reboot"
+            raise RDSLogicalReplicationError(msg)
         return self
 
     @model_validator(mode="after")
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from contextlib import AbstractContextManager, nullcontext
+from pathlib import Path
+from typing import Any, TypeVar
+
+from er_aws_rds.file_lock import file_lock
+from er_aws_rds.metrics import Metrics, default_metrics
+
+T = TypeVar("T")
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 10_000
+# Disk eviction scans the whole directory, run it every EVICT_EVERY writes
+EVICT_EVERY = 100
+# Fetch lock files of the directory, keys share them by digest prefix
+FETCH_LOCKS = 256
+
+
+class LookupCache:
+    """TTL cache of AWS lookup results, in memory and optionally on disk
+
+    Entries are JSON values keyed by a namespace (usually the API operation)
+    and a sequence of strings, e.g. (partition, region, engine, version).
+    The in-process memo answers repeated lookups of a run, it keeps the
+    max_entries most recently used entries. The files under directory
+    survive between runs. Disk entries older than ttl are ignored
+    and evicted, as are the least recently written ones while the directory
+    exceeds max_bytes. With metrics, get_or_set records its hits and misses
+    per namespace.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        metrics: Metrics | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.directory = Path(directory) if directory else None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.metrics = metrics
+        self.max_entries = max_entries
+        self._memo: OrderedDict[tuple[str, ...], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetching: dict[tuple[str, ...], threading.Lock] = {}
+        self._writes = 0
+
+    def _path(self, key: tuple[str, ...]) -> Path | None:
+        if not self.directory:
+            return None
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.directory / key[0] / f"{digest}.json"
+
+    def _remember(self, key: tuple[str, ...], expires: float, value: Any) -> None:  # noqa: ANN401
+        """Memoizes key, evicting the least recently used entries. Holds _lock"""
+        self._memo[key] = (expires, value)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.max_entries:
+            self._memo.popitem(last=False)
+
+    def get(self, namespace: str, key: Sequence[str]) -> Any | None:  # noqa: ANN401
+        """The cached value of key, None if missing or expired"""
+        full_key = (namespace, *key)
+        now = time.time()
+        with self._lock:
+            memo = self._memo.get(full_key)
+            if memo:
+                self._memo.move_to_end(full_key)
+        if memo and memo[0] > now:
+            return memo[1]
+
+        path = self._path(full_key)
+        if not path:
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry["key"] != list(full_key) or entry["expires"] <= now:
+            return None
+        with self._lock:
+            self._remember(full_key, entry["expires"], entry["value"])
+        return entry["value"]
+
+    def set(
+        self,
+        namespace: str,
+        key: Sequence[str],
+        value: Any,  # noqa: ANN401
+        ttl: float | None = None,
+    ) -> None:
+        """Caches the JSON serializable value of key for ttl seconds, self.ttl by default"""
+        full_key = (namespace, *key)
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(full_key, expires, value)
+            self._writes += 1
+            evict = self._writes % EVICT_EVERY == 0
+
+        path = self._path(full_key)
+        if not path:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"key": list(full_key), "expires": expires, "value": value}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        Path(tmp).replace(path)
+        if evict:
+            self.evict()
+
+    def _fetch_lock(self, key: tuple[str, ...]) -> AbstractContextManager[Any]:
+        """Lock of the fetches of key by the processes sharing directory"""
+        if not self.directory:
+            return nullcontext()
+        digest = hashlib.sha256(json.dumps(key).encode()).digest()
+        stripe = int.from_bytes(digest[:2]) % FETCH_LOCKS
+        return file_lock(self.directory / ".locks" / f"{stripe:03d}")
+
+    def get_or_set(
+        self, namespace: str, key: Sequence[str], fetch: Callable[[], T]
+    ) -> T:
+        """The cached value of key, fetched and cached on a miss
+
+        Concurrent misses of the same key wait for a single fetch, across
+        the processes sharing directory too.
+        """
+        value = self.get(namespace, key)
+        if value is not None:
+            self._record(namespace, "hit")
+            return value
+        full_key = (namespace, *key)
+        with self._lock:
+            fetching = self._fetching.setdefault(full_key, threading.Lock())
+        # A hit when a concurrent fetch of the key filled it meanwhile
+        result = "hit"
+        try:
+            with fetching, self._fetch_lock(full_key):
+                value = self.get(namespace, key)
+                if value is None:
+                    result = "miss"
+                    value = fetch()
+                    self.set(namespace, key, value)
+        finally:
+            with self._lock:
+                self._fetching.pop(full_key, None)
+        self._record(namespace, result)
+        return value
+
+    def _record(self, namespace: str, result: str) -> None:
+        if self.metrics:
+            self.metrics.inc(
+                "lookup_cache_requests_total", namespace=namespace, result=result
+            )
+
+    def evict(self) -> None:
+        """Removes expired entries and the oldest ones over max_bytes"""
+        if not self.directory or not self.directory.is_dir():
+            return
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def lookup_cache_from_env() -> LookupCache:
+    """LookupCache configured by the ER_LOOKUP_CACHE_* environment variables
+
+    ER_LOOKUP_CACHE_DIR persists the lookups on disk, ER_LOOKUP_CACHE=off
+    keeps them in memory only.
+    """
+    directory = os.environ.get("ER_LOOKUP_CACHE_DIR")
+    if os.environ.get("ER_LOOKUP_CACHE", "on").lower() == "off":
+        directory = None
+    return LookupCache(
+        directory,
+        ttl=float(os.environ.get("ER_LOOKUP_CACHE_TTL", DEFAULT_TTL)),
+        max_bytes=int(os.environ.get("ER_LOOKUP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        metrics=default_metrics(),
+        max_entries=int(
+            os.environ.get("ER_LOOKUP_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        ),
+    )
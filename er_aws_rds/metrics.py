@@ -0,0 +1,334 @@
+"""Opt-in metrics of the AWS calls, lookup cache and plan checks
+
+Metrics keeps Prometheus style counters and histograms in process.
+instrument_client hooks the botocore events of a client: calls, latency,
+retries, throttled attempts and errors per operation. The ClientRegistry,
+the LookupCache and the plan validator report to default_metrics(), enabled
+by ER_METRICS_FILE. write_metrics() writes the file: a JSON summary if it
+ends in .json, the Prometheus text exposition format otherwise.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Error codes of throttled requests, as botocore's retry handlers classify them
+THROTTLING_ERROR_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "TransactionInProgressException",
+    "RequestLimitExceeded",
+    "BandwidthLimitExceeded",
+    "LimitExceededException",
+    "RequestThrottled",
+    "SlowDown",
+    "PriorRequestNotComplete",
+    "EC2ThrottledException",
+})
+
+HELP = {
+    "aws_api_calls_total": "AWS API calls, retries excluded",
+    "aws_api_errors_total": "AWS API calls that failed, by error code",
+    "aws_api_retries_total": "Retried attempts of AWS API calls",
+    "aws_api_throttles_total": "AWS API attempts rejected by throttling",
+    "aws_api_call_duration_seconds": "AWS API call latency, retries included",
+    "aws_client_create_seconds": "boto3 client creation time",
+    "aws_rate_limit_wait_seconds": "Wait for a token of the client side rate limit",
+    "lookup_cache_requests_total": "Lookup cache requests, by result",
+    "plan_parse_seconds": "Terraform plan parsing time",
+    "plan_check_duration_seconds": "Plan check duration, by check",
+    "plan_validation_seconds": "Plan validation time, parsing included",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Histogram:
+    """Observations of a histogram, counts per upper bound"""
+
+    buckets: tuple[float, ...]
+    counts: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        """Records value"""
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, observations <= le) of every bucket, +Inf included"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts, strict=True):
+            total += count
+            result.append((f"{bound:g}", total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(labels: Labels, le: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if le:
+        parts.append(f'le="{le}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Metrics:
+    """Thread safe counters and histograms"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Adds value to the counter name"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Records value in the histogram name"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets, [0] * len(self.buckets))
+            series[key].observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Records the seconds the block takes in the histogram name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Value of the counter name"""
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def histogram(self, name: str, **labels: str) -> Histogram | None:
+        """The histogram name, None if it has no observations"""
+        with self._lock:
+            return self._histograms.get(name, {}).get(_labels(labels))
+
+    def cache_hit_ratios(self) -> dict[str, float]:
+        """Hit ratio of the lookup cache, by namespace"""
+        requests: dict[str, dict[str, float]] = {}
+        with self._lock:
+            series = dict(self._counters.get("lookup_cache_requests_total", {}))
+        for labels, value in series.items():
+            label = dict(labels)
+            requests.setdefault(label["namespace"], {})[label["result"]] = value
+        return {
+            namespace: round(results.get("hit", 0) / (sum(results.values()) or 1), 4)
+            for namespace, results in sorted(requests.items())
+        }
+
+    def instrument_client(self, client: Any) -> None:  # noqa: ANN401
+        """Records the calls of the botocore client"""
+        service = client.meta.service_model.service_name
+        events = client.meta.events
+
+        def before_call(context: dict[str, Any], **_: Any) -> None:  # noqa: ANN401
+            context["metrics_start"] = time.perf_counter()
+
+        def after_call(
+            model: Any,  # noqa: ANN401
+            parsed: dict[str, Any],
+            context: dict[str, Any],
+            **_: Any,  # noqa: ANN401
+        ) -> None:
+            operation = model.name
+            duration = time.perf_counter() - context.get(
+                "metrics_start", time.perf_counter()
+            )
+            retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            self.inc("aws_api_calls_total", service=service, operation=operation)
+            self.observe(
+                "aws_api_call_duration_seconds",
+                duration,
+                service=service,
+                operation=operation,
+            )
+            if retries:
+                self.inc(
+                    "aws_api_retries_total",
+                    retries,
+                    service=service,
+                    operation=operation,
+                )
+            if code := parsed.get("Error", {}).get("Code"):
+                self.inc(
+                    "aws_api_errors_total",
+                    service=service,
+                    operation=operation,
+                    code=code,
+                )
+            logger.debug(
+                "%s.%s %.1fms retries=%s error=%s",
+                service,
+                operation,
+                duration * 1000,
+                retries,
+                code,
+            )
+
+        def after_call_error(
+            model: Any,  # noqa: ANN401
+            exception: Exception,
+            context: dict[str, Any],
+            **_: Any,  # noqa: ANN401
+        ) -> None:
+            # Connection errors once the retries are exhausted, no response
+            self.inc("aws_api_calls_total", service=service, operation=model.name)
+            self.inc(
+                "aws_api_errors_total",
+                service=service,
+                operation=model.name,
+                code=type(exception).__name__,
+            )
+            context.pop("metrics_start", None)
+
+        def needs_retry(
+            response: tuple[Any, dict[str, Any]] | None,
+            operation: Any,  # noqa: ANN401
+            **_: Any,  # noqa: ANN401
+        ) -> None:
+            # Every attempt, before the retry handlers decide
+            if response and response[1].get("Error", {}).get("Code") in (
+                THROTTLING_ERROR_CODES
+            ):
+                self.inc(
+                    "aws_api_throttles_total",
+                    service=service,
+                    operation=operation.name,
+                )
+
+        events.register("before-call", before_call)
+        events.register("after-call", after_call)
+        events.register("after-call-error", after_call_error)
+        events.register("needs-retry", needs_retry)
+
+    def summary(self) -> dict[str, Any]:
+        """JSON serializable summary"""
+        with self._lock:
+            counters = {
+                name: [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in sorted(series.items())
+                ]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "buckets": dict(histogram.cumulative()),
+                    }
+                    for labels, histogram in sorted(series.items())
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "cache_hit_ratios": self.cache_hit_ratios(),
+        }
+
+    def exposition(self) -> str:
+        """Prometheus text exposition format"""
+        lines: list[str] = []
+        with self._lock:
+            for name, counter_series in sorted(self._counters.items()):
+                lines.extend((
+                    f"# HELP {name} {HELP.get(name, name)}",
+                    f"# TYPE {name} counter",
+                ))
+                lines.extend(
+                    f"{name}{_format_labels(labels)} {value:g}"
+                    for labels, value in sorted(counter_series.items())
+                )
+            for name, histogram_series in sorted(self._histograms.items()):
+                lines.extend((
+                    f"# HELP {name} {HELP.get(name, name)}",
+                    f"# TYPE {name} histogram",
+                ))
+                for labels, histogram in sorted(histogram_series.items()):
+                    lines.extend(
+                        f"{name}_bucket{_format_labels(labels, le)} {count}"
+                        for le, count in histogram.cumulative()
+                    )
+                    lines.extend((
+                        f"{name}_sum{_format_labels(labels)} {histogram.sum:g}",
+                        f"{name}_count{_format_labels(labels)} {histogram.count}",
+                    ))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """Writes the JSON summary (.json) or the text exposition to path"""
+        path = Path(path)
+        if path.suffix == ".json":
+            content = json.dumps(self.summary(), indent=2)
+        else:
+            content = self.exposition()
+        path.write_text(content, encoding="utf-8")
+
+
+def timed(
+    metrics: Metrics | None, name: str, **labels: str
+) -> AbstractContextManager[None]:
+    """metrics.time(name, **labels), a no-op without metrics"""
+    if metrics is None:
+        return nullcontext()
+    return metrics.time(name, **labels)
+
+
+@cache
+def default_metrics() -> Metrics | None:
+    """Process wide Metrics, None unless ER_METRICS_FILE is set"""
+    return Metrics() if os.environ.get("ER_METRICS_FILE") else None
+
+
+def write_metrics() -> None:
+    """Writes default_metrics() to ER_METRICS_FILE, if enabled"""
+    metrics = default_metrics()
+    if metrics:
+        metrics.write(os.environ["ER_METRICS_FILE"])
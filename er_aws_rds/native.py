@@ -0,0 +1,724 @@
+"""Pure Python Terraform JSON emitter
+
+Alternative synth backend that renders the same cdk.tf.json and manifest.json
+as er_aws_rds.rds.Stack + cdktf, without the jsii/Node runtime. The output
+must stay byte-equivalent to the cdktf one, tests/test_native.py diffs both
+backends over a corpus of inputs.
+"""
+
+import hashlib
+import json
+import math
+import re
+from contextlib import AbstractContextManager
+from functools import cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from external_resources_io.input import AppInterfaceProvision
+
+from er_aws_rds.input import (
+    AppInterfaceInput,
+    ParameterGroup,
+    event_source_type,
+    merge_event_notifications,
+)
+from er_aws_rds.profiling import SynthProfiler, profile_phase
+from er_aws_rds.shared import (
+    ENHANCED_MONITORING_ASSUME_ROLE_POLICY,
+    GLOBAL_REGION,
+    db_parameter_group_name,
+    destroying,
+    enhanced_monitoring_policy_arn,
+    monitoring_role_name,
+    parameter_group_name,
+    shared_parameter_groups,
+    shared_stack_id,
+    shared_state_key,
+    uses_shared_monitoring_role,
+)
+from er_aws_rds.sub_stacks import (
+    ENHANCED_MONITORING,
+    OWNER_TAG,
+    PARAMETER_GROUPS,
+    sub_stack_id,
+    sub_stack_names,
+    sub_stack_state_key,
+)
+
+# Must match the provider versions bundled with the pinned
+# cdktf-cdktf-provider-aws (19.30.0) and cdktf-cdktf-provider-random (11.0.2)
+AWS_PROVIDER = {"source": "aws", "version": "5.62.0"}
+RANDOM_PROVIDER = {"source": "hashicorp/random", "version": "3.6.2"}
+REQUIRED_PROVIDERS = {"aws": AWS_PROVIDER, "random": RANDOM_PROVIDER}
+
+# DbInstanceConfig attributes, the ones accepted by DbInstance(**kwargs)
+DB_INSTANCE_ATTRIBUTES = frozenset({
+    "allocated_storage",
+    "allow_major_version_upgrade",
+    "apply_immediately",
+    "auto_minor_version_upgrade",
+    "availability_zone",
+    "backup_retention_period",
+    "backup_target",
+    "backup_window",
+    "blue_green_update",
+    "ca_cert_identifier",
+    "character_set_name",
+    "copy_tags_to_snapshot",
+    "custom_iam_instance_profile",
+    "customer_owned_ip_enabled",
+    "db_name",
+    "db_subnet_group_name",
+    "dedicated_log_volume",
+    "delete_automated_backups",
+    "deletion_protection",
+    "domain",
+    "domain_auth_secret_arn",
+    "domain_dns_ips",
+    "domain_fqdn",
+    "domain_iam_role_name",
+    "domain_ou",
+    "enabled_cloudwatch_logs_exports",
+    "engine",
+    "engine_lifecycle_support",
+    "engine_version",
+    "final_snapshot_identifier",
+    "iam_database_authentication_enabled",
+    "id",
+    "identifier",
+    "identifier_prefix",
+    "instance_class",
+    "iops",
+    "kms_key_id",
+    "license_model",
+    "maintenance_window",
+    "manage_master_user_password",
+    "master_user_secret_kms_key_id",
+    "max_allocated_storage",
+    "monitoring_interval",
+    "monitoring_role_arn",
+    "multi_az",
+    "nchar_character_set_name",
+    "network_type",
+    "option_group_name",
+    "parameter_group_name",
+    "password",
+    "performance_insights_enabled",
+    "performance_insights_kms_key_id",
+    "performance_insights_retention_period",
+    "port",
+    "publicly_accessible",
+    "replica_mode",
+    "replicate_source_db",
+    "restore_to_point_in_time",
+    "s3_import",
+    "skip_final_snapshot",
+    "snapshot_identifier",
+    "storage_encrypted",
+    "storage_throughput",
+    "storage_type",
+    "tags",
+    "tags_all",
+    "timeouts",
+    "timezone",
+    "upgrade_storage_config",
+    "username",
+    "vpc_security_group_ids",
+})
+
+_DISALLOWED_ID_CHARS = re.compile(r"[^A-Za-z0-9_-]")
+_MAX_ID_LEN = 255
+_MAX_HUMAN_LEN = 240
+
+
+@cache
+def cdktf_version() -> str:
+    """The cdktf version written in the synth metadata"""
+    return metadata.version("cdktf")
+
+
+def make_unique_id(components: list[str]) -> str:
+    """Port of cdktf's makeUniqueId (private/unique.ts)"""
+    components = [c for c in components if c != "Default"]
+    if len(components) == 1:
+        candidate = _DISALLOWED_ID_CHARS.sub("", components[0])
+        if len(candidate) <= _MAX_ID_LEN:
+            return candidate
+
+    digest = hashlib.md5("/".join(components).encode(), usedforsecurity=False)
+    human: list[str] = []
+    for c in components:
+        if not human or not human[-1].endswith(c):
+            human.append(c)
+    rendered = "_".join(
+        _DISALLOWED_ID_CHARS.sub("", c) for c in human if c != "Resource"
+    )
+    return rendered[:_MAX_HUMAN_LEN] + "_" + digest.hexdigest()[:8].upper()
+
+
+def _js_number(value: float) -> str:
+    """Number formatting of JavaScript's Number.prototype.toString"""
+    if not math.isfinite(value):
+        return "null"
+    if value == 0:
+        return "0"
+    sign = "-" if value < 0 else ""
+    mantissa, _, exp = repr(abs(value)).partition("e")
+    int_part, _, frac_part = mantissa.partition(".")
+    digits = (int_part + frac_part.rstrip("0")).lstrip("0")
+    # value == 0.<digits> * 10 ** n
+    n = len(int_part.lstrip("0")) + int(exp or 0)
+    if not int_part.strip("0"):
+        n -= len(frac_part) - len(frac_part.lstrip("0"))
+    k = len(digits)
+    if k <= n <= 21:  # noqa: PLR2004
+        return sign + digits + "0" * (n - k)
+    if 0 < n <= 21:  # noqa: PLR2004
+        return sign + digits[:n] + "." + digits[n:]
+    if -6 < n <= 0:  # noqa: PLR2004
+        return sign + "0." + "0" * -n + digits
+    exponent = n - 1
+    rendered = digits[0] + ("." + digits[1:] if k > 1 else "")
+    return f"{sign}{rendered}e{'+' if exponent > 0 else '-'}{abs(exponent)}"
+
+
+def _js_key(key: str) -> bytes:
+    # JavaScript sorts object keys by UTF-16 code units
+    return key.encode("utf-16-be")
+
+
+def stable_stringify(value: Any, level: int = 0) -> str | None:  # noqa: ANN401, PLR0911
+    """Port of json-stable-stringify with space=2, used by cdktf to write the synth output
+
+    None is handled as JavaScript's undefined: skipped in objects, null in arrays.
+    """
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        return _js_number(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+
+    indent = "\n" + "  " * level
+    if isinstance(value, list | tuple):
+        items = [stable_stringify(v, level + 1) or "null" for v in value]
+        return "[" + ",".join(indent + "  " + i for i in items) + indent + "]"
+
+    out = []
+    for key in sorted(value, key=_js_key):
+        rendered = stable_stringify(value[key], level + 1)
+        if rendered is None:
+            continue
+        out.append(
+            indent + "  " + json.dumps(key, ensure_ascii=False) + ": " + rendered
+        )
+    return "{" + ",".join(out) + indent + "}"
+
+
+class NativeTerraformStack:
+    """Terraform JSON document of a single stack, the TerraformStack counterpart"""
+
+    def __init__(self, id_: str) -> None:
+        self.id_ = id_
+        self.construct_ids: set[str] = set()
+        self.resources: dict[str, dict[str, Any]] = {}
+        self.data_sources: dict[str, dict[str, Any]] = {}
+        self.providers: dict[str, list[dict[str, Any]]] = {}
+        self.outputs: dict[str, dict[str, Any]] = {}
+        self.output_ids: dict[str, str] = {}
+        self.backend: dict[str, Any] = {}
+        self.dependencies: list[str] = []
+
+    def _construct(self, id_: str) -> tuple[str, dict[str, Any]]:
+        id_ = id_.replace("/", "--")
+        if id_ in self.construct_ids:
+            msg = f"There is already a Construct with name '{id_}' in {self.id_}"
+            raise ValueError(msg)
+        self.construct_ids.add(id_)
+        unique_id = make_unique_id([id_])
+        meta = {
+            "//": {"metadata": {"path": f"{self.id_}/{id_}", "uniqueId": unique_id}}
+        }
+        return unique_id, meta
+
+    def _resource(self, type_: str, id_: str, **attributes: Any) -> str:  # noqa: ANN401
+        unique_id, meta = self._construct(id_)
+        self.resources.setdefault(type_, {})[unique_id] = {**attributes, **meta}
+        return f"{type_}.{unique_id}"
+
+    def _data(self, type_: str, id_: str, **attributes: Any) -> str:  # noqa: ANN401
+        unique_id, meta = self._construct(id_)
+        self.data_sources.setdefault(type_, {})[unique_id] = {**attributes, **meta}
+        return f"data.{type_}.{unique_id}"
+
+    def _output(self, id_: str, **attributes: Any) -> None:  # noqa: ANN401
+        unique_id, _ = self._construct(id_)
+        self.outputs[unique_id] = attributes
+        self.output_ids[id_] = unique_id
+
+    def _provider(self, name: str, id_: str, **attributes: Any) -> None:  # noqa: ANN401
+        self._construct(id_)
+        self.providers.setdefault(name, []).append(attributes)
+
+    def _s3_backend(self, provision: AppInterfaceProvision, key: str) -> None:
+        self._construct("backend")
+        self.backend = {
+            "bucket": provision.module_provision_data.tf_state_bucket,
+            "key": key,
+            "encrypt": True,
+            "region": provision.module_provision_data.tf_state_region,
+            "dynamodb_table": provision.module_provision_data.tf_state_dynamodb_table,
+            "profile": "external-resources-state",
+        }
+
+    def _cross_stack_output(self, expression: str) -> str:
+        """Outputs ${expression} for the stacks referencing it. Returns its id"""
+        id_ = f"cross-stack-output-{expression}"
+        if id_ not in self.output_ids:
+            self._output(id_, sensitive=True, value=f"${{{expression}}}")
+        return self.output_ids[id_]
+
+    def _remote_state(self, stack: "NativeTerraformStack") -> str:
+        """Address of the terraform_remote_state data source of stack"""
+        id_ = f"cross-stack-reference-input-{stack.id_}"
+        self.data_sources.setdefault("terraform_remote_state", {})[id_] = {
+            "backend": "s3",
+            "config": stack.backend,
+            "workspace": "${terraform.workspace}",
+        }
+        return f"data.terraform_remote_state.{id_}"
+
+    def to_terraform(self) -> dict[str, Any]:
+        """The Terraform JSON document"""
+        return {
+            "//": {
+                "metadata": {
+                    "backend": "s3",
+                    "stackName": self.id_,
+                    "version": cdktf_version(),
+                },
+                "outputs": {self.id_: self.output_ids} if self.output_ids else {},
+            },
+            "data": self.data_sources or None,
+            "output": self.outputs or None,
+            "provider": self.providers,
+            "resource": self.resources or None,
+            "terraform": {
+                "backend": {"s3": self.backend},
+                "required_providers": {
+                    name: REQUIRED_PROVIDERS[name] for name in self.providers
+                },
+            },
+        }
+
+
+class NativeStack(NativeTerraformStack):
+    """Terraform JSON document equivalent to er_aws_rds.rds.Stack
+
+    The methods mirror the Stack ones. The input model is not mutated, the
+    aws_db_instance attributes are computed on a dump of it.
+    """
+
+    def __init__(
+        self,
+        id_: str,
+        app_interface_input: AppInterfaceInput,
+        profiler: SynthProfiler | None = None,
+        *,
+        split_stacks: bool = False,
+    ) -> None:
+        super().__init__(id_)
+        self.data = app_interface_input.data
+        self.provision = app_interface_input.provision
+        self.db: dict[str, Any] = self.data.model_dump(exclude_none=True)
+        self.db_dependencies: list[str] = []
+        self.profiler = profiler
+        with self._phase("providers"):
+            self._init_providers()
+        self.sub_stacks = {
+            name: NativeSubStack(id_, app_interface_input, name)
+            for name in (sub_stack_names(self.data) if split_stacks else [])
+        }
+        self.dependencies = [s.id_ for s in self.sub_stacks.values()]
+        self._run()
+
+    def _phase(self, name: str) -> AbstractContextManager[None]:
+        return profile_phase(
+            self.profiler, f"stack/{name}", lambda: len(self.construct_ids)
+        )
+
+    def _stack(self, sub_stack: str) -> NativeTerraformStack:
+        """The stack of the resources of sub_stack, this one when not split"""
+        return self.sub_stacks.get(sub_stack, self)
+
+    def _init_providers(self) -> None:
+        self._s3_backend(
+            self.provision, self.provision.module_provision_data.tf_state_key
+        )
+        self._provider(
+            "aws", "Aws", region=self.data.region, default_tags=self.data.default_tags
+        )
+        self._provider("random", "Random")
+
+    def _populate_parameter_group(
+        self,
+        pg: ParameterGroup,
+        db_identifier: str,
+        tags: dict[str, str],
+        *,
+        referenced: bool = True,
+    ) -> str:
+        if pg.shared:
+            return parameter_group_name(pg)
+
+        pg_name = db_parameter_group_name(pg, db_identifier)
+        stack = self._stack(PARAMETER_GROUPS)
+        split = {"skip_destroy": True} if stack is not self else {}
+        address = stack._resource(  # noqa: SLF001
+            "aws_db_parameter_group",
+            pg_name,
+            name=pg_name,
+            family=pg.family,
+            description=pg.description,
+            parameter=[p.model_dump(exclude_none=True) for p in pg.parameters or []],
+            tags=tags if stack is self else {**tags, OWNER_TAG: db_identifier},
+            **split,
+            lifecycle={"create_before_destroy": True},
+        )
+        if stack is not self:
+            # cdktf only outputs the attributes referenced by another stack
+            if not referenced:
+                return pg_name
+            output = stack._cross_stack_output(f"{address}.name")  # noqa: SLF001
+            return f"${{{self._remote_state(stack)}.outputs.{output}}}"
+        self.db_dependencies.append(address)
+        return pg_name
+
+    def _parameter_groups(self) -> None:
+        if self.data.parameter_group:
+            self.db["parameter_group_name"] = self._populate_parameter_group(
+                self.data.parameter_group,
+                self.data.identifier,
+                self.data.tags,
+            )
+
+        if self.data.old_parameter_group:
+            self._populate_parameter_group(
+                self.data.old_parameter_group,
+                self.data.identifier,
+                self.data.tags,
+                referenced=False,
+            )
+
+    def _password(self) -> None:
+        address = self._resource(
+            "random_password",
+            f"{self.data.identifier}-password",
+            length=20,
+            special=False,
+            min_numeric=0,
+            keepers={"reset_password": self.data.reset_password or ""},
+        )
+        self.db["password"] = f"${{{address}.result}}"
+
+    def _enhanced_monitoring(self) -> None:
+        if uses_shared_monitoring_role(self.data):
+            if not self.data.monitoring_role_arn:
+                role = self._data(
+                    "aws_iam_role",
+                    "data-enhanced-monitoring",
+                    name=monitoring_role_name(self.data.aws_partition),
+                )
+                self.db["monitoring_role_arn"] = f"${{{role}.arn}}"
+            return
+
+        if self.data.enhanced_monitoring:
+            stack = self._stack(ENHANCED_MONITORING)
+            m_role = stack._resource(  # noqa: SLF001
+                "aws_iam_role",
+                self.data.identifier + "-enhanced-monitoring",
+                assume_role_policy=json.dumps(ENHANCED_MONITORING_ASSUME_ROLE_POLICY),
+            )
+
+            stack._resource(  # noqa: SLF001
+                "aws_iam_role_policy_attachment",
+                f"{self.data.identifier}-policy-attachment",
+                role=f"${{{m_role}.name}}",
+                policy_arn=enhanced_monitoring_policy_arn(self.data.aws_partition),
+            )
+
+    def _db_replicas(self) -> None:
+        if self.data.replica_source:
+            self.db["backup_retention_period"] = 0
+            source_db_identifier = self.data.replica_source.identifier
+            source_db_region = self.data.replica_source.region
+
+            if self.data.region != self.data.replica_source.region:
+                alias = f"AWS-{source_db_region}"
+                self._construct(alias)
+                self.providers["aws"].append({
+                    "region": source_db_region,
+                    "alias": alias,
+                })
+                source_db = self._data(
+                    "aws_db_instance",
+                    f"data-{source_db_identifier}",
+                    db_instance_identifier=source_db_identifier,
+                    provider=f"aws.{alias}",
+                )
+                self.db["replicate_source_db"] = f"${{{source_db}.db_instance_arn}}"
+            else:
+                source_db = self._data(
+                    "aws_db_instance",
+                    f"data-{source_db_identifier}",
+                    db_instance_identifier=source_db_identifier,
+                )
+                self.db["replicate_source_db"] = (
+                    f"${{{source_db}.db_instance_identifier}}"
+                )
+                self.db.pop("db_subnet_group_name", None)
+
+    def _kms_key(self) -> None:
+        if self.data.kms_key_id and not self.data.kms_key_id.startswith("arn:"):
+            data_kms = self._data(
+                "aws_kms_key", "data-kms", key_id=f"{self.data.kms_key_id}"
+            )
+            self.db["kms_key_id"] = f"${{{data_kms}.arn}}"
+
+    def _db_instance(self) -> str:
+        id_ = self.db.pop("id_")
+        unknown = set(self.db) - DB_INSTANCE_ATTRIBUTES
+        if unknown:
+            msg = f"DbInstance got unexpected attributes: {sorted(unknown)}"
+            raise TypeError(msg)
+        return self._resource(
+            "aws_db_instance", id_, **self.db, depends_on=self.db_dependencies
+        )
+
+    def _event_notifications(self, db_instance: str) -> None:
+        topics: dict[str, str] = {}
+        for en in merge_event_notifications(self.data.event_notifications or []):
+            if en.destination.startswith("arn:"):
+                sns_topic_arn = en.destination
+            elif en.arn:
+                sns_topic_arn = en.arn
+            elif en.destination in topics:
+                sns_topic_arn = topics[en.destination]
+            else:
+                dsid = "data_" + en.destination
+                d = self._data("aws_sns_topic", dsid, name=en.destination)
+                sns_topic_arn = topics[en.destination] = f"${{{d}.arn}}"
+
+            self._resource(
+                "aws_db_event_subscription",
+                f"{en.destination}_{en.source_type}_event_subs",
+                sns_topic=sns_topic_arn,
+                source_type=event_source_type(en),
+                source_ids=[f"${{{db_instance}.id}}"],
+                event_categories=en.event_categories,
+            )
+
+    def _outputs(self, db_instance: str) -> None:
+        prefix = self.data.output_prefix
+        self._output(prefix + "__db_host", value=f"${{{db_instance}.address}}")
+        self._output(prefix + "__db_port", value=f"${{{db_instance}.port}}")
+        self._output(
+            prefix + "__db_name",
+            value=self.data.output_resource_db_name or f"${{{db_instance}.db_name}}",
+        )
+
+        if self.data.ca_cert:
+            self._output(
+                prefix + "__db_ca_cert",
+                sensitive=False,
+                value=self.data.ca_cert.to_vault_ref(),
+            )
+
+        if not (
+            self.data.replica_source
+            or self.data.replicate_source_db
+            or self.data.snapshot_identifier
+        ):
+            self._output(
+                prefix + "__db_user",
+                value=f"${{{db_instance}.username}}",
+                sensitive=True,
+            )
+            self._output(
+                prefix + "__db_password",
+                value=f"${{{db_instance}.password}}",
+                sensitive=True,
+            )
+            if self.data.reset_password:
+                self._output(
+                    prefix + "__reset_password", value=self.data.reset_password
+                )
+
+    def _run(self) -> None:
+        with self._phase("password"):
+            self._password()
+        with self._phase("parameter_groups"):
+            self._parameter_groups()
+        with self._phase("enhanced_monitoring"):
+            self._enhanced_monitoring()
+        with self._phase("db_replicas"):
+            self._db_replicas()
+        with self._phase("kms_key"):
+            self._kms_key()
+        with self._phase("db_instance"):
+            db_instance = self._db_instance()
+        with self._phase("event_notifications"):
+            self._event_notifications(db_instance)
+        with self._phase("outputs"):
+            self._outputs(db_instance)
+
+
+class NativeSubStack(NativeTerraformStack):
+    """Terraform JSON document equivalent to er_aws_rds.rds.SubStack"""
+
+    def __init__(
+        self, id_: str, app_interface_input: AppInterfaceInput, name: str
+    ) -> None:
+        super().__init__(sub_stack_id(id_, name))
+        data = app_interface_input.data
+        self._s3_backend(
+            app_interface_input.provision,
+            sub_stack_state_key(app_interface_input.provision, name),
+        )
+        self._provider("aws", "Aws", region=data.region, default_tags=data.default_tags)
+
+
+class NativeSharedParameterGroupStack(NativeTerraformStack):
+    """Terraform JSON document equivalent to er_aws_rds.rds.SharedParameterGroupStack"""
+
+    def __init__(
+        self, id_: str, app_interface_input: AppInterfaceInput, pg: ParameterGroup
+    ) -> None:
+        super().__init__(id_)
+        data = app_interface_input.data
+        pg_name = parameter_group_name(pg)
+        self._s3_backend(
+            app_interface_input.provision,
+            shared_state_key(app_interface_input.provision, data.region, pg_name),
+        )
+        self._provider("aws", "Aws", region=data.region)
+        self._resource(
+            "aws_db_parameter_group",
+            pg_name,
+            name=pg_name,
+            family=pg.family,
+            description=pg.description,
+            parameter=[p.model_dump(exclude_none=True) for p in pg.parameters or []],
+            lifecycle={"prevent_destroy": True},
+        )
+
+
+class NativeSharedMonitoringRoleStack(NativeTerraformStack):
+    """Terraform JSON document equivalent to er_aws_rds.rds.SharedMonitoringRoleStack"""
+
+    def __init__(self, id_: str, app_interface_input: AppInterfaceInput) -> None:
+        super().__init__(id_)
+        data = app_interface_input.data
+        role_name = monitoring_role_name(data.aws_partition)
+        self._s3_backend(
+            app_interface_input.provision,
+            shared_state_key(app_interface_input.provision, GLOBAL_REGION, role_name),
+        )
+        self._provider("aws", "Aws", region=data.region)
+        role = self._resource(
+            "aws_iam_role",
+            role_name,
+            name=role_name,
+            assume_role_policy=json.dumps(ENHANCED_MONITORING_ASSUME_ROLE_POLICY),
+            lifecycle={"prevent_destroy": True},
+        )
+        self._resource(
+            "aws_iam_role_policy_attachment",
+            f"{role_name}-policy-attachment",
+            role=f"${{{role}.name}}",
+            policy_arn=enhanced_monitoring_policy_arn(data.aws_partition),
+            lifecycle={"prevent_destroy": True},
+        )
+
+
+def manifest(stacks: list[NativeTerraformStack]) -> dict[str, Any]:
+    """The cdktf manifest.json document"""
+    return {
+        "stacks": {
+            stack.id_: {
+                "annotations": [],
+                "constructPath": stack.id_,
+                "dependencies": stack.dependencies,
+                "name": stack.id_,
+                "stackMetadataPath": f"stacks/{stack.id_}/metadata.json",
+                "synthesizedStackPath": f"stacks/{stack.id_}/cdk.tf.json",
+                "workingDirectory": f"stacks/{stack.id_}",
+            }
+            for stack in stacks
+        },
+        "version": cdktf_version(),
+    }
+
+
+def build_stacks(
+    ai_input: AppInterfaceInput,
+    id_: str = "CDKTF",
+    profiler: SynthProfiler | None = None,
+    *,
+    split_stacks: bool | None = None,
+    destroy: bool | None = None,
+) -> list[NativeTerraformStack]:
+    """Every stack of ai_input, the init_cdktf_app counterpart"""
+    if destroy is None:
+        destroy = destroying()
+    shared: list[NativeTerraformStack] = [
+        NativeSharedParameterGroupStack(
+            shared_stack_id(id_, parameter_group_name(pg)), ai_input, pg
+        )
+        for pg in ([] if destroy else shared_parameter_groups(ai_input.data))
+    ]
+    if not destroy and uses_shared_monitoring_role(ai_input.data):
+        shared.append(
+            NativeSharedMonitoringRoleStack(
+                shared_stack_id(id_, monitoring_role_name(ai_input.data.aws_partition)),
+                ai_input,
+            )
+        )
+    if split_stacks is None:
+        split_stacks = ai_input.data.split_stacks
+    stack = NativeStack(id_, ai_input, profiler=profiler, split_stacks=split_stacks)
+    stack.dependencies += [s.id_ for s in shared]
+    return [*shared, *stack.sub_stacks.values(), stack]
+
+
+def synth_native(
+    ai_input: AppInterfaceInput,
+    outdir: str,
+    id_: str = "CDKTF",
+    profiler: SynthProfiler | None = None,
+    *,
+    destroy: bool | None = None,
+) -> None:
+    """Writes the synth output of ai_input into outdir without cdktf"""
+    with profile_phase(profiler, "build_stacks"):
+        stacks = build_stacks(ai_input, id_=id_, profiler=profiler, destroy=destroy)
+    with profile_phase(profiler, "write"):
+        _write(stacks, outdir)
+
+
+def _write(stacks: list[NativeTerraformStack], outdir: str) -> None:
+    for stack in stacks:
+        stack_dir = Path(outdir) / "stacks" / stack.id_
+        stack_dir.mkdir(parents=True, exist_ok=True)
+        (stack_dir / "cdk.tf.json").write_text(
+            stable_stringify(stack.to_terraform()) or "", encoding="utf-8"
+        )
+    (Path(outdir) / "manifest.json").write_text(
+        stable_stringify(manifest(stacks)) or "", encoding="utf-8"
+    )
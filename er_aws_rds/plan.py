@@ -0,0 +1,173 @@
+"""Streaming reader of Terraform JSON plans
+
+TerraformJsonPlanParser loads and models the whole plan, including
+prior_state and planned_values, which dominate the size of big plans. The
+reader here scans the file in chunks, skips every top level section but
+resource_changes without decoding it and only models the resource changes
+of the requested types. Peak memory is bounded by the chunk size and the
+largest single resource change.
+"""
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from external_resources_io.terraform import Plan, ResourceChange
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"\s*")
+# Rest of a string after its opening quote
+_STRING_TAIL = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SKIP = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+_SCALAR_END = re.compile(r"[,\]}\s]")
+
+
+def _unexpected_end() -> ValueError:
+    return ValueError("Unexpected end of the plan file")
+
+
+class _Scanner:
+    """Chunked JSON scanner, only keeps the text of the value being read"""
+
+    def __init__(self, stream: IO[str], chunk_size: int) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.mark: int | None = None
+
+    def _fill(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            return False
+        keep = self.pos if self.mark is None else self.mark
+        self.buf = self.buf[keep:] + chunk
+        self.pos -= keep
+        if self.mark is not None:
+            self.mark = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non whitespace character, empty at the end of the file"""
+        while True:
+            match = _WHITESPACE.match(self.buf, self.pos)
+            self.pos = match.end() if match else self.pos
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consumes char"""
+        found = self.peek()
+        if found != char:
+            msg = f"Expected {char!r} in the plan file, found {found!r}"
+            raise ValueError(msg)
+        self.pos += 1
+
+    def read_string(self) -> str:
+        """Consumes and decodes the string at the current position"""
+        self.expect('"')
+        start = self.pos - 1
+        while True:
+            match = _STRING_TAIL.match(self.buf, self.pos)
+            if match:
+                self.pos = match.end()
+                return json.loads(self.buf[start : self.pos])
+            # Keep the string while reading the rest of it
+            self.pos = start
+            if not self._fill():
+                raise _unexpected_end()
+            start = self.pos
+            self.pos += 1
+
+    def skip_value(self) -> None:
+        """Consumes the value at the current position without decoding it"""
+        char = self.peek()
+        if char == '"':
+            self.read_string()
+        elif char in "{[":
+            depth = 0
+            while True:
+                # Whole strings and runs without brackets in one match
+                self.pos = _SKIP.match(self.buf, self.pos).end()  # type: ignore[union-attr]
+                if self.pos == len(self.buf) or self.buf[self.pos] == '"':
+                    # End of the buffer or of a string split across chunks
+                    if not self._fill():
+                        raise _unexpected_end()
+                    continue
+                depth += 1 if self.buf[self.pos] in "{[" else -1
+                self.pos += 1
+                if depth == 0:
+                    return
+        else:
+            while not (match := _SCALAR_END.search(self.buf, self.pos)):
+                self.pos = len(self.buf)
+                if not self._fill():
+                    return
+            self.pos = match.start()
+
+    def read_value(self) -> Any:  # noqa: ANN401
+        """Consumes and decodes the value at the current position"""
+        self.peek()
+        self.mark = self.pos
+        try:
+            self.skip_value()
+            return json.loads(self.buf[self.mark : self.pos])
+        finally:
+            self.mark = None
+
+    def skip_comma(self) -> None:
+        """Consumes an optional separator"""
+        if self.peek() == ",":
+            self.pos += 1
+
+
+def iter_resource_changes(
+    plan_path: str | Path,
+    types: Iterable[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[ResourceChange]:
+    """Yields the resource changes of a plan file, only those of types if given"""
+    wanted = set(types) if types is not None else None
+    with Path(plan_path).open(encoding="utf-8") as stream:
+        scanner = _Scanner(stream, chunk_size)
+        scanner.expect("{")
+        while scanner.peek() != "}":
+            key = scanner.read_string()
+            scanner.expect(":")
+            if key != "resource_changes" or scanner.peek() != "[":
+                scanner.skip_value()
+                scanner.skip_comma()
+                continue
+            scanner.expect("[")
+            while scanner.peek() != "]":
+                raw = scanner.read_value()
+                if wanted is None or raw.get("type") in wanted:
+                    yield ResourceChange.model_validate(raw)
+                scanner.skip_comma()
+            scanner.expect("]")
+            scanner.skip_comma()
+
+
+class StreamingPlanParser:
+    """TerraformJsonPlanParser counterpart that only keeps the resource changes of types
+
+    plan.resource_changes holds the matching changes, the rest of the Plan
+    fields are left empty.
+    """
+
+    def __init__(
+        self,
+        plan_path: str | Path,
+        types: Iterable[str] | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        self.plan = Plan(
+            resource_changes=list(
+                iter_resource_changes(plan_path, types=types, chunk_size=chunk_size)
+            )
+        )
@@ -0,0 +1,252 @@
+"""Pre-flight lookup of the source instances and snapshots of inputs
+
+replica_source, replicate_source_db and snapshot_identifier name AWS
+resources that must exist before the apply. They are gathered from every
+input and resolved with filtered describe_db_instances and
+describe_db_snapshots calls, batched per region, with the regions looked
+up concurrently. Available resources are cached in the lookup cache, the
+rest are looked up again on the next run. Source instances in a transient
+state (backing-up, modifying, ...) are usable. A snapshot is only needed
+to create the instance: once the instance exists, it is not checked.
+"""
+
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from external_resources_io.input import parse_model, read_input_from_file
+
+from er_aws_rds.aws import ClientRegistry, default_registry
+from er_aws_rds.errors import RDSLogicalReplicationError
+from er_aws_rds.input import AppInterfaceInput, Rds
+from er_aws_rds.lookup_cache import LookupCache, lookup_cache_from_env
+
+DB_INSTANCE = "db_instance"
+DB_SNAPSHOT = "db_snapshot"
+# Issue kind of an input that can't be read or validated
+INPUT = "input"
+# Values per describe filter
+BATCH_SIZE = 100
+
+_DESCRIBE = {
+    # kind: (operation, filter, result key, identifier key, ARN key)
+    DB_INSTANCE: (
+        "describe_db_instances",
+        "db-instance-id",
+        "DBInstances",
+        "DBInstanceIdentifier",
+        "DBInstanceArn",
+    ),
+    DB_SNAPSHOT: (
+        "describe_db_snapshots",
+        "db-snapshot-id",
+        "DBSnapshots",
+        "DBSnapshotIdentifier",
+        "DBSnapshotArn",
+    ),
+}
+_STATUS = {DB_INSTANCE: "DBInstanceStatus", DB_SNAPSHOT: "Status"}
+# Statuses of usable resources, the transient ones of an instance included
+USABLE_STATUSES = {
+    DB_INSTANCE: frozenset({
+        "available",
+        "backing-up",
+        "configuring-enhanced-monitoring",
+        "configuring-iam-database-auth",
+        "configuring-log-exports",
+        "maintenance",
+        "modifying",
+        "rebooting",
+        "renaming",
+        "resetting-master-credentials",
+        "storage-config-upgrade",
+        "storage-optimization",
+        "upgrading",
+    }),
+    DB_SNAPSHOT: frozenset({"available"}),
+}
+
+
+@dataclass(frozen=True)
+class Reference:
+    """An AWS resource an input depends on"""
+
+    source: str
+    kind: str
+    partition: str
+    region: str
+    identifier: str
+    # The instance created from the resource, the reference is not needed
+    # once it exists
+    dependent: "Reference | None" = None
+
+
+@dataclass
+class PreflightIssue:
+    """A reference that is missing or not available"""
+
+    source: str
+    kind: str
+    region: str
+    identifier: str
+    msg: str
+
+
+def _region(identifier: str, default: str) -> str:
+    # arn:aws:rds:<region>:<account>:db:<name>
+    return identifier.split(":")[3] if identifier.startswith("arn:") else default
+
+
+def references(data: Rds, source: str = "") -> list[Reference]:
+    """The source instances and snapshots data depends on"""
+    partition = data.aws_partition or "aws"
+    refs = []
+    if data.replica_source:
+        refs.append(
+            Reference(
+                source,
+                DB_INSTANCE,
+                partition,
+                data.replica_source.region,
+                data.replica_source.identifier,
+            )
+        )
+    if data.replicate_source_db:
+        refs.append(
+            Reference(
+                source,
+                DB_INSTANCE,
+                partition,
+                _region(data.replicate_source_db, data.region),
+                data.replicate_source_db,
+            )
+        )
+    if data.snapshot_identifier:
+        refs.append(
+            Reference(
+                source,
+                DB_SNAPSHOT,
+                partition,
+                _region(data.snapshot_identifier, data.region),
+                data.snapshot_identifier,
+                dependent=Reference(
+                    source, DB_INSTANCE, partition, data.region, data.identifier
+                ),
+            )
+        )
+    return refs
+
+
+def load_references(
+    sources: Iterable[str],
+) -> tuple[list[Reference], list[PreflightIssue]]:
+    """The references of the input files sources and the issues of the unusable ones
+
+    An input that can't be read or validated is reported as an INPUT issue,
+    the rest are still checked.
+    """
+    refs: list[Reference] = []
+    issues: list[PreflightIssue] = []
+    for source in sources:
+        try:
+            data = parse_model(AppInterfaceInput, read_input_from_file(source)).data
+        except (OSError, ValueError, RDSLogicalReplicationError) as e:
+            issues.append(
+                PreflightIssue(source, INPUT, "", "", f"{type(e).__name__}: {e}")
+            )
+            continue
+        refs.extend(references(data, source))
+    return refs, issues
+
+
+def _describe(
+    registry: ClientRegistry, kind: str, region: str, identifiers: Sequence[str]
+) -> dict[str, str]:
+    """Status of the existing identifiers, by identifier"""
+    operation, filter_name, result_key, id_key, arn_key = _DESCRIBE[kind]
+    paginator = registry.rds(region).get_paginator(operation)  # type: ignore[call-overload]
+    wanted = set(identifiers)
+    found: dict[str, str] = {}
+    for start in range(0, len(identifiers), BATCH_SIZE):
+        params: dict[str, Any] = {
+            "Filters": [
+                {
+                    "Name": filter_name,
+                    "Values": list(identifiers[start : start + BATCH_SIZE]),
+                }
+            ]
+        }
+        if kind == DB_SNAPSHOT:
+            params["IncludeShared"] = True
+        for page in paginator.paginate(**params):
+            for item in page[result_key]:
+                for key in (item[id_key], item.get(arn_key)):
+                    if key in wanted:
+                        found[key] = item[_STATUS[kind]]
+    return found
+
+
+def check_references(
+    refs: Iterable[Reference],
+    registry: ClientRegistry | None = None,
+    cache: LookupCache | None = None,
+    workers: int = 8,
+) -> list[PreflightIssue]:
+    """Resolves refs, one batch of calls per region, and reports the unavailable ones"""
+    registry = registry or default_registry()
+    cache = cache or lookup_cache_from_env()
+    refs = list(refs)
+    dependents = [ref.dependent for ref in refs if ref.dependent]
+
+    status: dict[tuple[str, str, str, str], str | None] = {}
+    batches: dict[tuple[str, str, str], list[str]] = {}
+    for ref in refs + dependents:
+        key = (ref.kind, ref.partition, ref.region, ref.identifier)
+        if key in status:
+            continue
+        status[key] = cache.get(ref.kind, key[1:])
+        if status[key] is None:
+            batches.setdefault(key[:3], []).append(ref.identifier)
+
+    def resolve(batch: tuple[tuple[str, str, str], list[str]]) -> None:
+        (kind, partition, region), identifiers = batch
+        for identifier, found in _describe(registry, kind, region, identifiers).items():
+            status[kind, partition, region, identifier] = found
+            if found == "available":
+                cache.set(kind, (partition, region, identifier), found)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() surfaces the API errors
+        list(executor.map(resolve, batches.items()))
+
+    issues = (_issue(ref, status) for ref in refs)
+    return [issue for issue in issues if issue]
+
+
+def _key(ref: Reference) -> tuple[str, str, str, str]:
+    return (ref.kind, ref.partition, ref.region, ref.identifier)
+
+
+def _issue(
+    ref: Reference, status: dict[tuple[str, str, str, str], str | None]
+) -> PreflightIssue | None:
+    """The issue of ref given the status of every reference, None if usable"""
+    if ref.dependent and status[_key(ref.dependent)] is not None:
+        return None
+    found = status[_key(ref)]
+    if found is None:
+        msg = f"{ref.kind} {ref.identifier} not found in {ref.region}"
+    elif found not in USABLE_STATUSES[ref.kind]:
+        msg = f"{ref.kind} {ref.identifier} in {ref.region} is {found}"
+    else:
+        return None
+    return PreflightIssue(ref.source, ref.kind, ref.region, ref.identifier, msg)
+
+
+def report(refs: Sequence[Reference], issues: Sequence[PreflightIssue]) -> dict:
+    """JSON serializable summary of issues"""
+    return {
+        "references": len(refs),
+        "issues": [asdict(issue) for issue in issues],
+    }
@@ -0,0 +1,139 @@
+"""Per phase instrumentation of the synth
+
+SynthProfiler records, for every phase of the synth (the Stack._run steps,
+the app construction and app.synth()), the wall time, the constructs added
+and the peak RSS of the process and of its children, the jsii Node process
+included. The report is written as JSON next to the synth output when
+ER_SYNTH_PROFILE=on.
+"""
+
+import json
+import os
+import resource
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+REPORT_FILE = "synth-profile.json"
+
+
+@dataclass
+class Phase:
+    """Measurements of a synth phase"""
+
+    name: str
+    wall_ms: float
+    constructs: int | None
+    peak_rss_kib: int
+    children_peak_rss_kib: int | None
+
+
+def _proc_children(pid: int) -> list[int]:
+    """Direct children of pid, from /proc (Linux only)"""
+    children: list[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children.extend(
+                int(c) for c in (task / "children").read_text(encoding="utf-8").split()
+            )
+        except OSError:
+            continue
+    return children
+
+
+def _status_kib(pid: int | str, field: str) -> int:
+    """field (VmRSS, VmHWM, ...) of /proc/<pid>/status, 0 if pid is gone"""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text(encoding="utf-8")
+    except OSError:
+        return 0
+    for line in status.splitlines():
+        if line.startswith(f"{field}:"):
+            return int(line.split()[1])
+    return 0
+
+
+def children_peak_rss_kib() -> int | None:
+    """Sum of the peak RSS of the running children, None without /proc
+
+    The jsii Node process runs for the whole life of the interpreter, so
+    RUSAGE_CHILDREN, which only counts waited for children, misses it.
+    """
+    if not Path("/proc/self/task").is_dir():
+        return None
+    return sum(_status_kib(child, "VmHWM") for child in _proc_children(os.getpid()))
+
+
+def rss_kib() -> int | None:
+    """Current RSS of the process and its children, None without /proc"""
+    if not Path("/proc/self/task").is_dir():
+        return None
+    pid = os.getpid()
+    return sum(_status_kib(p, "VmRSS") for p in (pid, *_proc_children(pid)))
+
+
+class SynthProfiler:
+    """Collects the Phase measurements of a synth"""
+
+    def __init__(self) -> None:
+        self.phases: list[Phase] = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(
+        self, name: str, constructs: Callable[[], int] | None = None
+    ) -> Iterator[None]:
+        """Measures the block as phase name
+
+        constructs counts the constructs of the stack, the phase records how
+        many it added.
+        """
+        before = constructs() if constructs else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append(
+                Phase(
+                    name=name,
+                    wall_ms=round((time.perf_counter() - start) * 1000, 3),
+                    constructs=constructs() - before if constructs else None,
+                    peak_rss_kib=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                    children_peak_rss_kib=children_peak_rss_kib(),
+                )
+            )
+
+    def report(self, **extra: Any) -> dict[str, Any]:  # noqa: ANN401
+        """JSON serializable report of the phases"""
+        return {
+            **extra,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "phases": [asdict(p) for p in self.phases],
+        }
+
+    def write(self, outdir: str, **extra: Any) -> None:  # noqa: ANN401
+        """Writes the report into outdir"""
+        Path(outdir, REPORT_FILE).write_text(
+            json.dumps(self.report(**extra), indent=2), encoding="utf-8"
+        )
+
+
+def profile_phase(
+    profiler: SynthProfiler | None,
+    name: str,
+    constructs: Callable[[], int] | None = None,
+) -> AbstractContextManager[None]:
+    """profiler.phase(name, constructs), a no-op without profiler"""
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name, constructs)
+
+
+def synth_profiler_from_env() -> SynthProfiler | None:
+    """A SynthProfiler if ER_SYNTH_PROFILE=on"""
+    if os.environ.get("ER_SYNTH_PROFILE", "off").lower() == "on":
+        return SynthProfiler()
+    return None
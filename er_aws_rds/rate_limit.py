@@ -0,0 +1,189 @@
+"""Client side rate limit of the AWS API calls
+
+RateLimiter keeps a token bucket per (account, region, operation). Every HTTP
+attempt, retries included, takes a token on the botocore before-send event,
+so the calls of all the threads stay within the API quota and retries slow
+down instead of piling up. A throttled response empties the bucket: every
+caller waits for it to refill, on top of the adaptive retry backoff of its
+client. With a directory, the buckets are files updated under an flock and
+every process of the host shares them.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from er_aws_rds.file_lock import file_lock
+from er_aws_rds.metrics import THROTTLING_ERROR_CODES, Metrics, default_metrics
+
+DEFAULT_RATE = 10.0
+
+# (tokens, updated)
+BucketState = tuple[float, float]
+
+
+@dataclass(frozen=True)
+class Limit:
+    """Sustained calls per second and burst size of a bucket"""
+
+    rate: float
+    burst: float
+
+
+DEFAULT_LIMIT = Limit(DEFAULT_RATE, DEFAULT_RATE)
+
+
+def _refill(state: BucketState | None, limit: Limit, now: float) -> float:
+    """Tokens of state at now"""
+    if state is None:
+        return limit.burst
+    tokens, updated = state
+    return min(limit.burst, tokens + max(0.0, now - updated) * limit.rate)
+
+
+class RateLimiter:
+    """Token buckets per (account, region, operation)
+
+    operations overrides the default limit of some operations, by operation
+    name (DescribeDBEngineVersions). The clock is shared by the processes
+    using the directory, it must be the wall clock.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        default: Limit = DEFAULT_LIMIT,
+        operations: Mapping[str, Limit] | None = None,
+        *,
+        directory: str | Path | None = None,
+        metrics: Metrics | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.default = default
+        self.operations = dict(operations or {})
+        self.directory = Path(directory) if directory else None
+        self.metrics = metrics
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: dict[tuple[str, ...], BucketState] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, operation: str) -> Limit:
+        """Limit of operation"""
+        return self.operations.get(operation, self.default)
+
+    def _update(
+        self, key: tuple[str, ...], update: Callable[[BucketState | None], BucketState]
+    ) -> None:
+        """Replaces the state of the bucket key with update(state), atomically"""
+        if not self.directory:
+            with self._lock:
+                self._buckets[key] = update(self._buckets.get(key))
+            return
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        with file_lock(self.directory / f"{digest}.bucket") as f:
+            f.seek(0)
+            content = f.read()
+            state: BucketState | None = None
+            if content:
+                tokens, updated = json.loads(content)
+                state = (tokens, updated)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(update(state)))
+
+    def acquire(self, account: str, region: str, operation: str) -> float:
+        """Takes a token of the bucket, waiting for it if empty. Returns the wait"""
+        limit = self.limit(operation)
+        wait = 0.0
+
+        def take(state: BucketState | None) -> BucketState:
+            nonlocal wait
+            now = self.clock()
+            # The token is reserved now, the caller waits for it outside the lock
+            tokens = _refill(state, limit, now) - 1
+            wait = max(0.0, -tokens / limit.rate)
+            return tokens, now
+
+        self._update((account, region, operation), take)
+        if wait:
+            self.sleep(wait)
+        if self.metrics:
+            self.metrics.observe(
+                "aws_rate_limit_wait_seconds", wait, region=region, operation=operation
+            )
+        return wait
+
+    def throttled(self, account: str, region: str, operation: str) -> None:
+        """Empties the bucket after a throttled attempt"""
+        limit = self.limit(operation)
+
+        def drain(state: BucketState | None) -> BucketState:
+            now = self.clock()
+            return min(_refill(state, limit, now), 0.0), now
+
+        self._update((account, region, operation), drain)
+
+    def install(self, client: Any, account: str, region: str) -> None:  # noqa: ANN401
+        """Rate limits the HTTP attempts of the botocore client"""
+
+        def before_send(event_name: str, **_: Any) -> None:  # noqa: ANN401
+            # before-send.<service>.<operation>, None lets the request through
+            self.acquire(account, region, event_name.rsplit(".", 1)[1])
+
+        def needs_retry(
+            response: tuple[Any, dict[str, Any]] | None,
+            operation: Any,  # noqa: ANN401
+            **_: Any,  # noqa: ANN401
+        ) -> None:
+            if response and response[1].get("Error", {}).get("Code") in (
+                THROTTLING_ERROR_CODES
+            ):
+                self.throttled(account, region, operation.name)
+
+        client.meta.events.register("before-send", before_send)
+        client.meta.events.register("needs-retry", needs_retry)
+
+
+def parse_limits(
+    spec: str, burst: float | None = None
+) -> tuple[Limit, dict[str, Limit]]:
+    """Default and per operation limits of "10,DescribeDBEngineVersions=2"
+
+    The burst is one second of calls unless given.
+    """
+    default = Limit(DEFAULT_RATE, burst or DEFAULT_RATE)
+    operations = {}
+    for item in filter(None, (i.strip() for i in spec.split(","))):
+        operation, _, value = item.rpartition("=")
+        limit = Limit(float(value), burst or float(value))
+        if operation:
+            operations[operation] = limit
+        else:
+            default = limit
+    return default, operations
+
+
+def rate_limiter_from_env() -> RateLimiter | None:
+    """RateLimiter configured by ER_RATE_LIMIT, None if unset or "off"
+
+    ER_RATE_LIMIT_BURST sets the bucket size and ER_RATE_LIMIT_DIR shares the
+    buckets with the other processes of the host.
+    """
+    spec = os.environ.get("ER_RATE_LIMIT", "off")
+    if spec.lower() == "off":
+        return None
+    burst = os.environ.get("ER_RATE_LIMIT_BURST")
+    default, operations = parse_limits(spec, float(burst) if burst else None)
+    return RateLimiter(
+        default,
+        operations,
+        directory=os.environ.get("ER_RATE_LIMIT_DIR"),
+        metrics=default_metrics(),
+    )
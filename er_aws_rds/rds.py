@@ -1,5 +1,5 @@
 import json
-from typing import ClassVar
+from contextlib import AbstractContextManager
 
 from cdktf import (
     ITerraformDependable,
@@ -9,6 +9,7 @@ from cdktf import (
     TerraformStack,
 )
 from cdktf_cdktf_provider_aws.data_aws_db_instance import DataAwsDbInstance
+from cdktf_cdktf_provider_aws.data_aws_iam_role import DataAwsIamRole
 from cdktf_cdktf_provider_aws.data_aws_kms_key import DataAwsKmsKey
 from cdktf_cdktf_provider_aws.data_aws_sns_topic import DataAwsSnsTopic
 from cdktf_cdktf_provider_aws.db_event_subscription import DbEventSubscription
@@ -24,23 +25,75 @@ from cdktf_cdktf_provider_random.password import Password
 from cdktf_cdktf_provider_random.provider import RandomProvider
 from constructs import Construct
 
-from er_aws_rds.input import AppInterfaceInput, ParameterGroup
+from er_aws_rds.input import (
+    AppInterfaceInput,
+    ParameterGroup,
+    event_source_type,
+    merge_event_notifications,
+)
+from er_aws_rds.profiling import SynthProfiler, profile_phase
+from er_aws_rds.shared import (
+    ENHANCED_MONITORING_ASSUME_ROLE_POLICY,
+    GLOBAL_REGION,
+    db_parameter_group_name,
+    enhanced_monitoring_policy_arn,
+    monitoring_role_name,
+    parameter_group_name,
+    shared_state_key,
+    uses_shared_monitoring_role,
+)
+from er_aws_rds.sub_stacks import (
+    ENHANCED_MONITORING,
+    OWNER_TAG,
+    PARAMETER_GROUPS,
+    sub_stack_id,
+    sub_stack_names,
+    sub_stack_state_key,
+)
 
 
 class Stack(TerraformStack):
-    "AWS RDS Stack"
+    """AWS RDS Stack
 
-    db_dependencies: ClassVar[list[ITerraformDependable]] = []
+    With split_stacks, the parameter groups and the enhanced monitoring role
+    are created in SubStacks, see er_aws_rds.sub_stacks.
+    """
 
     def __init__(
-        self, scope: Construct, id_: str, app_interface_input: AppInterfaceInput
+        self,
+        scope: Construct,
+        id_: str,
+        app_interface_input: AppInterfaceInput,
+        profiler: SynthProfiler | None = None,
+        *,
+        split_stacks: bool = False,
     ) -> None:
         super().__init__(scope, id_)
-        self.data = app_interface_input.data
+        # Instance scoped. Stacks in the same process must not share dependencies
+        self.db_dependencies: list[ITerraformDependable] = []
+        # _run sets top level fields (password, parameter_group_name,
+        # replicate_source_db, ...) to tokens, on a copy: the input is reused by
+        # the caller, e.g. the cache key, validation or another synth
+        self.data = app_interface_input.data.model_copy()
         self.provision = app_interface_input.provision
-        self._init_providers()
+        self.profiler = profiler
+        with self._phase("providers"):
+            self._init_providers()
+        self.sub_stacks: dict[str, SubStack] = {}
+        for name in sub_stack_names(self.data) if split_stacks else []:
+            self.sub_stacks[name] = SubStack(scope, id_, app_interface_input, name)
+            self.add_dependency(self.sub_stacks[name])
         self._run()
 
+    def _scope(self, sub_stack: str) -> TerraformStack:
+        """The stack of the resources of sub_stack, this one when not split"""
+        return self.sub_stacks.get(sub_stack, self)
+
+    def _phase(self, name: str) -> AbstractContextManager[None]:
+        return profile_phase(
+            self.profiler, f"stack/{name}", lambda: len(self.node.children)
+        )
+
     def _init_providers(self) -> None:
         S3Backend(
             self,
@@ -62,6 +115,10 @@ class Stack(TerraformStack):
     def _populate_parameter_group(
         self, pg: ParameterGroup, db_identifier: str, tags: dict[str, str]
     ) -> str:
+        if pg.shared:
+            # Managed by its SharedParameterGroupStack, only referenced by name
+            return parameter_group_name(pg)
+
         # Dumping the whole parameter group doesn't work. "Parameter" values are populated correctly
         # but CDKTF does not take the apply_method attribute.
         # I don't know/understand why. Dumping the parameters separately works well.
@@ -70,10 +127,11 @@ class Stack(TerraformStack):
         # With this model each database will have it's own PG
         # No re-use. If a common PG is changed in AppInterface, all dependant
         # database PGs will be reconciled
-        pg_name = f"{db_identifier}-{pg.name or 'pg'}"
+        pg_name = db_parameter_group_name(pg, db_identifier)
 
+        scope = self._scope(PARAMETER_GROUPS)
         dbpg = DbParameterGroup(
-            self,
+            scope,
             id_=pg_name,
             name=pg_name,
             family=pg.family,
@@ -82,10 +140,16 @@ class Stack(TerraformStack):
                 DbParameterGroupParameter(**p.model_dump(exclude_none=True))
                 for p in pg.parameters or []
             ],
-            tags=tags,
+            tags=tags if scope is self else {**tags, OWNER_TAG: db_identifier},
+            # The sub-stack is applied before the instance moves off a replaced
+            # group. See er_aws_rds.sub_stacks
+            skip_destroy=True if scope is not self else None,
             lifecycle=TerraformResourceLifecycle(create_before_destroy=True),
         )
 
+        if scope is not self:
+            # depends_on can't cross stacks, the cross-stack reference orders them
+            return dbpg.name
         self.db_dependencies.append(dbpg)
         return pg_name
 
@@ -118,29 +182,30 @@ class Stack(TerraformStack):
         ).result
 
     def _enhanced_monitoring(self) -> None:
+        if uses_shared_monitoring_role(self.data):
+            # Managed by its SharedMonitoringRoleStack, only referenced by name
+            if not self.data.monitoring_role_arn:
+                role = DataAwsIamRole(
+                    self,
+                    id_="data-enhanced-monitoring",
+                    name=monitoring_role_name(self.data.aws_partition),
+                )
+                self.data.monitoring_role_arn = role.arn
+            return
+
         if self.data.enhanced_monitoring:
-            assume_role_policy = {
-                "Version": "2012-10-17",
-                "Statement": [
-                    {
-                        "Action": "sts:AssumeRole",
-                        "Principal": {"Service": "monitoring.rds.amazonaws.com"},
-                        "Effect": "Allow",
-                    }
-                ],
-            }
+            scope = self._scope(ENHANCED_MONITORING)
             m_role = IamRole(
-                self,
+                scope,
                 id_=self.data.identifier + "-enhanced-monitoring",
-                assume_role_policy=json.dumps(assume_role_policy),
+                assume_role_policy=json.dumps(ENHANCED_MONITORING_ASSUME_ROLE_POLICY),
             )
 
-            policy_arn = f"arn:{self.data.aws_partition}:iam::aws:policy/service-role/AmazonRDSEnhancedMonitoringRole"
             IamRolePolicyAttachment(
-                self,
+                scope,
                 id_=f"{self.data.identifier}-policy-attachment",
                 role=m_role.name,
-                policy_arn=policy_arn,
+                policy_arn=enhanced_monitoring_policy_arn(self.data.aws_partition),
             )
 
     def _db_replicas(self) -> None:
@@ -189,20 +254,27 @@ class Stack(TerraformStack):
         )
 
     def _event_notifications(self, db_instance: DbInstance) -> None:
-        # Event Notifications
-        for en in self.data.event_notifications or []:
+        # Event Notifications, one subscription per (topic, source_type)
+        topics: dict[str, str] = {}
+        for en in merge_event_notifications(self.data.event_notifications or []):
             if en.destination.startswith("arn:"):
                 sns_topic_arn = en.destination
+            elif en.arn:
+                sns_topic_arn = en.arn
+            elif en.destination in topics:
+                sns_topic_arn = topics[en.destination]
             else:
                 dsid = "data_" + en.destination
                 d = DataAwsSnsTopic(self, id_=dsid, name=en.destination)
-                sns_topic_arn = d.arn
+                sns_topic_arn = topics[en.destination] = d.arn
 
             DbEventSubscription(
                 self,
                 id_=f"{en.destination}_{en.source_type}_event_subs",
                 sns_topic=sns_topic_arn,
+                source_type=event_source_type(en),
                 source_ids=[db_instance.id],
+                event_categories=en.event_categories,
             )
 
     def _outputs(self, db_instance: DbInstance) -> None:
@@ -251,11 +323,129 @@ class Stack(TerraformStack):
                 )
 
     def _run(self) -> None:
-        self._password()
-        self._parameter_groups()
-        self._enhanced_monitoring()
-        self._db_replicas()
-        self._kms_key()
-        db_instance = self._db_instance()
-        self._event_notifications(db_instance)
-        self._outputs(db_instance)
+        with self._phase("password"):
+            self._password()
+        with self._phase("parameter_groups"):
+            self._parameter_groups()
+        with self._phase("enhanced_monitoring"):
+            self._enhanced_monitoring()
+        with self._phase("db_replicas"):
+            self._db_replicas()
+        with self._phase("kms_key"):
+            self._kms_key()
+        with self._phase("db_instance"):
+            db_instance = self._db_instance()
+        with self._phase("event_notifications"):
+            self._event_notifications(db_instance)
+        with self._phase("outputs"):
+            self._outputs(db_instance)
+
+
+class SubStack(TerraformStack):
+    """Resources of the database stack id_ split into the sub-stack name
+
+    See er_aws_rds.sub_stacks for the naming and state of sub-stacks.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        id_: str,
+        app_interface_input: AppInterfaceInput,
+        name: str,
+    ) -> None:
+        super().__init__(scope, sub_stack_id(id_, name))
+        data = app_interface_input.data
+        provision = app_interface_input.provision
+        S3Backend(
+            self,
+            bucket=provision.module_provision_data.tf_state_bucket,
+            key=sub_stack_state_key(provision, name),
+            encrypt=True,
+            region=provision.module_provision_data.tf_state_region,
+            dynamodb_table=provision.module_provision_data.tf_state_dynamodb_table,
+            profile="external-resources-state",
+        )
+        AwsProvider(self, "Aws", region=data.region, default_tags=data.default_tags)
+
+
+class SharedParameterGroupStack(TerraformStack):
+    """Parameter group shared by the databases with the same parameters
+
+    See er_aws_rds.shared for the naming and lifecycle of shared resources.
+    """
+
+    def __init__(
+        self,
+        scope: Construct,
+        id_: str,
+        app_interface_input: AppInterfaceInput,
+        pg: ParameterGroup,
+    ) -> None:
+        super().__init__(scope, id_)
+        data = app_interface_input.data
+        provision = app_interface_input.provision
+        pg_name = parameter_group_name(pg)
+        S3Backend(
+            self,
+            bucket=provision.module_provision_data.tf_state_bucket,
+            key=shared_state_key(provision, data.region, pg_name),
+            encrypt=True,
+            region=provision.module_provision_data.tf_state_region,
+            dynamodb_table=provision.module_provision_data.tf_state_dynamodb_table,
+            profile="external-resources-state",
+        )
+        # No default_tags, they belong to the database that happens to synth
+        # the stack and would flap between the databases sharing the group
+        AwsProvider(self, "Aws", region=data.region)
+        DbParameterGroup(
+            self,
+            id_=pg_name,
+            name=pg_name,
+            family=pg.family,
+            description=pg.description,
+            parameter=[
+                DbParameterGroupParameter(**p.model_dump(exclude_none=True))
+                for p in pg.parameters or []
+            ],
+            lifecycle=TerraformResourceLifecycle(prevent_destroy=True),
+        )
+
+
+class SharedMonitoringRoleStack(TerraformStack):
+    """Enhanced monitoring role shared by the databases of the account
+
+    See er_aws_rds.shared for the naming and lifecycle of shared resources.
+    """
+
+    def __init__(
+        self, scope: Construct, id_: str, app_interface_input: AppInterfaceInput
+    ) -> None:
+        super().__init__(scope, id_)
+        data = app_interface_input.data
+        provision = app_interface_input.provision
+        role_name = monitoring_role_name(data.aws_partition)
+        S3Backend(
+            self,
+            bucket=provision.module_provision_data.tf_state_bucket,
+            key=shared_state_key(provision, GLOBAL_REGION, role_name),
+            encrypt=True,
+            region=provision.module_provision_data.tf_state_region,
+            dynamodb_table=provision.module_provision_data.tf_state_dynamodb_table,
+            profile="external-resources-state",
+        )
+        AwsProvider(self, "Aws", region=data.region)
+        role = IamRole(
+            self,
+            id_=role_name,
+            name=role_name,
+            assume_role_policy=json.dumps(ENHANCED_MONITORING_ASSUME_ROLE_POLICY),
+            lifecycle=TerraformResourceLifecycle(prevent_destroy=True),
+        )
+        IamRolePolicyAttachment(
+            self,
+            id_=f"{role_name}-policy-attachment",
+            role=role.name,
+            policy_arn=enhanced_monitoring_policy_arn(data.aws_partition),
+            lifecycle=TerraformResourceLifecycle(prevent_destroy=True),
+        )
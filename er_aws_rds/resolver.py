@@ -0,0 +1,211 @@
+"""Synth time resolution of KMS key aliases and SNS topic names to ARNs
+
+Without it, a kms_key_id alias and every event notification destination
+that is not an ARN become aws_kms_key and aws_sns_topic data sources,
+queried again by every plan and refresh, and so is the shared enhanced
+monitoring role. resolve_arns looks them up ahead of synth and returns an
+input carrying the ARNs, the stacks then embed them as literals. Names that
+cannot be resolved keep their data source.
+
+AwsArnResolver lists the aliases and topics of a region once (list_aliases
+and list_topics pages) and keeps the maps in the lookup cache. Keys and
+roles that are not found are cached for NOT_FOUND_TTL seconds only, they
+may be created meanwhile. StaticArnResolver answers from a fixed mapping,
+for tests and offline runs.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.shared import monitoring_role_name, uses_shared_monitoring_role
+
+if TYPE_CHECKING:
+    from er_aws_rds.aws import ClientRegistry
+    from er_aws_rds.lookup_cache import LookupCache
+
+# Seconds a key or role that was not found is cached
+NOT_FOUND_TTL = 300
+
+
+class ArnResolver(ABC):
+    """Maps KMS key ids and aliases and SNS topic names of a region to ARNs"""
+
+    @abstractmethod
+    def kms_key_arn(self, partition: str, region: str, key_id: str) -> str | None:
+        """ARN of the KMS key key_id (alias/<name> or a key id), None if unknown"""
+
+    @abstractmethod
+    def sns_topic_arn(self, partition: str, region: str, name: str) -> str | None:
+        """ARN of the SNS topic name, None if unknown"""
+
+    @abstractmethod
+    def iam_role_arn(self, partition: str, region: str, name: str) -> str | None:
+        """ARN of the IAM role name, looked up from region, None if unknown"""
+
+
+class StaticArnResolver(ArnResolver):
+    """Resolver of a fixed mapping
+
+    {"kms": {region: {key_id: arn}}, "sns": {region: {name: arn}}, "iam": {name: arn}}
+    """
+
+    def __init__(self, mapping: Mapping[str, Any]) -> None:
+        self.mapping = mapping
+
+    @classmethod
+    def load(cls, path: str | Path) -> "StaticArnResolver":
+        """Resolver of a JSON mapping file"""
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def kms_key_arn(self, partition: str, region: str, key_id: str) -> str | None:  # noqa: ARG002
+        """ARN of the KMS key key_id in the mapping"""
+        return self.mapping.get("kms", {}).get(region, {}).get(key_id)
+
+    def sns_topic_arn(self, partition: str, region: str, name: str) -> str | None:  # noqa: ARG002
+        """ARN of the SNS topic name in the mapping"""
+        return self.mapping.get("sns", {}).get(region, {}).get(name)
+
+    def iam_role_arn(self, partition: str, region: str, name: str) -> str | None:  # noqa: ARG002
+        """ARN of the IAM role name in the mapping"""
+        return self.mapping.get("iam", {}).get(name)
+
+
+class AwsArnResolver(ArnResolver):
+    """Resolver backed by the KMS and SNS APIs"""
+
+    def __init__(
+        self,
+        registry: "ClientRegistry | None" = None,
+        cache: "LookupCache | None" = None,
+    ) -> None:
+        # boto3 is imported by the registry, only when the resolver is used
+        from er_aws_rds.aws import default_registry  # noqa: PLC0415
+        from er_aws_rds.lookup_cache import lookup_cache_from_env  # noqa: PLC0415
+
+        self.registry = registry or default_registry()
+        self.cache = cache or lookup_cache_from_env()
+
+    def _lookup(
+        self, namespace: str, key: tuple[str, ...], fetch: Callable[[], str | None]
+    ) -> str | None:
+        """fetch() through the cache, a not found (None) for NOT_FOUND_TTL only"""
+        not_found = f"{namespace}_not_found"
+        if self.cache.get(not_found, key):
+            return None
+        arn = self.cache.get_or_set(namespace, key, fetch)
+        if arn is None:
+            self.cache.set(not_found, key, value=True, ttl=NOT_FOUND_TTL)
+        return arn
+
+    def _kms_aliases(self, partition: str, region: str) -> dict[str, str]:
+        """Key ARNs of the aliases of region, by alias name"""
+
+        def list_aliases() -> dict[str, str]:
+            paginator = self.registry.client("kms", region).get_paginator(
+                "list_aliases"
+            )
+            aliases = {}
+            for page in paginator.paginate():
+                for alias in page["Aliases"]:
+                    if "TargetKeyId" not in alias:
+                        continue  # Alias of no key
+                    # arn:<partition>:kms:<region>:<account>:alias/<name>
+                    prefix = alias["AliasArn"].rsplit(":", 1)[0]
+                    aliases[alias["AliasName"]] = f"{prefix}:key/{alias['TargetKeyId']}"
+            return aliases
+
+        return self.cache.get_or_set(
+            "kms_list_aliases", (partition, region), list_aliases
+        )
+
+    def kms_key_arn(self, partition: str, region: str, key_id: str) -> str | None:
+        """ARN of the KMS key key_id, aliases are resolved from list_aliases"""
+        if key_id.startswith("alias/"):
+            return self._kms_aliases(partition, region).get(key_id)
+
+        def describe_key() -> str | None:
+            client = self.registry.client("kms", region)
+            try:
+                return client.describe_key(KeyId=key_id)["KeyMetadata"]["Arn"]
+            except client.exceptions.NotFoundException:
+                return None
+
+        return self._lookup(
+            "kms_describe_key", (partition, region, key_id), describe_key
+        )
+
+    def sns_topic_arn(self, partition: str, region: str, name: str) -> str | None:
+        """ARN of the SNS topic name, from list_topics"""
+
+        def list_topics() -> dict[str, str]:
+            paginator = self.registry.client("sns", region).get_paginator("list_topics")
+            return {
+                topic["TopicArn"].rsplit(":", 1)[1]: topic["TopicArn"]
+                for page in paginator.paginate()
+                for topic in page["Topics"]
+            }
+
+        return self.cache.get_or_set(
+            "sns_list_topics", (partition, region), list_topics
+        ).get(name)
+
+    def iam_role_arn(self, partition: str, region: str, name: str) -> str | None:
+        """ARN of the IAM role name, from get_role"""
+
+        def get_role() -> str | None:
+            # IAM is global, any region of the partition answers
+            client = self.registry.client("iam", region)
+            try:
+                return client.get_role(RoleName=name)["Role"]["Arn"]
+            except client.exceptions.NoSuchEntityException:
+                return None
+
+        return self._lookup("iam_get_role", (partition, name), get_role)
+
+
+@cache
+def default_aws_resolver() -> AwsArnResolver:
+    """Process wide AwsArnResolver, its lookups are shared by every synth"""
+    return AwsArnResolver()
+
+
+def resolve_arns(
+    ai_input: AppInterfaceInput, resolver: ArnResolver
+) -> AppInterfaceInput:
+    """A copy of ai_input with the KMS key, SNS topic and monitoring role ARNs resolved"""
+    resolved = ai_input.model_copy(deep=True)
+    data = resolved.data
+    partition = data.aws_partition or "aws"
+    if data.kms_key_id and not data.kms_key_id.startswith("arn:"):
+        data.kms_key_id = (
+            resolver.kms_key_arn(partition, data.region, data.kms_key_id)
+            or data.kms_key_id
+        )
+    for en in data.event_notifications or []:
+        if not en.destination.startswith("arn:"):
+            en.arn = resolver.sns_topic_arn(partition, data.region, en.destination)
+    if uses_shared_monitoring_role(data) and not data.monitoring_role_arn:
+        data.monitoring_role_arn = resolver.iam_role_arn(
+            partition, data.region, monitoring_role_name(partition)
+        )
+    return resolved
+
+
+def arn_resolver_from_env() -> ArnResolver | None:
+    """The resolver selected by ER_RESOLVE_ARNS
+
+    "aws" uses the APIs, a file path a StaticArnResolver mapping, unset or
+    "off" disables the resolution.
+    """
+    mode = os.environ.get("ER_RESOLVE_ARNS", "off")
+    if mode.lower() == "off":
+        return None
+    if mode.lower() == "aws":
+        return default_aws_resolver()
+    return StaticArnResolver.load(mode)
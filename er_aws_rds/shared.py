@@ -0,0 +1,128 @@
+"""Resources shared by the databases of an account and region
+
+A shared resource is named after its content and lives in its own stack and
+Terraform state, derived from that name. Every database stack that needs it
+synthesizes the same stack, so the resource is created once and reused by
+the rest. Shared resources are never modified in place: a content change
+produces a new name, a new resource and a new state, while the previous one
+is left untouched for the databases still referencing it. prevent_destroy
+guards them against a Terraform destroy. Shared stacks are left out of the
+synth of a database destroy (ACTION=Destroy), the database only references
+them by name. er_aws_rds.cleanup deletes the ones no database uses any more.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from external_resources_io.input import AppInterfaceProvision
+
+from er_aws_rds.input import ParameterGroup, Rds
+
+_DIGEST_LEN = 16
+_SHARED_PARAMETER_GROUP = re.compile(rf"shared-[a-z0-9-]+-[0-9a-f]{{{_DIGEST_LEN}}}")
+_SHARED_MONITORING_ROLE = re.compile(
+    rf"shared-rds-enhanced-monitoring-[0-9a-f]{{{_DIGEST_LEN}}}"
+)
+# IAM is global, account wide shared resources use this region in their state key
+GLOBAL_REGION = "global"
+
+ENHANCED_MONITORING_ASSUME_ROLE_POLICY = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Action": "sts:AssumeRole",
+            "Principal": {"Service": "monitoring.rds.amazonaws.com"},
+            "Effect": "Allow",
+        }
+    ],
+}
+
+
+def _digest(content: object) -> str:
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:_DIGEST_LEN]
+
+
+def parameter_group_name(pg: ParameterGroup) -> str:
+    """Content addressed name of a shared parameter group
+
+    The name depends on the family, the description and the parameters, in
+    any order. Parameter group names only allow letters, digits and hyphens.
+    """
+    parameters = sorted(
+        (p.name, p.value, p.apply_method or "") for p in pg.parameters or []
+    )
+    digest = _digest({
+        "family": pg.family,
+        "description": pg.description,
+        "parameters": parameters,
+    })
+    family = re.sub(r"[^a-z0-9]+", "-", pg.family.lower()).strip("-")
+    return f"shared-{family}-{digest}"
+
+
+def is_shared_parameter_group(name: str) -> bool:
+    """Whether name is the name of a shared parameter group"""
+    return bool(_SHARED_PARAMETER_GROUP.fullmatch(name))
+
+
+def db_parameter_group_name(pg: ParameterGroup, db_identifier: str) -> str:
+    """Name of the parameter group pg of the database db_identifier"""
+    if pg.shared:
+        return parameter_group_name(pg)
+    return f"{db_identifier}-{pg.name or 'pg'}"
+
+
+def shared_parameter_groups(data: Rds) -> list[ParameterGroup]:
+    """The shared parameter groups used by data, without duplicates"""
+    groups: dict[str, ParameterGroup] = {}
+    for pg in (data.parameter_group, data.old_parameter_group):
+        if pg and pg.shared:
+            groups.setdefault(parameter_group_name(pg), pg)
+    return list(groups.values())
+
+
+def enhanced_monitoring_policy_arn(partition: str | None) -> str:
+    """ARN of the AWS managed enhanced monitoring policy"""
+    return (
+        f"arn:{partition}:iam::aws:policy/service-role/AmazonRDSEnhancedMonitoringRole"
+    )
+
+
+def monitoring_role_name(partition: str | None) -> str:
+    """Content addressed name of the shared enhanced monitoring role"""
+    digest = _digest({
+        "assume_role_policy": ENHANCED_MONITORING_ASSUME_ROLE_POLICY,
+        "policy_arn": enhanced_monitoring_policy_arn(partition),
+    })
+    return f"shared-rds-enhanced-monitoring-{digest}"
+
+
+def is_shared_monitoring_role(name: str) -> bool:
+    """Whether name is the name of a shared enhanced monitoring role, of any content"""
+    return bool(_SHARED_MONITORING_ROLE.fullmatch(name))
+
+
+def uses_shared_monitoring_role(data: Rds) -> bool:
+    """Whether data references the shared enhanced monitoring role"""
+    return bool(data.enhanced_monitoring and data.shared_enhanced_monitoring)
+
+
+def destroying() -> bool:
+    """Whether the run destroys the database, ACTION=Destroy"""
+    return os.environ.get("ACTION", "").lower() == "destroy"
+
+
+def shared_stack_id(id_: str, name: str) -> str:
+    """Id of the stack of the shared resource name"""
+    return f"{id_}-{name}"
+
+
+def shared_state_key(provision: AppInterfaceProvision, region: str, name: str) -> str:
+    """Terraform state key of the shared resource name, unique per account and region
+
+    Account wide resources use GLOBAL_REGION.
+    """
+    return f"aws/{provision.provisioner}/rds/shared/{region}/{name}/terraform.tfstate"
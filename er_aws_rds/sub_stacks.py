@@ -0,0 +1,52 @@
+"""Sub-stacks of a database, each with its own Terraform state
+
+With split_stacks, the database stack keeps the instance, its password, data
+sources, event subscriptions and outputs in the state of the provision. The
+parameter groups and the enhanced monitoring role of the database move to
+sub-stacks, stored next to it. The database stack depends on them and reads
+the parameter group name from the remote state of its sub-stack (a cdktf
+cross-stack reference), so a parameter change only plans and locks the
+parameter groups state, without refreshing the aws_db_instance.
+
+depends_on can't cross stacks, and the sub-stack is applied before the
+database stack. A renamed or replaced group would be destroyed while the
+instance still uses it, so the groups of the sub-stack set skip_destroy: the
+previous group leaves the sub-stack state but stays in the account, and the
+instance moves off it in the database stack apply. The groups are tagged
+with OWNER_TAG, er_aws_rds.cleanup deletes the retired ones afterwards.
+"""
+
+from pathlib import PurePosixPath
+
+from external_resources_io.input import AppInterfaceProvision
+
+from er_aws_rds.input import Rds
+from er_aws_rds.shared import uses_shared_monitoring_role
+
+PARAMETER_GROUPS = "parameter-groups"
+ENHANCED_MONITORING = "enhanced-monitoring"
+# Identifier of the database of a sub-stack parameter group
+OWNER_TAG = "er-aws-rds:database"
+
+
+def sub_stack_names(data: Rds) -> list[str]:
+    """The sub-stacks of data, only the ones with resources"""
+    names = []
+    if any(
+        pg and not pg.shared for pg in (data.parameter_group, data.old_parameter_group)
+    ):
+        names.append(PARAMETER_GROUPS)
+    if data.enhanced_monitoring and not uses_shared_monitoring_role(data):
+        names.append(ENHANCED_MONITORING)
+    return names
+
+
+def sub_stack_id(id_: str, name: str) -> str:
+    """Id of the sub-stack name of the database stack id_"""
+    return f"{id_}-{name}"
+
+
+def sub_stack_state_key(provision: AppInterfaceProvision, name: str) -> str:
+    """Terraform state key of the sub-stack name, next to the database one"""
+    key = PurePosixPath(provision.module_provision_data.tf_state_key)
+    return str(key.parent / name / key.name)
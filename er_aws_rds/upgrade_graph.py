@@ -0,0 +1,161 @@
+"""Offline index of the RDS engine upgrade targets
+
+The graph is built from describe_db_engine_versions (IncludeAll=True) pages,
+live or from dumps of `aws rds describe-db-engine-versions --include-all`,
+and stored as a versioned JSON file:
+
+    {"format_version": 1, "partition": "aws", "region": "us-east-1",
+     "generated_at": 1700000000, "engines": {"postgres": {"14.6": ["14.7", ...]}}}
+
+It answers the valid upgrade targets and the shortest multi-hop upgrade path
+without calling the API.
+"""
+
+import json
+import re
+import time
+from collections import deque
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from mypy_boto3_rds import RDSClient
+
+FORMAT_VERSION = 1
+
+
+def version_key(version: str) -> tuple[tuple[int, int | str], ...]:
+    """Sort key of engine versions, numeric parts compare as numbers (14.10 > 14.9)"""
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in re.split(r"[.\-]", version)
+    )
+
+
+class UpgradeGraph:
+    """Upgrade targets per engine and version"""
+
+    def __init__(
+        self,
+        engines: Mapping[str, Mapping[str, Iterable[str]]],
+        partition: str = "aws",
+        region: str | None = None,
+        generated_at: float | None = None,
+    ) -> None:
+        self.engines = {
+            engine: {
+                version: sorted(set(targets), key=version_key)
+                for version, targets in versions.items()
+            }
+            for engine, versions in engines.items()
+        }
+        self.partition = partition
+        self.region = region
+        self.generated_at = generated_at or time.time()
+        self._paths: dict[tuple[str, str, str], list[str] | None] = {}
+
+    @classmethod
+    def from_engine_versions(
+        cls,
+        engine_versions: Iterable[Mapping[str, Any]],
+        partition: str = "aws",
+        region: str | None = None,
+    ) -> "UpgradeGraph":
+        """Builds the graph from DBEngineVersions items"""
+        engines: dict[str, dict[str, set[str]]] = {}
+        for item in engine_versions:
+            versions = engines.setdefault(item["Engine"], {})
+            targets = versions.setdefault(item["EngineVersion"], set())
+            targets.update(
+                t["EngineVersion"]
+                for t in item.get("ValidUpgradeTarget", [])
+                if t.get("Engine", item["Engine"]) == item["Engine"]
+            )
+        return cls(engines, partition=partition, region=region)
+
+    @classmethod
+    def from_api(
+        cls,
+        client: "RDSClient",
+        engines: Iterable[str],
+        partition: str = "aws",
+    ) -> "UpgradeGraph":
+        """Builds the graph of engines with paginated describe_db_engine_versions calls"""
+        paginator = client.get_paginator("describe_db_engine_versions")
+        items: list[Mapping[str, Any]] = []
+        for engine in engines:
+            for page in paginator.paginate(Engine=engine, IncludeAll=True):
+                items.extend(page["DBEngineVersions"])
+        return cls.from_engine_versions(
+            items, partition=partition, region=client.meta.region_name
+        )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "UpgradeGraph":
+        """Loads a graph file"""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("format_version") != FORMAT_VERSION:
+            msg = f"Unsupported upgrade graph format_version {data.get('format_version')} in {path}, expected {FORMAT_VERSION}"
+            raise ValueError(msg)
+        return cls(
+            data["engines"],
+            partition=data["partition"],
+            region=data.get("region"),
+            generated_at=data["generated_at"],
+        )
+
+    def dump(self, path: str | Path) -> None:
+        """Writes the graph file"""
+        Path(path).write_text(
+            json.dumps(
+                {
+                    "format_version": FORMAT_VERSION,
+                    "partition": self.partition,
+                    "region": self.region,
+                    "generated_at": self.generated_at,
+                    "engines": self.engines,
+                },
+                sort_keys=True,
+                separators=(",", ":"),
+            ),
+            encoding="utf-8",
+        )
+
+    def knows(self, engine: str, version: str) -> bool:
+        """Whether the graph has the upgrade targets of engine version"""
+        return version in self.engines.get(engine, {})
+
+    def targets(self, engine: str, version: str) -> set[str]:
+        """The direct upgrade targets of engine version"""
+        return set(self.engines.get(engine, {}).get(version, []))
+
+    def shortest_path(self, engine: str, source: str, target: str) -> list[str] | None:
+        """Versions from source to target, both included, with the least upgrades
+
+        None if target is not reachable. Among paths of the same length, the
+        one through the lowest versions is returned.
+        """
+        key = (engine, source, target)
+        if key not in self._paths:
+            self._paths[key] = self._bfs(engine, source, target)
+        return self._paths[key]
+
+    def _bfs(self, engine: str, source: str, target: str) -> list[str] | None:
+        versions = self.engines.get(engine, {})
+        previous: dict[str, str | None] = {source: None}
+        queue = deque([source])
+        while queue:
+            version = queue.popleft()
+            if version == target:
+                path: list[str] = []
+                node: str | None = version
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path[::-1]
+            for nxt in versions.get(version, []):
+                if nxt not in previous:
+                    previous[nxt] = version
+                    queue.append(nxt)
+        return None
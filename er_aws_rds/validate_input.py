@@ -0,0 +1,87 @@
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from external_resources_io.input import parse_model, read_input_from_file
+from pydantic import ValidationError
+
+from er_aws_rds.errors import RDSLogicalReplicationError
+from er_aws_rds.input import AppInterfaceInput
+
+
+@dataclass
+class InputValidation:
+    """Outcome of the validation of a single input file"""
+
+    source: str
+    valid: bool
+    errors: list[dict[str, str]] = field(default_factory=list)
+
+
+def _error(type_: str, msg: str, loc: str = "") -> dict[str, str]:
+    return {"loc": loc, "type": type_, "msg": msg}
+
+
+def validate_input(source: str) -> InputValidation:
+    """Parses and validates source with the AppInterfaceInput models. No stack is built"""
+    try:
+        parse_model(AppInterfaceInput, read_input_from_file(source))
+    except ValidationError as e:
+        # Input values are left out, they can carry secrets
+        errors = [
+            _error(err["type"], err["msg"], ".".join(str(p) for p in err["loc"]))
+            for err in e.errors(
+                include_url=False, include_context=False, include_input=False
+            )
+        ]
+        return InputValidation(source=source, valid=False, errors=errors)
+    except RDSLogicalReplicationError as e:
+        return InputValidation(
+            source=source,
+            valid=False,
+            errors=[_error("logical_replication", str(e), "data.parameter_group")],
+        )
+    except (OSError, ValueError) as e:
+        return InputValidation(
+            source=source, valid=False, errors=[_error("unreadable_input", str(e))]
+        )
+    return InputValidation(source=source, valid=True)
+
+
+def expand_sources(sources: Iterable[str]) -> list[str]:
+    """Input files of sources. Directories are expanded to their *.json files"""
+    files: list[str] = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            files.extend(str(f) for f in sorted(path.glob("*.json")))
+        else:
+            files.append(source)
+    return files
+
+
+def validate_inputs(
+    sources: Iterable[str], workers: int | None = None
+) -> list[InputValidation]:
+    """Validates every input of sources across a process pool of workers"""
+    files = expand_sources(sources)
+    if workers == 1 or len(files) < 2:  # noqa: PLR2004
+        return [validate_input(f) for f in files]
+
+    workers = workers or os.cpu_count() or 1
+    # Big chunks, a single validation is much cheaper than a pool round trip
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(validate_input, files, chunksize=chunksize))
+
+
+def report(results: list[InputValidation]) -> dict[str, Any]:
+    """JSON serializable summary of a validation run"""
+    return {
+        "total": len(results),
+        "invalid": sum(1 for r in results if not r.valid),
+        "results": [asdict(r) for r in results],
+    }
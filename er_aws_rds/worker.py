@@ -0,0 +1,211 @@
+import json
+import os
+import resource
+import socket
+import socketserver
+import stat
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from external_resources_io.input import parse_model, read_input_from_file
+
+from er_aws_rds.app import synth
+from er_aws_rds.cache import SynthCache
+from er_aws_rds.input import AppInterfaceInput
+
+# Exit code used in stdio mode to ask the supervisor for a fresh worker
+EXIT_RECYCLE = 75
+
+
+class Worker:
+    """Warm synth worker
+
+    Keeps the cdktf/jsii runtime loaded and serves synth jobs using a JSON
+    line protocol. Every request is a JSON object with an "op":
+
+    * {"op": "synth", "input": {...} | "input_file": "...", "outdir": "..."}
+    * {"op": "health"}
+    * {"op": "stats"}
+
+    Every synth job runs through er_aws_rds.app.synth, with its own App and
+    Stack, so it uses the synth cache, the backend and the ARN resolution and
+    profiling settings like the other entry points. After max_jobs synth jobs
+    the worker flags the last response with "recycle": true and stops serving
+    so it can be replaced by a fresh process.
+    """
+
+    def __init__(
+        self,
+        max_jobs: int | None = None,
+        cache: SynthCache | None = None,
+        backend: str | None = None,
+    ) -> None:
+        self.max_jobs = max_jobs
+        self.cache = cache
+        self.backend = backend
+        self.started = time.monotonic()
+        self.jobs = 0
+        self.failed = 0
+        self.synth_seconds = 0.0
+
+    @property
+    def exhausted(self) -> bool:
+        """The worker has served max_jobs and must be recycled"""
+        return self.max_jobs is not None and self.jobs >= self.max_jobs
+
+    def health(self) -> dict[str, Any]:
+        """Health endpoint"""
+        return {
+            "ok": True,
+            "status": "recycling" if self.exhausted else "ok",
+            "pid": os.getpid(),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """Stats endpoint"""
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "uptime": time.monotonic() - self.started,
+            "jobs": self.jobs,
+            "failed": self.failed,
+            "max_jobs": self.max_jobs,
+            "synth_seconds_total": self.synth_seconds,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+    def synth(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Runs a synth job and returns the synthesized path and timings"""
+        self.jobs += 1
+        start = time.perf_counter()
+        try:
+            if "input" in request:
+                raw_input = request["input"]
+            else:
+                raw_input = read_input_from_file(file_path=request["input_file"])
+            outdir = Path(request["outdir"])
+            ai_input = parse_model(AppInterfaceInput, raw_input)
+            parsed = time.perf_counter()
+
+            outdir.mkdir(parents=True, exist_ok=True)
+            cached = synth(
+                ai_input, outdir=str(outdir), cache=self.cache, backend=self.backend
+            )
+            synthesized = time.perf_counter()
+        except Exception as e:  # noqa: BLE001
+            self.failed += 1
+            return {
+                "ok": False,
+                "job": self.jobs,
+                "error": f"{type(e).__name__}: {e}",
+                "recycle": self.exhausted,
+            }
+
+        self.synth_seconds += synthesized - start
+        return {
+            "ok": True,
+            "job": self.jobs,
+            "outdir": str(outdir),
+            "cached": cached,
+            "timings": {
+                "parse": parsed - start,
+                "synth": synthesized - parsed,
+                "total": synthesized - start,
+            },
+            "recycle": self.exhausted,
+        }
+
+    def handle(self, line: str) -> dict[str, Any]:
+        """Dispatches a single protocol line"""
+        try:
+            request = json.loads(line)
+            op = request.get("op", "synth")
+        except (ValueError, AttributeError) as e:
+            return {"ok": False, "error": f"Invalid request: {e}"}
+
+        match op:
+            case "synth":
+                return self.synth(request)
+            case "health":
+                return self.health()
+            case "stats":
+                return self.stats()
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+    def serve_lines(self, lines: Iterable[str], write: Callable[[str], object]) -> None:
+        """Serves requests from lines until the input ends or the worker is exhausted"""
+        for line in lines:
+            if not line.strip():
+                continue
+            write(json.dumps(self.handle(line)) + "\n")
+            if self.exhausted:
+                return
+
+
+def serve_stdio(
+    max_jobs: int | None = None,
+    cache: SynthCache | None = None,
+    backend: str | None = None,
+) -> int:
+    """Serves jobs from stdin. Returns EXIT_RECYCLE when max_jobs is reached"""
+    worker = Worker(max_jobs=max_jobs, cache=cache, backend=backend)
+
+    def write(data: str) -> None:
+        sys.stdout.write(data)
+        sys.stdout.flush()
+
+    worker.serve_lines(sys.stdin, write)
+    return EXIT_RECYCLE if worker.exhausted else 0
+
+
+def remove_stale_socket(path: str) -> None:
+    """Removes the socket left at path by a worker that is gone
+
+    Anything else at path, or a socket another process listens on, raises
+    FileExistsError instead of being removed.
+    """
+    try:
+        mode = Path(path).lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        msg = f"{path} exists and is not a socket"
+        raise FileExistsError(msg)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            Path(path).unlink(missing_ok=True)
+            return
+    msg = f"Another process is listening on {path}"
+    raise FileExistsError(msg)
+
+
+def serve_socket(
+    path: str,
+    max_jobs: int | None = None,
+    cache: SynthCache | None = None,
+    backend: str | None = None,
+) -> None:
+    """Serves jobs on a Unix socket
+
+    Connections are handled one at a time, the jsii runtime is not thread safe.
+    Once max_jobs is reached the process re-executes itself to get a fresh
+    runtime listening on the same socket.
+    """
+    worker = Worker(max_jobs=max_jobs, cache=cache, backend=backend)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            lines = (line.decode("utf-8") for line in self.rfile)
+            worker.serve_lines(lines, lambda data: self.wfile.write(data.encode()))
+
+    remove_stale_socket(path)
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        while not worker.exhausted:
+            server.handle_request()
+    Path(path).unlink(missing_ok=True)
+    os.execv(sys.executable, [sys.executable, *sys.orig_argv[1:]])  # noqa: S606
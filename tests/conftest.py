@@ -20,7 +20,7 @@ def input_data(parameters: Iterable[Parameter] | None) -> dict:
                 value="-1",
                 apply_method="pending-reboot",
             ),
-            Parameter(name="log_min_duration_statement", value=60000),
+            Parameter(name="log_connections", value=1),
         ]
 
     parameters_json_string = json.dumps([
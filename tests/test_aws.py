@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from er_aws_rds.aws import ClientRegistry
+
+
+def test_client_registry_shares_clients() -> None:
+    """One client per (service, region), also when requested concurrently"""
+    registry = ClientRegistry(max_pool_connections=5, max_attempts=3)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: registry.rds("us-east-1"), range(32)))
+
+    assert all(c is clients[0] for c in clients)
+    assert registry.rds("us-west-2") is not clients[0]
+    assert registry.client("rds", "us-west-2") is registry.rds("us-west-2")
+    config = clients[0].meta.config
+    assert config.max_pool_connections == 5  # noqa: PLR2004
+    # botocore counts the initial request in total_max_attempts
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 4}
@@ -0,0 +1,51 @@
+import json
+from pathlib import Path
+
+from er_aws_rds.batch import synth_batch
+
+from .conftest import input_data
+
+
+def test_synth_batch_isolates_inputs_and_failures(tmp_path: Path) -> None:
+    """Every input is synthesized in its own outdir and failures don't abort the batch"""
+    second = input_data(parameters=None)
+    second["data"]["identifier"] = "test-rds-2"
+    second["provision"]["identifier"] = "test-rds-2"
+    broken = input_data(parameters=None)
+    broken["provision"]["identifier"] = "broken"
+    del broken["data"]["region"]
+
+    source = tmp_path / "inputs.jsonl"
+    source.write_text(
+        "\n".join(json.dumps(i) for i in (input_data(parameters=None), broken, second)),
+        encoding="utf-8",
+    )
+
+    results = synth_batch(str(source), str(tmp_path / "out"))
+
+    assert [r.ok for r in results] == [True, False, True]
+    assert "ValidationError" in (results[1].error or "")
+    stack = json.loads(
+        (
+            tmp_path / "out" / "test-rds-2" / "stacks" / "CDKTF" / "cdk.tf.json"
+        ).read_text()
+    )
+    # The second stack must only depend on its own parameter group
+    assert stack["resource"]["aws_db_instance"]["test-rds-2"]["depends_on"] == [
+        "aws_db_parameter_group.test-rds-2-postgres-14"
+    ]
+
+
+def test_synth_batch_reports_unreadable_sources(tmp_path: Path) -> None:
+    """A missing or undecodable source is a failed result, not an exception"""
+    (missing,) = synth_batch(str(tmp_path / "missing.jsonl"), str(tmp_path / "out"))
+    assert not missing.ok
+    assert missing.source == str(tmp_path / "missing.jsonl")
+    assert "No such file" in (missing.error or "")
+
+    source = tmp_path / "inputs.jsonl"
+    source.write_bytes(b"\xff\n")
+    (undecodable,) = synth_batch(str(source), str(tmp_path / "out"))
+    assert not undecodable.ok
+    assert undecodable.source == str(source)
+    assert "decode" in (undecodable.error or "")
@@ -0,0 +1,85 @@
+import json
+import os
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+
+from er_aws_rds.app import synth
+from er_aws_rds.cache import SynthCache, cache_key
+
+from .conftest import input_data, input_object
+
+
+def test_cache_key_includes_excluded_fields() -> None:
+    """Fields excluded from model_dump must still change the key"""
+    ai_input = input_object()
+    other = input_object()
+    assert other.data.parameter_group
+    assert other.data.parameter_group.parameters
+    other.data.parameter_group.parameters[0].value = "all"
+    assert cache_key(ai_input, "CDKTF") == cache_key(input_object(), "CDKTF")
+    assert cache_key(ai_input, "CDKTF") != cache_key(other, "CDKTF")
+    assert cache_key(ai_input, "CDKTF") != cache_key(ai_input, "OTHER")
+
+
+def test_synth_restores_from_cache(tmp_path: Path) -> None:
+    """The second synth of the same input is restored from cache"""
+    cache = SynthCache(tmp_path / "cache")
+    first, second = tmp_path / "first", tmp_path / "second"
+
+    assert not synth(input_object(), outdir=str(first), cache=cache)
+    assert synth(input_object(), outdir=str(second), cache=cache)
+    stack = Path("stacks") / "CDKTF" / "cdk.tf.json"
+    assert (first / stack).read_text() == (second / stack).read_text()
+
+
+SYNTH = """
+import sys
+from pathlib import Path
+from er_aws_rds.app import synth
+from er_aws_rds.cache import SynthCache
+from er_aws_rds.input import AppInterfaceInput
+ai_input = AppInterfaceInput.model_validate_json(Path(sys.argv[1]).read_text())
+print(synth(ai_input, cache=SynthCache(sys.argv[2])))
+"""
+
+
+def test_synth_honors_cdktf_outdir(tmp_path: Path) -> None:
+    """Without outdir, CDKTF_OUTDIR (cdktf synth --output) is the synth and cache target"""
+    input_file = tmp_path / "input.json"
+    input_file.write_text(json.dumps(input_data(parameters=None)))
+    env = {k: v for k, v in os.environ.items() if k != "ER_OUTDIR"}
+
+    def synth_into(name: str) -> str:
+        # The jsii runtime reads CDKTF_OUTDIR once, when it starts
+        proc = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", SYNTH, str(input_file), str(tmp_path / "cache")],
+            env={**env, "CDKTF_OUTDIR": str(tmp_path / name)},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return proc.stdout.strip()
+
+    assert synth_into("first") == "False"
+    assert synth_into("second") == "True"
+    stack = Path("stacks") / "CDKTF" / "cdk.tf.json"
+    assert (tmp_path / "first" / stack).read_text() == (
+        tmp_path / "second" / stack
+    ).read_text()
+
+
+def test_cache_eviction(tmp_path: Path) -> None:
+    """Expired and least recently used entries are evicted"""
+    cache = SynthCache(tmp_path / "cache", max_bytes=15, max_age=3600)
+    outdir = tmp_path / "out"
+    outdir.mkdir()
+    (outdir / "cdk.tf.json").write_text("0123456789")
+
+    cache.put("old", outdir)
+    os.utime(tmp_path / "cache" / "old", (0, 0))
+    cache.put("lru", outdir)
+    os.utime(tmp_path / "cache" / "lru", (outdir.stat().st_mtime - 60,) * 2)
+    cache.put("new", outdir)
+
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == ["new"]
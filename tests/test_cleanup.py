@@ -0,0 +1,175 @@
+from botocore.stub import Stubber
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.cleanup import (
+    DB_PARAMETER_GROUP,
+    IAM_ROLE,
+    SHARED,
+    Retired,
+    delete_resources,
+    retired_resources,
+)
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.shared import monitoring_role_name
+from er_aws_rds.sub_stacks import OWNER_TAG
+
+from .conftest import input_data
+
+ARN = "arn:aws:rds:us-east-1:123456789012:pg:"
+SHARED_IN_USE = "shared-postgres14-0123456789abcdef"
+SHARED_UNUSED = "shared-postgres14-fedcba9876543210"
+ROLE_ARN = "arn:aws:iam::123456789012:role/"
+ROLE_IN_USE = "shared-rds-enhanced-monitoring-0123456789abcdef"
+ROLE_UNUSED = "shared-rds-enhanced-monitoring-fedcba9876543210"
+
+
+def tagged(name: str, owner: str) -> dict:
+    """A get_resources item of the group name of the database owner"""
+    return {
+        "ResourceARN": ARN + name,
+        "Tags": [{"Key": "app", "Value": "x"}, {"Key": OWNER_TAG, "Value": owner}],
+    }
+
+
+def test_retired_resources() -> None:
+    """Tagged and shared groups and shared roles no instance uses and no input wants are retired"""
+    raw = input_data(parameters=None)
+    raw["data"]["split_stacks"] = True
+    raw["data"]["enhanced_monitoring"] = True
+    raw["data"]["shared_enhanced_monitoring"] = True
+    raw["data"]["old_parameter_group"] = {"name": "postgres-13", "family": "postgres13"}
+    registry = ClientRegistry()
+    with (
+        Stubber(registry.rds("us-east-1")) as rds,
+        Stubber(registry.client("resourcegroupstaggingapi", "us-east-1")) as tagging,
+        Stubber(registry.client("iam", "us-east-1")) as iam,
+    ):
+        rds.add_response(
+            "describe_db_instances",
+            {
+                "DBInstances": [
+                    {
+                        "DBInstanceIdentifier": "test-rds",
+                        "DBParameterGroups": [
+                            {"DBParameterGroupName": "test-rds-postgres-renamed"}
+                        ],
+                    },
+                    {
+                        "DBInstanceIdentifier": "other",
+                        "DBParameterGroups": [{"DBParameterGroupName": SHARED_IN_USE}],
+                        "MonitoringRoleArn": ROLE_ARN + ROLE_IN_USE,
+                    },
+                ]
+            },
+        )
+        rds.add_response(
+            "describe_db_parameter_groups",
+            {
+                "DBParameterGroups": [
+                    {"DBParameterGroupName": name}
+                    for name in (
+                        "default.postgres14",
+                        "shared-custom",
+                        SHARED_IN_USE,
+                        SHARED_UNUSED,
+                    )
+                ]
+            },
+        )
+        tagging.add_response(
+            "get_resources",
+            {
+                "ResourceTagMappingList": [
+                    # Used by the instance, moving to the group of the input
+                    tagged("test-rds-postgres-renamed", "test-rds"),
+                    # Wanted by the input
+                    tagged("test-rds-postgres-14", "test-rds"),
+                    tagged("test-rds-postgres-13", "test-rds"),
+                    # Replaced before
+                    tagged("test-rds-postgres-12", "test-rds"),
+                    # Of a deleted database
+                    tagged("gone-pg", "gone"),
+                ]
+            },
+            {"TagFilters": [{"Key": OWNER_TAG}], "ResourceTypeFilters": ["rds:pg"]},
+        )
+        iam.add_response(
+            "list_roles",
+            {
+                "Roles": [
+                    {
+                        "RoleName": name,
+                        "Path": "/",
+                        "RoleId": "AROAEXAMPLEEXAMPLE000",
+                        "Arn": ROLE_ARN + name,
+                        "CreateDate": "2024-01-01T00:00:00Z",
+                    }
+                    for name in (
+                        "unrelated",
+                        monitoring_role_name("aws"),
+                        ROLE_IN_USE,
+                        ROLE_UNUSED,
+                    )
+                ]
+            },
+        )
+        retired = retired_resources(
+            [AppInterfaceInput.model_validate(raw).data], registry=registry
+        )
+        rds.assert_no_pending_responses()
+        tagging.assert_no_pending_responses()
+        iam.assert_no_pending_responses()
+
+    assert retired == [
+        Retired(DB_PARAMETER_GROUP, "us-east-1", "gone-pg", "gone"),
+        Retired(DB_PARAMETER_GROUP, "us-east-1", SHARED_UNUSED, SHARED),
+        Retired(DB_PARAMETER_GROUP, "us-east-1", "test-rds-postgres-12", "test-rds"),
+        Retired(IAM_ROLE, "us-east-1", ROLE_UNUSED, SHARED),
+    ]
+
+
+def test_delete_resources() -> None:
+    """A failed deletion is reported, the rest are deleted"""
+    retired = [
+        Retired(DB_PARAMETER_GROUP, "us-east-1", "in-use", "a"),
+        Retired(DB_PARAMETER_GROUP, "us-east-1", "unused", "b"),
+    ]
+    registry = ClientRegistry()
+    with Stubber(registry.rds("us-east-1")) as rds:
+        rds.add_client_error(
+            "delete_db_parameter_group",
+            "InvalidDBParameterGroupState",
+            "in use",
+            expected_params={"DBParameterGroupName": "in-use"},
+        )
+        rds.add_response(
+            "delete_db_parameter_group", {}, {"DBParameterGroupName": "unused"}
+        )
+        errors = delete_resources(retired, registry=registry)
+        rds.assert_no_pending_responses()
+
+    assert [(e.name, "in use" in e.msg) for e in errors] == [("in-use", True)]
+
+
+def test_delete_shared_monitoring_role() -> None:
+    """The policies of a role are detached before it is deleted"""
+    registry = ClientRegistry()
+    policy_arn = "arn:aws:iam::aws:policy/service-role/AmazonRDSEnhancedMonitoringRole"
+    with Stubber(registry.client("iam", "us-east-1")) as iam:
+        iam.add_response(
+            "list_attached_role_policies",
+            {"AttachedPolicies": [{"PolicyArn": policy_arn}]},
+            {"RoleName": ROLE_UNUSED},
+        )
+        iam.add_response(
+            "detach_role_policy",
+            {},
+            {"RoleName": ROLE_UNUSED, "PolicyArn": policy_arn},
+        )
+        iam.add_response("delete_role", {}, {"RoleName": ROLE_UNUSED})
+        errors = delete_resources(
+            [Retired(IAM_ROLE, "us-east-1", ROLE_UNUSED, SHARED)], registry=registry
+        )
+        iam.assert_no_pending_responses()
+
+    assert errors == []
@@ -0,0 +1,28 @@
+from benchmarks.fleet import PAGE_SIZE, compare, run
+
+
+def test_fleet_run() -> None:
+    """The synthetic fleet synthesizes and validates against the canned AWS API"""
+    result = run(databases=PAGE_SIZE + 2, parameters=10, backend="native")
+
+    # One engine version lookup and two inventory pages, the rest is cached
+    assert result.aws_calls == 3  # noqa: PLR2004
+    assert all(getattr(result, m) > 0 for m in ("parse_ms", "stack_ms", "synth_ms"))
+
+
+def test_fleet_compare() -> None:
+    """Metrics over tolerance times their baseline are regressions"""
+    result = run(databases=1, parameters=1, backend="native")
+    baseline = {
+        result.key: {
+            "parse_ms": result.parse_ms * 2,
+            "stack_ms": result.stack_ms * 2,
+            "synth_ms": result.synth_ms,
+            "validate_ms": result.validate_ms / 2,
+        }
+    }
+
+    assert compare([result], baseline, tolerance=1.25) == [
+        f"{result.key} validate_ms: {result.validate_ms}ms, "
+        f"baseline {result.validate_ms / 2}ms"
+    ]
@@ -1,8 +1,15 @@
 import pytest
 from cdktf import Testing
+from pydantic import ValidationError
 
 from er_aws_rds.errors import RDSLogicalReplicationError
-from er_aws_rds.input import AppInterfaceInput, Parameter
+from er_aws_rds.input import (
+    AppInterfaceInput,
+    EventNotification,
+    Parameter,
+    ParameterGroup,
+    merge_event_notifications,
+)
 
 from .conftest import input_data
 
@@ -31,3 +38,76 @@ def test_parameter_value_as_string() -> None:
         "name": "test",
         "value": "60",
     }
+
+
+def test_parameters_are_unique_and_sorted() -> None:
+    """Identical duplicates are dropped and parameters are sorted by name"""
+    pg = ParameterGroup.model_validate({
+        "family": "postgres14",
+        "parameters": [
+            {"name": "b", "value": 1},
+            {"name": "a", "value": "x"},
+            {"name": "b", "value": "1"},
+        ],
+    })
+    assert [p.name for p in pg.parameters or []] == ["a", "b"]
+    assert pg.parameter("b") == Parameter(name="b", value="1")
+    assert pg.parameter("c") is None
+
+
+def test_conflicting_parameters() -> None:
+    """Duplicated parameters with different values are rejected"""
+    with pytest.raises(ValidationError, match="Conflicting duplicates"):
+        ParameterGroup.model_validate({
+            "family": "postgres14",
+            "parameters": [{"name": "b", "value": 1}, {"name": "b", "value": 2}],
+        })
+
+
+def test_parameter_group_overrides() -> None:
+    """Overrides replace the parameters with the same name and add new ones"""
+    data = input_data(parameters=None)
+    data["data"]["parameter_group_overrides"] = [
+        {"name": "log_statement", "value": "all", "apply_method": "immediate"},
+        {"name": "work_mem", "value": 4096},
+    ]
+    pg = AppInterfaceInput.model_validate(data).data.parameter_group
+    assert pg
+    assert [p.name for p in pg.parameters or []] == [
+        "log_connections",
+        "log_min_duration_statement",
+        "log_statement",
+        "work_mem",
+    ]
+    assert pg.parameter("log_statement") == Parameter(
+        name="log_statement", value="all", apply_method="immediate"
+    )
+
+
+def test_parameter_group_overrides_logical_replication() -> None:
+    """Overrides are validated as the rest of the parameters"""
+    data = input_data(parameters=None)
+    data["data"]["parameter_group_overrides"] = [
+        {"name": "rds.logical_replication", "value": 1, "apply_method": "immediate"},
+    ]
+    with pytest.raises(RDSLogicalReplicationError):
+        AppInterfaceInput.model_validate(data)
+
+
+def test_merge_event_notifications() -> None:
+    """Notifications are grouped by topic and source type, their categories merged"""
+    merged = merge_event_notifications([
+        EventNotification(destination="t", event_categories=["failure"]),
+        EventNotification(destination="u", event_categories=["backup"]),
+        EventNotification(destination="t", event_categories=["backup", "failure"]),
+        EventNotification(destination="u", event_categories=None),
+        EventNotification(
+            destination="t", source_type="db-instance", event_categories=[]
+        ),
+    ])
+
+    assert [(en.destination, en.source_type, en.event_categories) for en in merged] == [
+        ("t", "all", ["backup", "failure"]),
+        ("u", "all", None),
+        ("t", "db-instance", []),
+    ]
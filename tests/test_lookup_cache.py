@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from er_aws_rds.lookup_cache import LookupCache
+
+
+def test_lookup_cache_memo_and_disk(tmp_path: Path) -> None:
+    """Lookups are fetched once per key and persist between instances"""
+    calls: list[str] = []
+
+    def fetch() -> list[str]:
+        calls.append("fetch")
+        return ["14.7", "15.2"]
+
+    key = ("aws", "us-east-1", "postgres", "14.6")
+    cache = LookupCache(tmp_path)
+    assert cache.get_or_set("versions", key, fetch) == ["14.7", "15.2"]
+    assert cache.get_or_set("versions", key, fetch) == ["14.7", "15.2"]
+    assert LookupCache(tmp_path).get("versions", key) == ["14.7", "15.2"]
+    assert LookupCache(tmp_path).get("versions", ("aws", "us-east-1")) is None
+    assert len(calls) == 1
+
+
+def test_lookup_cache_expiration(tmp_path: Path) -> None:
+    """Expired entries are ignored and evicted, then the oldest over max_bytes"""
+    cache = LookupCache(tmp_path, ttl=-1)
+    cache.set("versions", ("a",), ["1"])
+    assert LookupCache(tmp_path).get("versions", ("a",)) is None
+
+    cache = LookupCache(tmp_path, max_bytes=150)
+    cache.set("versions", ("old",), ["1"])
+    cache.set("versions", ("new",), ["2"])
+    old = next(p for p in tmp_path.glob("*/*.json") if '"old"' in p.read_text())
+    os.utime(old, (old.stat().st_mtime - 60,) * 2)
+    cache.evict()
+
+    assert LookupCache(tmp_path).get("versions", ("old",)) is None
+    assert LookupCache(tmp_path).get("versions", ("new",)) == ["2"]
+
+
+def test_lookup_cache_memo_is_lru() -> None:
+    """The memo keeps the max_entries most recently used entries"""
+    cache = LookupCache(max_entries=2)
+    cache.set("versions", ("a",), ["1"])
+    cache.set("versions", ("b",), ["2"])
+    assert cache.get("versions", ("a",)) == ["1"]
+    cache.set("versions", ("c",), ["3"])
+
+    assert cache.get("versions", ("b",)) is None
+    assert cache.get("versions", ("a",)) == ["1"]
+    assert cache.get("versions", ("c",)) == ["3"]
+    assert len(cache._memo) == cache.max_entries  # noqa: SLF001
+
+
+def test_lookup_cache_single_fetch() -> None:
+    """Concurrent misses of a key fetch it once"""
+    cache = LookupCache()
+    calls: list[str] = []
+    lock = threading.Lock()
+
+    def fetch() -> list[str]:
+        with lock:
+            calls.append("fetch")
+        time.sleep(0.05)
+        return ["14.7"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        values = list(
+            executor.map(
+                lambda _: cache.get_or_set("versions", ("a",), fetch), range(8)
+            )
+        )
+
+    assert values == [["14.7"]] * 8
+    assert calls == ["fetch"]
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from er_aws_rds.app import synth
+from er_aws_rds.profiling import rss_kib
+
+from .conftest import input_object
+
+pytestmark = pytest.mark.skipif(rss_kib() is None, reason="RSS is read from /proc")
+
+
+def synth_growth_kib(tmp_path: Path, backend: str, warm_up: int, runs: int) -> int:
+    """RSS growth over runs synths of the same input in this process"""
+    start = 0
+    for i in range(warm_up + runs):
+        if i == warm_up:
+            start = rss_kib() or 0
+        synth(input_object(), outdir=str(tmp_path / str(i % 2)), backend=backend)
+    return (rss_kib() or 0) - start
+
+
+def test_native_synth_memory_is_flat(tmp_path: Path) -> None:
+    """Thousands of native synths in one process keep a flat RSS"""
+    assert synth_growth_kib(tmp_path, "native", warm_up=100, runs=3000) < 1024  # noqa: PLR2004
+
+
+def test_jsii_synth_memory_is_bounded(tmp_path: Path) -> None:
+    """jsii never releases its objects, the growth per synth must stay small
+
+    The warm worker recycles itself after --max-jobs to bound it.
+    """
+    runs = 100
+    growth = synth_growth_kib(tmp_path, "jsii", warm_up=10, runs=runs)
+    assert growth / runs < 100  # noqa: PLR2004
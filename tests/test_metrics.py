@@ -0,0 +1,126 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from botocore.awsrequest import AWSResponse
+from external_resources_io.terraform import TerraformJsonPlanParser
+from validate_plan import CHECKS, AWSApi, RDSPlanValidator, main
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.lookup_cache import LookupCache
+from er_aws_rds.metrics import Metrics, default_metrics
+
+from .conftest import input_data, input_object
+from .test_validate_plan import write_plan
+
+THROTTLED = (
+    b"<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code>"
+    b"<Message>Rate exceeded</Message></Error><RequestId>1</RequestId></ErrorResponse>"
+)
+ENGINE_VERSIONS = (
+    b'<DescribeDBEngineVersionsResponse xmlns="http://rds.amazonaws.com/doc/2014-10-31/">'
+    b"<DescribeDBEngineVersionsResult><DBEngineVersions><DBEngineVersion>"
+    b"<Engine>postgres</Engine><EngineVersion>14.6</EngineVersion>"
+    b"<ValidUpgradeTarget><UpgradeTarget><EngineVersion>14.7</EngineVersion>"
+    b"</UpgradeTarget></ValidUpgradeTarget></DBEngineVersion></DBEngineVersions>"
+    b"</DescribeDBEngineVersionsResult></DescribeDBEngineVersionsResponse>"
+)
+
+
+class _Raw:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def stream(self, **_: Any) -> Iterator[bytes]:  # noqa: ANN401
+        yield self.body
+
+
+@pytest.fixture
+def env_metrics(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Iterator[Path]:
+    """ER_METRICS_FILE enabled for the test, default_metrics() reset around it"""
+    path = tmp_path / "metrics.prom"
+    monkeypatch.setenv("ER_METRICS_FILE", str(path))
+    default_metrics.cache_clear()
+    yield path
+    default_metrics.cache_clear()
+
+
+def test_aws_call_metrics(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Calls, retries, throttled attempts and cache hits are recorded"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    # No retry backoff
+    monkeypatch.setattr("botocore.endpoint.time.sleep", lambda _: None)
+    metrics = Metrics()
+    registry = ClientRegistry(metrics=metrics)
+    api = AWSApi(
+        config_options={"region_name": "us-east-1"},
+        registry=registry,
+        cache=LookupCache(metrics=metrics),
+    )
+    responses = [(400, THROTTLED), (200, ENGINE_VERSIONS)]
+
+    def send(request: Any, **_: Any) -> AWSResponse:  # noqa: ANN401
+        status, body = responses.pop(0)
+        return AWSResponse(request.url, status, {}, _Raw(body))
+
+    registry.rds("us-east-1").meta.events.register("before-send", send)
+    for _ in range(2):
+        assert api.get_rds_valid_update_versions("postgres", "14.6") == {"14.7"}
+
+    labels = {"service": "rds", "operation": "DescribeDBEngineVersions"}
+    assert metrics.counter("aws_api_calls_total", **labels) == 1
+    assert metrics.counter("aws_api_retries_total", **labels) == 1
+    assert metrics.counter("aws_api_throttles_total", **labels) == 1
+    assert metrics.cache_hit_ratios() == {"describe_db_engine_versions": 0.5}
+    histogram = metrics.histogram("aws_api_call_duration_seconds", **labels)
+    assert histogram
+    assert histogram.count == 1
+
+    metrics.write(tmp_path / "metrics.json")
+    summary = json.loads((tmp_path / "metrics.json").read_text())
+    assert summary["histograms"]["aws_client_create_seconds"][0]["labels"] == {
+        "region": "us-east-1",
+        "service": "rds",
+    }
+    metrics.write(tmp_path / "metrics.prom")
+    assert (
+        'aws_api_throttles_total{operation="DescribeDBEngineVersions",service="rds"} 1'
+        in (tmp_path / "metrics.prom").read_text().splitlines()
+    )
+
+
+def test_check_metrics(tmp_path: Path) -> None:
+    """Check durations are recorded per check"""
+    plan = write_plan(tmp_path / "plan.json", {"engine_version": "14.6"}, {})
+    metrics = Metrics()
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(plan),
+        input_object(),
+        checks=[CHECKS["engine_version"]],
+        metrics=metrics,
+    )
+
+    validator.validate()
+
+    histogram = metrics.histogram("plan_check_duration_seconds", check="engine_version")
+    assert histogram
+    assert histogram.count == 1
+
+
+def test_main_writes_metrics(tmp_path: Path, env_metrics: Path) -> None:
+    """validate_plan.py writes ER_METRICS_FILE, on failures too"""
+    (tmp_path / "plans" / "db").mkdir(parents=True)
+    write_plan(tmp_path / "plans" / "db" / "plan.json", {"engine_version": "14.6"}, {})
+    (tmp_path / "plans" / "db" / "input.json").write_text(
+        json.dumps(input_data(parameters=None))
+    )
+
+    assert main(["--directory", str(tmp_path / "plans")]) == 1
+
+    exposition = env_metrics.read_text()
+    assert "# TYPE plan_validation_seconds histogram" in exposition
+    assert 'plan_check_duration_seconds_count{check="engine_version"} 1' in exposition
+    assert "plan_parse_seconds_count 1" in exposition
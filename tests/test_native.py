@@ -0,0 +1,249 @@
+import inspect
+import json
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from cdktf_cdktf_provider_aws.db_instance import DbInstance
+
+from er_aws_rds.app import synth
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.native import DB_INSTANCE_ATTRIBUTES, stable_stringify
+
+from .conftest import input_data
+
+
+def _no_parameter_group(data: dict[str, Any]) -> None:
+    del data["parameter_group"]
+    del data["ca_cert"]
+    data["reset_password"] = "2024-01-01"  # noqa: S105
+    data["output_resource_db_name"] = "other"
+
+
+def _old_parameter_group(data: dict[str, Any]) -> None:
+    data["old_parameter_group"] = {
+        "family": "postgres13",
+        "name": "postgres-13",
+        "parameters": [{"name": "a", "value": 1}],
+    }
+
+
+def _replica_same_region(data: dict[str, Any]) -> None:
+    data["replica_source"] = {"region": "us-east-1", "identifier": "src-db"}
+    data["db_subnet_group_name"] = "subnets"
+
+
+def _replica_cross_region(data: dict[str, Any]) -> None:
+    data["replica_source"] = {"region": "us-west-2", "identifier": "src-db"}
+    data["db_subnet_group_name"] = "subnets"
+    data["storage_encrypted"] = True
+    data["kms_key_id"] = "alias/rds"
+
+
+def _monitoring_and_events(data: dict[str, Any]) -> None:
+    data["enhanced_monitoring"] = True
+    data["monitoring_interval"] = 60
+    data["event_notifications"] = [
+        {
+            "destination": "arn:aws:sns:us-east-1:123456789012:topic",
+            "source_type": "db-instance",
+            "event_categories": ["failure"],
+        },
+        {"destination": "my-topic", "event_categories": None},
+    ]
+
+
+def _merged_events(data: dict[str, Any]) -> None:
+    data["event_notifications"] = [
+        {"destination": "my-topic", "event_categories": ["failure"]},
+        {"destination": "my-topic", "event_categories": ["backup", "failure"]},
+        {
+            "destination": "my-topic",
+            "source_type": "db-instance",
+            "event_categories": None,
+        },
+        {"destination": "other-topic", "event_categories": ["maintenance"]},
+    ]
+
+
+def _shared_monitoring_role(data: dict[str, Any]) -> None:
+    data["enhanced_monitoring"] = True
+    data["shared_enhanced_monitoring"] = True
+    data["monitoring_interval"] = 60
+
+
+def _snapshot(data: dict[str, Any]) -> None:
+    data["snapshot_identifier"] = "snap-1"
+
+
+def _extra_attributes(data: dict[str, Any]) -> None:
+    data.update({
+        "performance_insights_enabled": True,
+        "maintenance_window": "Mon:00:00-Mon:03:00",
+        "storage_throughput": 125,
+        "iops": 3000,
+        "deletion_protection": True,
+        "enabled_cloudwatch_logs_exports": ["postgresql", "upgrade"],
+        "max_allocated_storage": 100,
+        "vpc_security_group_ids": ["sg-1"],
+        "kms_key_id": "arn:aws:kms:us-east-1:1:key/x",
+        "storage_encrypted": True,
+        "timeouts": {"create": "60m"},
+        "blue_green_update": {"enabled": True},
+    })
+
+
+def _unicode_and_empty(data: dict[str, Any]) -> None:
+    data["parameter_group"] = {"family": "postgres14", "parameters": []}
+    data["multi_az"] = True
+    data["tags"] = {"unicodé": 'välue "q" \n tab\t <>& ', "Zz": "", "a": "\u2028"}
+    del data["default_tags"]
+
+
+def _shared_parameter_groups(data: dict[str, Any]) -> None:
+    data["parameter_group"]["shared"] = True
+    data["old_parameter_group"] = {
+        "family": "aurora-mysql5.7",
+        "shared": True,
+        "parameters": [{"name": "b", "value": 2}],
+    }
+
+
+def _long_identifier(data: dict[str, Any]) -> None:
+    data["identifier"] = "x" * 300
+
+
+def _split_stacks(data: dict[str, Any]) -> None:
+    data["split_stacks"] = True
+    _old_parameter_group(data)
+    _monitoring_and_events(data)
+
+
+def _split_stacks_shared(data: dict[str, Any]) -> None:
+    data["split_stacks"] = True
+    _shared_parameter_groups(data)
+    data["enhanced_monitoring"] = True
+    data["monitoring_interval"] = 60
+
+
+def _split_stacks_long_identifier(data: dict[str, Any]) -> None:
+    data["split_stacks"] = True
+    _long_identifier(data)
+
+
+CORPUS: dict[str, Callable[[dict[str, Any]], None]] = {
+    "default": lambda _: None,
+    "no_parameter_group": _no_parameter_group,
+    "old_parameter_group": _old_parameter_group,
+    "replica_same_region": _replica_same_region,
+    "replica_cross_region": _replica_cross_region,
+    "monitoring_and_events": _monitoring_and_events,
+    "merged_events": _merged_events,
+    "shared_monitoring_role": _shared_monitoring_role,
+    "snapshot": _snapshot,
+    "extra_attributes": _extra_attributes,
+    "unicode_and_empty": _unicode_and_empty,
+    "shared_parameter_groups": _shared_parameter_groups,
+    "long_identifier": _long_identifier,
+    "split_stacks": _split_stacks,
+    "split_stacks_shared": _split_stacks_shared,
+    "split_stacks_long_identifier": _split_stacks_long_identifier,
+}
+
+
+@pytest.mark.parametrize("case", CORPUS)
+def test_native_backend_is_byte_equivalent(case: str, tmp_path: Path) -> None:
+    """Both backends write the same files, byte for byte"""
+    raw = input_data(parameters=None)
+    CORPUS[case](raw["data"])
+
+    for backend in ("jsii", "native"):
+        synth(
+            AppInterfaceInput.model_validate(raw),
+            outdir=str(tmp_path / backend),
+            backend=backend,
+        )
+
+    files = sorted(
+        f.relative_to(tmp_path / "jsii")
+        for f in (tmp_path / "jsii").rglob("*")
+        if f.is_file()
+    )
+    assert files == sorted(
+        f.relative_to(tmp_path / "native")
+        for f in (tmp_path / "native").rglob("*")
+        if f.is_file()
+    )
+    for f in files:
+        assert (tmp_path / "native" / f).read_bytes() == (
+            tmp_path / "jsii" / f
+        ).read_bytes()
+
+
+def test_event_subscriptions_are_scoped_by_source_type(tmp_path: Path) -> None:
+    """Groups of the same destination only differ by their source_type"""
+    raw = input_data(parameters=None)
+    _merged_events(raw["data"])
+    synth(AppInterfaceInput.model_validate(raw), outdir=str(tmp_path), backend="native")
+
+    doc = json.loads((tmp_path / "stacks" / "CDKTF" / "cdk.tf.json").read_text())
+    subscriptions = doc["resource"]["aws_db_event_subscription"]
+    assert {
+        id_: subscription.get("source_type")
+        for id_, subscription in subscriptions.items()
+    } == {
+        "my-topic_all_event_subs": None,
+        "my-topic_db-instance_event_subs": "db-instance",
+        "other-topic_all_event_subs": None,
+    }
+
+
+@pytest.mark.parametrize("backend", ["jsii", "native"])
+@pytest.mark.parametrize("case", CORPUS)
+def test_backends_do_not_mutate_input(case: str, backend: str, tmp_path: Path) -> None:
+    """Both backends leave the input model untouched, excluded fields included"""
+    raw = input_data(parameters=None)
+    CORPUS[case](raw["data"])
+    ai_input = AppInterfaceInput.model_validate(raw)
+    before = ai_input.model_copy(deep=True)
+
+    synth(ai_input, outdir=str(tmp_path), backend=backend)
+
+    assert ai_input == before
+
+
+def test_db_instance_attributes_match_provider() -> None:
+    """DB_INSTANCE_ATTRIBUTES follows the DbInstance signature of the pinned provider"""
+    params = inspect.signature(DbInstance.__init__).parameters
+    meta_arguments = {
+        "self",
+        "scope",
+        "id_",
+        "connection",
+        "count",
+        "depends_on",
+        "for_each",
+        "lifecycle",
+        "provider",
+        "provisioners",
+    }
+    assert set(params) - meta_arguments == DB_INSTANCE_ATTRIBUTES
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (0.5, "0.5"),
+        (1e-7, "1e-7"),
+        (0.00001, "0.00001"),
+        (1e21, "1e+21"),
+        (1e16, "10000000000000000"),
+        (-2.5e-10, "-2.5e-10"),
+        ([], "[\n]"),
+        ({"b": None, "a": [None]}, '{\n  "a": [\n    null\n  ]\n}'),
+    ],
+)
+def test_stable_stringify(value: Any, expected: str) -> None:  # noqa: ANN401
+    """Numbers, empty containers and undefined are rendered as in JavaScript"""
+    assert stable_stringify(value) == expected
@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+
+import pytest
+from external_resources_io.terraform import TerraformJsonPlanParser
+
+from er_aws_rds.plan import StreamingPlanParser, iter_resource_changes
+
+PLAN = {
+    "format_version": "1.2",
+    "prior_state": {
+        "values": {"tricky": 'a "quoted" } ] [ { \\ string', "n": [1, 2.5, None, True]},
+        "unicode": "ünïcødé \u2028",
+    },
+    "resource_changes": [
+        {
+            "address": "aws_db_instance.test-rds",
+            "type": "aws_db_instance",
+            "name": "test-rds",
+            "change": {
+                "actions": ["update"],
+                "before": {"engine": "postgres", "engine_version": "14.6"},
+                "after": {"engine": "postgres", "engine_version": "15.2", "x": "}\\\\"},
+                "after_unknown": {},
+            },
+        },
+        {
+            "address": "random_password.p",
+            "type": "random_password",
+            "name": "p",
+            "change": {"actions": ["no-op"], "after_unknown": {}},
+        },
+    ],
+    "planned_values": {"root_module": {"resources": []}},
+    "errored": False,
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_streaming_plan_parser(tmp_path: Path, chunk_size: int) -> None:
+    """The streamed resource changes match the fully parsed plan ones"""
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(json.dumps(PLAN, indent=2, ensure_ascii=False))
+    full = TerraformJsonPlanParser(str(plan_path)).plan.resource_changes
+
+    assert list(iter_resource_changes(plan_path, chunk_size=chunk_size)) == full
+    streamed = StreamingPlanParser(
+        plan_path, types={"aws_db_instance"}, chunk_size=chunk_size
+    )
+    assert streamed.plan.resource_changes == full[:1]
+
+
+def test_streaming_plan_parser_truncated(tmp_path: Path) -> None:
+    """A truncated plan file is an error"""
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text(json.dumps(PLAN)[:-60])
+    with pytest.raises(ValueError, match="end of the plan file"):
+        list(iter_resource_changes(plan_path, chunk_size=16))
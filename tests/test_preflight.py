@@ -0,0 +1,165 @@
+import json
+from pathlib import Path
+
+from botocore.stub import Stubber
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.lookup_cache import LookupCache
+from er_aws_rds.preflight import (
+    DB_INSTANCE,
+    DB_SNAPSHOT,
+    INPUT,
+    Reference,
+    check_references,
+    load_references,
+    references,
+)
+
+from .conftest import input_data
+
+
+def test_references() -> None:
+    """Snapshots and replica sources are gathered, ARNs give their region"""
+    data = input_data(parameters=None)
+    data["data"]["snapshot_identifier"] = "snap"
+    data["data"]["replicate_source_db"] = "arn:aws:rds:us-west-2:123456789012:db:source"
+    ai_input = AppInterfaceInput.model_validate(data)
+
+    assert references(ai_input.data, "input.json") == [
+        Reference(
+            "input.json",
+            DB_INSTANCE,
+            "aws",
+            "us-west-2",
+            "arn:aws:rds:us-west-2:123456789012:db:source",
+        ),
+        Reference(
+            "input.json",
+            DB_SNAPSHOT,
+            "aws",
+            "us-east-1",
+            "snap",
+            dependent=Reference(
+                "input.json", DB_INSTANCE, "aws", "us-east-1", "test-rds"
+            ),
+        ),
+    ]
+
+
+def test_check_references() -> None:
+    """One filtered call per region and kind, available resources are cached"""
+    refs = [
+        Reference("a.json", DB_INSTANCE, "aws", "us-west-2", "source-a"),
+        Reference("b.json", DB_INSTANCE, "aws", "us-west-2", "source-b"),
+        Reference("c.json", DB_INSTANCE, "aws", "us-west-2", "source-a"),
+        Reference("d.json", DB_SNAPSHOT, "aws", "us-east-1", "snap"),
+    ]
+    registry = ClientRegistry()
+    cache = LookupCache()
+    with (
+        Stubber(registry.rds("us-west-2")) as west,
+        Stubber(registry.rds("us-east-1")) as east,
+    ):
+        west.add_response(
+            "describe_db_instances",
+            {
+                "DBInstances": [
+                    {
+                        "DBInstanceIdentifier": "source-a",
+                        "DBInstanceStatus": "available",
+                    },
+                    {
+                        "DBInstanceIdentifier": "source-b",
+                        "DBInstanceStatus": "creating",
+                    },
+                ]
+            },
+            {
+                "Filters": [
+                    {"Name": "db-instance-id", "Values": ["source-a", "source-b"]}
+                ]
+            },
+        )
+        east.add_response(
+            "describe_db_snapshots",
+            {"DBSnapshots": []},
+            {
+                "Filters": [{"Name": "db-snapshot-id", "Values": ["snap"]}],
+                "IncludeShared": True,
+            },
+        )
+        issues = check_references(refs, registry=registry, cache=cache)
+        west.assert_no_pending_responses()
+        east.assert_no_pending_responses()
+
+        # source-a is cached, no call is made
+        assert not check_references(refs[:1], registry=registry, cache=cache)
+
+    assert [(i.source, i.msg) for i in issues] == [
+        ("b.json", "db_instance source-b in us-west-2 is creating"),
+        ("d.json", "db_snapshot snap not found in us-east-1"),
+    ]
+
+
+def test_transient_states_and_restored_instances() -> None:
+    """Busy sources are usable, the snapshot of an existing instance is not checked"""
+    restored = Reference("restored.json", DB_INSTANCE, "aws", "us-east-1", "restored")
+    refs = [
+        Reference("a.json", DB_INSTANCE, "aws", "us-east-1", "busy"),
+        Reference(
+            "restored.json",
+            DB_SNAPSHOT,
+            "aws",
+            "us-east-1",
+            "deleted-snap",
+            dependent=restored,
+        ),
+    ]
+    registry = ClientRegistry()
+    with Stubber(registry.rds("us-east-1")) as stubber:
+        stubber.add_response(
+            "describe_db_instances",
+            {
+                "DBInstances": [
+                    {"DBInstanceIdentifier": "busy", "DBInstanceStatus": "backing-up"},
+                    {
+                        "DBInstanceIdentifier": "restored",
+                        "DBInstanceStatus": "modifying",
+                    },
+                ]
+            },
+            {"Filters": [{"Name": "db-instance-id", "Values": ["busy", "restored"]}]},
+        )
+        stubber.add_response(
+            "describe_db_snapshots",
+            {"DBSnapshots": []},
+            {
+                "Filters": [{"Name": "db-snapshot-id", "Values": ["deleted-snap"]}],
+                "IncludeShared": True,
+            },
+        )
+        assert not check_references(
+            refs, registry=registry, cache=LookupCache(), workers=1
+        )
+        stubber.assert_no_pending_responses()
+
+
+def test_load_references(tmp_path: Path) -> None:
+    """An unusable input is reported, the other inputs are still loaded"""
+    valid = input_data(parameters=None)
+    valid["data"]["snapshot_identifier"] = "snap"
+    (tmp_path / "valid.json").write_text(json.dumps(valid))
+    (tmp_path / "broken.json").write_text("{")
+
+    refs, issues = load_references([
+        str(tmp_path / "broken.json"),
+        str(tmp_path / "missing.json"),
+        str(tmp_path / "valid.json"),
+    ])
+
+    assert [(ref.kind, ref.identifier) for ref in refs] == [(DB_SNAPSHOT, "snap")]
+    assert [(issue.source, issue.kind) for issue in issues] == [
+        (str(tmp_path / "broken.json"), INPUT),
+        (str(tmp_path / "missing.json"), INPUT),
+    ]
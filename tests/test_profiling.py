@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from er_aws_rds.app import synth
+from er_aws_rds.cache import SynthCache
+from er_aws_rds.profiling import REPORT_FILE, SynthProfiler
+
+from .conftest import input_object
+
+STACK_PHASES = [
+    "stack/providers",
+    "stack/password",
+    "stack/parameter_groups",
+    "stack/enhanced_monitoring",
+    "stack/db_replicas",
+    "stack/kms_key",
+    "stack/db_instance",
+    "stack/event_notifications",
+    "stack/outputs",
+]
+
+
+@pytest.mark.parametrize("backend", ["jsii", "native"])
+def test_synth_profile_report(tmp_path: Path, backend: str) -> None:
+    """Every stack phase is reported, with the constructs it added"""
+    synth(
+        input_object(), outdir=str(tmp_path), backend=backend, profiler=SynthProfiler()
+    )
+
+    report = json.loads((tmp_path / REPORT_FILE).read_text())
+    assert report["backend"] == backend
+    assert not report["cache_hit"]
+    phases = {p["name"]: p for p in report["phases"]}
+    assert [n for n in phases if n.startswith("stack/")] == STACK_PHASES
+    assert phases["stack/db_instance"]["constructs"] == 1
+    assert all(p["peak_rss_kib"] > 0 for p in report["phases"])
+
+
+def test_synth_profile_not_cached(tmp_path: Path) -> None:
+    """The report of a cache hit only has the cache lookup"""
+    cache = SynthCache(tmp_path / "cache")
+    synth(input_object(), outdir=str(tmp_path / "first"), cache=cache, backend="native")
+    synth(
+        input_object(),
+        outdir=str(tmp_path / "second"),
+        cache=cache,
+        backend="native",
+        profiler=SynthProfiler(),
+    )
+
+    assert not (tmp_path / "first" / REPORT_FILE).exists()
+    report = json.loads((tmp_path / "second" / REPORT_FILE).read_text())
+    assert report["cache_hit"]
+    assert [p["name"] for p in report["phases"]] == ["cache_get"]
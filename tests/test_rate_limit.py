@@ -0,0 +1,143 @@
+import subprocess  # noqa: S404
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from botocore.awsrequest import AWSResponse
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.lookup_cache import LookupCache
+from er_aws_rds.rate_limit import Limit, RateLimiter, parse_limits
+
+from .test_metrics import ENGINE_VERSIONS, THROTTLED
+
+ROOT = Path(__file__).parents[1]
+
+
+class FakeClock:
+    """Clock advanced by the sleeps"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        """Current time"""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Records and advances"""
+        self.sleeps.append(seconds)
+
+
+def test_token_bucket() -> None:
+    """Calls over the burst wait for their token, a throttle empties the bucket"""
+    clock = FakeClock()
+    limiter = RateLimiter(
+        Limit(rate=2, burst=2),
+        {"DescribeDBEngineVersions": Limit(rate=1, burst=1)},
+        clock=clock.time,
+        sleep=clock.sleep,
+    )
+
+    waits = [
+        limiter.acquire("123", "us-east-1", "DescribeDBParameterGroups")
+        for _ in range(4)
+    ]
+    assert waits == [0, 0, 0.5, 1.0]
+    # Every (account, region, operation) has its own bucket
+    assert limiter.acquire("123", "us-east-1", "DescribeDBEngineVersions") == 0
+    assert limiter.acquire("456", "us-east-1", "DescribeDBParameterGroups") == 0
+
+    clock.now += 10
+    limiter.throttled("123", "us-east-1", "DescribeDBParameterGroups")
+    assert limiter.acquire("123", "us-east-1", "DescribeDBParameterGroups") == 0.5  # noqa: PLR2004
+
+
+def test_parse_limits() -> None:
+    """The default and the per operation rates of ER_RATE_LIMIT"""
+    assert parse_limits("4,DescribeDBEngineVersions=0.5") == (
+        Limit(4, 4),
+        {"DescribeDBEngineVersions": Limit(0.5, 0.5)},
+    )
+    assert parse_limits("2", burst=5) == (Limit(2, 5), {})
+
+
+def test_buckets_are_shared_by_processes(tmp_path: Path) -> None:
+    """Processes sharing the directory share the quota"""
+    code = (
+        "import sys\n"
+        "from er_aws_rds.rate_limit import Limit, RateLimiter\n"
+        "limiter = RateLimiter(Limit(20, 1), directory=sys.argv[1])\n"
+        "for _ in range(5):\n"
+        "    limiter.acquire('123', 'us-east-1', 'DescribeDBEngineVersions')\n"
+    )
+    start = time.perf_counter()
+    processes = [
+        subprocess.Popen(  # noqa: S603
+            [sys.executable, "-c", code, str(tmp_path)], cwd=ROOT
+        )
+        for _ in range(3)
+    ]
+    assert all(p.wait() == 0 for p in processes)
+
+    # 15 calls at 20/s with a burst of 1, one process alone would take 0.2s
+    assert time.perf_counter() - start >= 14 / 20
+
+
+def test_fetches_are_coalesced_across_processes(tmp_path: Path) -> None:
+    """A miss waits for the fetch of the same key by another cache of the directory"""
+    first, second = LookupCache(tmp_path), LookupCache(tmp_path)
+    fetching, release = threading.Event(), threading.Event()
+    fetches = []
+
+    def slow_fetch() -> str:
+        fetches.append("first")
+        fetching.set()
+        release.wait(5)
+        return "value"
+
+    thread = threading.Thread(
+        target=lambda: first.get_or_set("describe", ("us-east-1",), slow_fetch)
+    )
+    thread.start()
+    fetching.wait(5)
+    threading.Timer(0.2, release.set).start()
+
+    assert second.get_or_set("describe", ("us-east-1",), lambda: "other") == "value"
+    thread.join()
+    assert fetches == ["first"]
+
+
+class _Raw:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def stream(self, **_: Any) -> Iterator[bytes]:  # noqa: ANN401
+        yield self.body
+
+
+def test_registry_rate_limits_attempts(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Every attempt takes a token and a throttled attempt empties the bucket"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr("botocore.endpoint.time.sleep", lambda _: None)
+    clock = FakeClock()
+    limiter = RateLimiter(Limit(rate=1, burst=5), clock=clock.time, sleep=clock.sleep)
+    registry = ClientRegistry(rate_limiter=limiter, account="123")
+    responses = [(400, THROTTLED), (200, ENGINE_VERSIONS)]
+
+    def send(request: Any, **_: Any) -> AWSResponse:  # noqa: ANN401
+        status, body = responses.pop(0)
+        return AWSResponse(request.url, status, {}, _Raw(body))
+
+    client = registry.rds("us-east-1")
+    client.meta.events.register("before-send", send)
+    client.describe_db_engine_versions(Engine="postgres", EngineVersion="14.6")
+
+    # The retry waits a full token after the throttle
+    assert clock.sleeps == [1.0]
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+from botocore.stub import Stubber
+
+from er_aws_rds.app import synth
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.lookup_cache import LookupCache
+from er_aws_rds.resolver import AwsArnResolver, StaticArnResolver
+
+from .conftest import input_data
+
+KEY_ARN = "arn:aws:kms:us-east-1:123456789012:key/1234abcd"
+TOPIC_ARN = "arn:aws:sns:us-east-1:123456789012:my-topic"
+
+
+def test_resolved_arns_replace_data_sources(tmp_path: Path) -> None:
+    """Resolved ARNs are embedded by both backends, unresolved names keep their data source"""
+    raw = input_data(parameters=None)
+    raw["data"]["kms_key_id"] = "alias/rds"
+    raw["data"]["event_notifications"] = [
+        {"destination": "my-topic", "event_categories": None},
+        {"destination": "unknown-topic", "event_categories": None},
+    ]
+    ai_input = AppInterfaceInput.model_validate(raw)
+    resolver = StaticArnResolver({
+        "kms": {"us-east-1": {"alias/rds": KEY_ARN}},
+        "sns": {"us-east-1": {"my-topic": TOPIC_ARN}},
+    })
+
+    for backend in ("jsii", "native"):
+        synth(
+            ai_input,
+            outdir=str(tmp_path / backend),
+            backend=backend,
+            resolver=resolver,
+        )
+
+    stack = tmp_path / "jsii" / "stacks" / "CDKTF" / "cdk.tf.json"
+    assert (
+        stack.read_bytes()
+        == (tmp_path / "native" / "stacks" / "CDKTF" / "cdk.tf.json").read_bytes()
+    )
+    doc = json.loads(stack.read_text())
+    assert list(doc["data"]) == ["aws_sns_topic"]
+    assert list(doc["data"]["aws_sns_topic"]) == ["data_unknown-topic"]
+    assert doc["resource"]["aws_db_instance"]["test-rds"]["kms_key_id"] == KEY_ARN
+    subscriptions = doc["resource"]["aws_db_event_subscription"]
+    assert subscriptions["my-topic_all_event_subs"]["sns_topic"] == TOPIC_ARN
+    assert ai_input.data.kms_key_id == "alias/rds"
+
+
+def test_aws_arn_resolver() -> None:
+    """Aliases and topics are listed once per region"""
+    registry = ClientRegistry()
+    resolver = AwsArnResolver(registry=registry, cache=LookupCache())
+    with (
+        Stubber(registry.client("kms", "us-east-1")) as kms,
+        Stubber(registry.client("sns", "us-east-1")) as sns,
+    ):
+        kms.add_response(
+            "list_aliases",
+            {
+                "Aliases": [
+                    {
+                        "AliasName": "alias/rds",
+                        "AliasArn": "arn:aws:kms:us-east-1:123456789012:alias/rds",
+                        "TargetKeyId": "1234abcd",
+                    },
+                    {
+                        "AliasName": "alias/unused",
+                        "AliasArn": "arn:aws:kms:us-east-1:123456789012:alias/unused",
+                    },
+                ]
+            },
+            {},
+        )
+        sns.add_response("list_topics", {"Topics": [{"TopicArn": TOPIC_ARN}]}, {})
+
+        for _ in range(2):
+            assert resolver.kms_key_arn("aws", "us-east-1", "alias/rds") == KEY_ARN
+            assert resolver.kms_key_arn("aws", "us-east-1", "alias/unused") is None
+            assert resolver.sns_topic_arn("aws", "us-east-1", "my-topic") == TOPIC_ARN
+            assert resolver.sns_topic_arn("aws", "us-east-1", "other") is None
+        kms.assert_no_pending_responses()
+        sns.assert_no_pending_responses()
+
+
+def test_not_found_is_cached_briefly(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A missing role is looked up again once NOT_FOUND_TTL expires"""
+    registry = ClientRegistry()
+    resolver = AwsArnResolver(registry=registry, cache=LookupCache())
+    with Stubber(registry.client("iam", "us-east-1")) as iam:
+        for _ in range(3):
+            iam.add_client_error("get_role", "NoSuchEntity", http_status_code=404)
+
+        for _ in range(2):
+            assert resolver.iam_role_arn("aws", "us-east-1", "missing") is None
+
+        monkeypatch.setattr("er_aws_rds.resolver.NOT_FOUND_TTL", 0)
+        assert resolver.iam_role_arn("aws", "us-east-1", "other") is None
+        assert resolver.iam_role_arn("aws", "us-east-1", "other") is None
+        iam.assert_no_pending_responses()
@@ -0,0 +1,125 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from er_aws_rds.app import init_cdktf_app, synth
+from er_aws_rds.input import AppInterfaceInput, ParameterGroup
+from er_aws_rds.resolver import StaticArnResolver
+from er_aws_rds.shared import monitoring_role_name, parameter_group_name
+
+from .conftest import input_data
+
+
+def test_shared_parameter_group_name_is_content_addressed() -> None:
+    """The name only depends on the family, description and parameters"""
+    pg = ParameterGroup.model_validate({
+        "family": "aurora-mysql5.7",
+        "name": "a",
+        "parameters": [{"name": "x", "value": 1}, {"name": "y", "value": "2"}],
+    })
+    reordered = ParameterGroup.model_validate({
+        "family": "aurora-mysql5.7",
+        "name": "b",
+        "parameters": [{"name": "y", "value": 2}, {"name": "x", "value": "1"}],
+    })
+    changed = ParameterGroup.model_validate({
+        "family": "aurora-mysql5.7",
+        "parameters": [{"name": "x", "value": 1}],
+    })
+
+    assert parameter_group_name(pg) == parameter_group_name(reordered)
+    assert parameter_group_name(pg) != parameter_group_name(changed)
+    assert parameter_group_name(pg).startswith("shared-aurora-mysql5-7-")
+
+
+def test_shared_parameter_group_stack(tmp_path: Path) -> None:
+    """Shared groups get their own stack and state, the database references them"""
+    raw = input_data(parameters=None)
+    raw["data"]["parameter_group"]["shared"] = True
+    ai_input = AppInterfaceInput.model_validate(raw)
+    assert ai_input.data.parameter_group
+    pg_name = parameter_group_name(ai_input.data.parameter_group)
+
+    app = init_cdktf_app(ai_input, outdir=str(tmp_path))
+    app.synth()
+
+    manifest = (tmp_path / "manifest.json").read_text()
+    db_stack = (tmp_path / "stacks" / "CDKTF" / "cdk.tf.json").read_text()
+    shared_stack = (
+        tmp_path / "stacks" / f"CDKTF-{pg_name}" / "cdk.tf.json"
+    ).read_text()
+    assert f'"dependencies": [\n        "CDKTF-{pg_name}"' in manifest
+    assert f'"parameter_group_name": "{pg_name}"' in db_stack
+    assert "aws_db_parameter_group" not in db_stack
+    assert '"prevent_destroy": true' in shared_stack
+    assert f"rds/shared/us-east-1/{pg_name}/terraform.tfstate" in shared_stack
+
+
+@pytest.mark.parametrize("backend", ["jsii", "native"])
+def test_destroy_leaves_shared_stacks_out(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, backend: str
+) -> None:
+    """A database destroy never plans the destroy of the resources it shares"""
+    raw = input_data(parameters=None)
+    raw["data"]["parameter_group"]["shared"] = True
+    raw["data"]["enhanced_monitoring"] = True
+    raw["data"]["shared_enhanced_monitoring"] = True
+    ai_input = AppInterfaceInput.model_validate(raw)
+    assert ai_input.data.parameter_group
+    pg_name = parameter_group_name(ai_input.data.parameter_group)
+    monkeypatch.setenv("ACTION", "Destroy")
+
+    synth(ai_input, outdir=str(tmp_path), backend=backend)
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    db_stack = json.loads((tmp_path / "stacks" / "CDKTF" / "cdk.tf.json").read_text())
+    assert list(manifest["stacks"]) == ["CDKTF"]
+    assert manifest["stacks"]["CDKTF"]["dependencies"] == []
+    db_instance = db_stack["resource"]["aws_db_instance"]["test-rds"]
+    assert db_instance["parameter_group_name"] == pg_name
+
+
+def test_shared_monitoring_role_stack(tmp_path: Path) -> None:
+    """The shared role lives in an account wide stack, the database references it"""
+    raw = input_data(parameters=None)
+    raw["data"]["enhanced_monitoring"] = True
+    raw["data"]["shared_enhanced_monitoring"] = True
+    ai_input = AppInterfaceInput.model_validate(raw)
+    role_name = monitoring_role_name("aws")
+    role_arn = f"arn:aws:iam::123456789012:role/{role_name}"
+
+    synth(ai_input, outdir=str(tmp_path / "data"), backend="native")
+    synth(
+        ai_input,
+        outdir=str(tmp_path / "resolved"),
+        backend="native",
+        resolver=StaticArnResolver({"iam": {role_name: role_arn}}),
+    )
+
+    stacks = tmp_path / "data" / "stacks"
+    db_stack = json.loads((stacks / "CDKTF" / "cdk.tf.json").read_text())
+    shared_stack = json.loads(
+        (stacks / f"CDKTF-{role_name}" / "cdk.tf.json").read_text()
+    )
+    assert "aws_iam_role" not in db_stack["resource"]
+    assert db_stack["data"]["aws_iam_role"]["data-enhanced-monitoring"]["name"] == (
+        role_name
+    )
+    db_instance = db_stack["resource"]["aws_db_instance"]["test-rds"]
+    assert db_instance["monitoring_role_arn"] == (
+        "${data.aws_iam_role.data-enhanced-monitoring.arn}"
+    )
+    assert shared_stack["resource"]["aws_iam_role"][role_name]["lifecycle"] == {
+        "prevent_destroy": True
+    }
+    assert shared_stack["terraform"]["backend"]["s3"]["key"].endswith(
+        f"rds/shared/global/{role_name}/terraform.tfstate"
+    )
+
+    resolved = json.loads(
+        (tmp_path / "resolved" / "stacks" / "CDKTF" / "cdk.tf.json").read_text()
+    )
+    assert "data" not in resolved
+    db_instance = resolved["resource"]["aws_db_instance"]["test-rds"]
+    assert db_instance["monitoring_role_arn"] == role_arn
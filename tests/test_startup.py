@@ -0,0 +1,32 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.startup import BUDGET_FILE, measure
+
+# CI runners can be slower than the machines the budget was measured on
+BUDGET_FACTOR = float(os.environ.get("ER_STARTUP_BUDGET_FACTOR", "1.0"))
+BUDGET = json.loads(BUDGET_FILE.read_text())
+
+
+@pytest.mark.parametrize("module", BUDGET)
+def test_no_forbidden_imports(module: str) -> None:
+    """Entry points never load their forbidden modules"""
+    spec = BUDGET[module]
+    result = measure(module, spec["max_ms"], spec["forbidden"], runs=1)
+
+    assert not result.forbidden_loaded
+
+
+@pytest.mark.skipif(
+    os.environ.get("ER_STARTUP_BUDGET", "off").lower() != "on",
+    reason="Wall clock budget, opt-in with ER_STARTUP_BUDGET=on",
+)
+@pytest.mark.parametrize("module", BUDGET)
+def test_startup_budget(module: str) -> None:
+    """Entry points stay within their import budget"""
+    spec = BUDGET[module]
+    result = measure(module, spec["max_ms"] * BUDGET_FACTOR, spec["forbidden"])
+
+    assert result.import_ms <= result.budget_ms
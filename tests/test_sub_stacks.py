@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from er_aws_rds.app import init_cdktf_app, synth
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.sub_stacks import OWNER_TAG
+
+from .conftest import input_data
+
+STATE_KEY = "aws/app-int-example-01/rds/test-rds"
+REMOTE_STATE = "cross-stack-reference-input-CDKTF-parameter-groups"
+
+
+def test_split_stacks(tmp_path: Path) -> None:
+    """Parameter groups and monitoring role get their own stacks and states"""
+    raw = input_data(parameters=None)
+    raw["data"]["split_stacks"] = True
+    raw["data"]["enhanced_monitoring"] = True
+    raw["data"]["monitoring_interval"] = 60
+    synth(AppInterfaceInput.model_validate(raw), outdir=str(tmp_path), backend="native")
+
+    def read(path: Path) -> dict:
+        return json.loads(path.read_text())
+
+    manifest = read(tmp_path / "manifest.json")
+    stacks = {
+        name: read(tmp_path / "stacks" / name / "cdk.tf.json")
+        for name in manifest["stacks"]
+    }
+    db_stack = stacks["CDKTF"]
+    pg_stack = stacks["CDKTF-parameter-groups"]
+    monitoring_stack = stacks["CDKTF-enhanced-monitoring"]
+
+    assert manifest["stacks"]["CDKTF"]["dependencies"] == [
+        "CDKTF-parameter-groups",
+        "CDKTF-enhanced-monitoring",
+    ]
+    assert db_stack["terraform"]["backend"]["s3"]["key"] == (
+        f"{STATE_KEY}/terraform.tfstate"
+    )
+    assert pg_stack["terraform"]["backend"]["s3"]["key"] == (
+        f"{STATE_KEY}/parameter-groups/terraform.tfstate"
+    )
+    assert monitoring_stack["terraform"]["backend"]["s3"]["key"] == (
+        f"{STATE_KEY}/enhanced-monitoring/terraform.tfstate"
+    )
+
+    assert set(db_stack["resource"]) == {"aws_db_instance", "random_password"}
+    assert set(pg_stack["resource"]) == {"aws_db_parameter_group"}
+    assert set(monitoring_stack["resource"]) == {
+        "aws_iam_role",
+        "aws_iam_role_policy_attachment",
+    }
+
+    # The instance reads the group name from the remote state of its stack
+    remote_state = db_stack["data"]["terraform_remote_state"][REMOTE_STATE]
+    assert remote_state["config"] == pg_stack["terraform"]["backend"]["s3"]
+    (output,) = pg_stack["output"]
+    db_instance = db_stack["resource"]["aws_db_instance"]["test-rds"]
+    assert db_instance["parameter_group_name"] == (
+        f"${{data.terraform_remote_state.{REMOTE_STATE}.outputs.{output}}}"
+    )
+    assert db_instance["depends_on"] == []
+
+
+@pytest.mark.parametrize("backend", ["jsii", "native"])
+def test_split_stacks_parameter_group_rename(tmp_path: Path, backend: str) -> None:
+    """A renamed group is created, the previous one is kept for the instance"""
+
+    def synth_pg_stack(pg_name: str) -> dict:
+        raw = input_data(parameters=None)
+        raw["data"]["split_stacks"] = True
+        raw["data"]["parameter_group"]["name"] = pg_name
+        outdir = tmp_path / pg_name
+        synth(AppInterfaceInput.model_validate(raw), str(outdir), backend=backend)
+        stack = outdir / "stacks" / "CDKTF-parameter-groups" / "cdk.tf.json"
+        return json.loads(stack.read_text())["resource"]["aws_db_parameter_group"]
+
+    before = synth_pg_stack("postgres-14")
+    after = synth_pg_stack("postgres-14-renamed")
+
+    assert set(before) == {"test-rds-postgres-14"}
+    assert set(after) == {"test-rds-postgres-14-renamed"}
+    # The sub-stack is applied first. Removing the previous group from its
+    # state must not delete it while the instance still uses it, Terraform
+    # reads skip_destroy from the state written by the previous apply
+    for groups in (before, after):
+        (group,) = groups.values()
+        assert group["skip_destroy"] is True
+        assert group["lifecycle"] == {"create_before_destroy": True}
+        # er_aws_rds.cleanup deletes it once the instance moved off it
+        assert group["tags"][OWNER_TAG] == "test-rds"
+
+
+def test_init_cdktf_app_split_stacks_option(tmp_path: Path) -> None:
+    """split_stacks overrides the input, without sub-stacks nothing changes"""
+    ai_input = AppInterfaceInput.model_validate(input_data(parameters=None))
+
+    app = init_cdktf_app(ai_input, outdir=str(tmp_path / "split"), split_stacks=True)
+    app.synth()
+    no_pg = input_data(parameters=None)
+    del no_pg["data"]["parameter_group"]
+    init_cdktf_app(
+        AppInterfaceInput.model_validate(no_pg),
+        outdir=str(tmp_path / "no_pg"),
+        split_stacks=True,
+    ).synth()
+
+    assert sorted(p.name for p in (tmp_path / "split" / "stacks").iterdir()) == [
+        "CDKTF",
+        "CDKTF-parameter-groups",
+    ]
+    assert [p.name for p in (tmp_path / "no_pg" / "stacks").iterdir()] == ["CDKTF"]
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from er_aws_rds.upgrade_graph import UpgradeGraph
+
+ENGINE_VERSIONS: list[dict[str, Any]] = [
+    {
+        "Engine": "postgres",
+        "EngineVersion": "13.4",
+        "ValidUpgradeTarget": [
+            {"Engine": "postgres", "EngineVersion": "13.10"},
+            {"Engine": "postgres", "EngineVersion": "14.1"},
+        ],
+    },
+    {
+        "Engine": "postgres",
+        "EngineVersion": "13.10",
+        "ValidUpgradeTarget": [{"Engine": "postgres", "EngineVersion": "14.1"}],
+    },
+    {
+        "Engine": "postgres",
+        "EngineVersion": "14.1",
+        "ValidUpgradeTarget": [{"Engine": "postgres", "EngineVersion": "15.2"}],
+    },
+    {"Engine": "postgres", "EngineVersion": "15.2", "ValidUpgradeTarget": []},
+]
+
+
+def test_upgrade_graph_paths(tmp_path: Path) -> None:
+    """Direct targets and shortest paths survive a dump and load"""
+    UpgradeGraph.from_engine_versions(ENGINE_VERSIONS).dump(tmp_path / "graph.json")
+    graph = UpgradeGraph.load(tmp_path / "graph.json")
+
+    assert graph.engines["postgres"]["13.4"] == ["13.10", "14.1"]
+    assert graph.targets("postgres", "13.4") == {"13.10", "14.1"}
+    assert graph.shortest_path("postgres", "13.4", "15.2") == ["13.4", "14.1", "15.2"]
+    assert graph.shortest_path("postgres", "15.2", "13.4") is None
+    assert not graph.knows("mysql", "8.0.32")
+
+
+def test_upgrade_graph_format_version(tmp_path: Path) -> None:
+    """Graph files of another format version are rejected"""
+    (tmp_path / "graph.json").write_text('{"format_version": 0}')
+    with pytest.raises(ValueError, match="format_version"):
+        UpgradeGraph.load(tmp_path / "graph.json")
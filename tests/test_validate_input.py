@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+from er_aws_rds.validate_input import report, validate_inputs
+
+from .conftest import input_data
+
+
+def test_validate_inputs(tmp_path: Path) -> None:
+    """Every input is validated and invalid ones report structured errors"""
+    bad_az = input_data(parameters=None)
+    bad_az["data"]["availability_zone"] = "us-west-1a"
+    logical_replication = input_data(parameters=None)
+    logical_replication["data"]["parameter_group"]["parameters"] = [
+        {"name": "rds.logical_replication", "value": "1", "apply_method": "immediate"}
+    ]
+    (tmp_path / "a_valid.json").write_text(json.dumps(input_data(parameters=None)))
+    (tmp_path / "b_bad_az.json").write_text(json.dumps(bad_az))
+    (tmp_path / "c_logical.json").write_text(json.dumps(logical_replication))
+    (tmp_path / "d_broken.json").write_text("{")
+
+    summary = report(validate_inputs([str(tmp_path)], workers=2))
+
+    valid, bad_az_result, logical, broken = summary["results"]
+    assert [r["valid"] for r in summary["results"]] == [True, False, False, False]
+    assert summary["invalid"] == len(summary["results"]) - 1
+    assert not valid["errors"]
+    assert bad_az_result["errors"][0]["loc"] == "data"
+    assert "Availability_zone" in bad_az_result["errors"][0]["msg"]
+    assert logical["errors"][0]["type"] == "logical_replication"
+    assert broken["errors"][0]["type"] == "unreadable_input"
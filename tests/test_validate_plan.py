@@ -0,0 +1,474 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from botocore.stub import Stubber
+from external_resources_io.terraform import (
+    Action,
+    ResourceChange,
+    TerraformJsonPlanParser,
+)
+from validate_plan import (
+    CHECKS,
+    UPGRADE_GRAPH_MAX_AGE,
+    AWSApi,
+    PlanCheck,
+    RDSPlanValidator,
+    checked_types,
+    load_upgrade_graph,
+    main,
+    plan_pairs,
+    validate_plans,
+)
+
+from er_aws_rds.aws import ClientRegistry
+from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.lookup_cache import LookupCache
+from er_aws_rds.upgrade_graph import UpgradeGraph
+
+from .conftest import input_data, input_object
+from .test_upgrade_graph import ENGINE_VERSIONS
+
+
+def write_plan(path: Path, before: dict, after: dict) -> str:
+    """Writes a plan with a single aws_db_instance update"""
+    path.write_text(
+        json.dumps({
+            "resource_changes": [
+                {
+                    "address": "aws_db_instance.test-rds",
+                    "type": "aws_db_instance",
+                    "name": "test-rds",
+                    "change": {
+                        "actions": ["update"],
+                        "before": before,
+                        "after": after,
+                        "after_unknown": {},
+                    },
+                }
+            ]
+        })
+    )
+    return str(path)
+
+
+def test_valid_update_versions_are_cached() -> None:
+    """Identical (engine, version) lookups call the API once"""
+    registry = ClientRegistry()
+    api = AWSApi(
+        config_options={"region_name": "us-east-1"},
+        registry=registry,
+        cache=LookupCache(),
+    )
+    with Stubber(registry.rds("us-east-1")) as stubber:
+        stubber.add_response(
+            "describe_db_engine_versions",
+            {
+                "DBEngineVersions": [
+                    {
+                        "Engine": "postgres",
+                        "EngineVersion": "14.6",
+                        "ValidUpgradeTarget": [
+                            {"EngineVersion": "14.7"},
+                            {"EngineVersion": "15.2"},
+                        ],
+                    }
+                ]
+            },
+            {"Engine": "postgres", "EngineVersion": "14.6", "IncludeAll": True},
+        )
+        for _ in range(3):
+            assert api.get_rds_valid_update_versions("postgres", "14.6") == {
+                "14.7",
+                "15.2",
+            }
+        stubber.assert_no_pending_responses()
+
+
+def test_upgrade_path_from_graph(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With an upgrade graph, no API call is made and the error shows the path"""
+    UpgradeGraph.from_engine_versions(ENGINE_VERSIONS, region="us-east-1").dump(
+        tmp_path / "graph.json"
+    )
+    monkeypatch.setenv("ER_UPGRADE_GRAPH", str(tmp_path / "graph.json"))
+    plan = write_plan(
+        tmp_path / "plan.json",
+        {"engine": "postgres", "engine_version": "13.4"},
+        {"engine": "postgres", "engine_version": "15.2"},
+    )
+
+    validator = RDSPlanValidator(TerraformJsonPlanParser(plan), input_object())
+
+    assert not validator.validate()
+    assert "Upgrade path: 13.4 -> 14.1 -> 15.2" in validator.errors[0]
+
+
+def test_upgrade_graph_region_and_age(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Graphs of another region or older than ER_UPGRADE_GRAPH_MAX_AGE are ignored"""
+    path = tmp_path / "graph.json"
+    monkeypatch.setenv("ER_UPGRADE_GRAPH", str(path))
+
+    UpgradeGraph.from_engine_versions(ENGINE_VERSIONS, region="us-east-1").dump(path)
+    assert load_upgrade_graph("aws", "us-east-1")
+    assert load_upgrade_graph("aws", "eu-west-1") is None
+    assert load_upgrade_graph("aws-cn", "us-east-1") is None
+
+    UpgradeGraph.from_engine_versions(ENGINE_VERSIONS).dump(path)
+    assert load_upgrade_graph("aws", "eu-west-1")
+
+    UpgradeGraph(
+        {}, region="us-east-1", generated_at=time.time() - UPGRADE_GRAPH_MAX_AGE - 60
+    ).dump(path)
+    assert load_upgrade_graph("aws", "us-east-1") is None
+    monkeypatch.setenv("ER_UPGRADE_GRAPH_MAX_AGE", str(UPGRADE_GRAPH_MAX_AGE * 2))
+    assert load_upgrade_graph("aws", "us-east-1")
+
+
+def test_parameter_groups_check(tmp_path: Path) -> None:
+    """Missing and wrong family parameter groups are errors, the inventory is paginated and cached"""
+
+    def instance(name: str, pg: str) -> dict:
+        return {
+            "address": f"aws_db_instance.{name}",
+            "type": "aws_db_instance",
+            "name": name,
+            "change": {
+                "actions": ["create"],
+                "before": None,
+                "after": {
+                    "engine": "postgres",
+                    "engine_version": "15.2",
+                    "parameter_group_name": pg,
+                },
+                "after_unknown": {},
+            },
+        }
+
+    plan = tmp_path / "plan.json"
+    plan.write_text(
+        json.dumps({
+            "resource_changes": [
+                instance("planned", "test-rds-pg"),
+                instance("existing", "custom-pg15"),
+                instance("missing", "nope"),
+                instance("wrong", "default.postgres14"),
+                {
+                    "address": "aws_db_parameter_group.test-rds-pg",
+                    "type": "aws_db_parameter_group",
+                    "name": "test-rds-pg",
+                    "change": {
+                        "actions": ["create"],
+                        "after": {"name": "test-rds-pg", "family": "postgres15"},
+                        "after_unknown": {},
+                    },
+                },
+            ]
+        })
+    )
+    registry = ClientRegistry()
+    api = AWSApi(
+        config_options={"region_name": "us-east-1"},
+        registry=registry,
+        cache=LookupCache(),
+    )
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(str(plan)),
+        input_object(),
+        checks=[CHECKS["parameter_groups"]],
+        aws_api=api,
+    )
+    with Stubber(registry.rds("us-east-1")) as stubber:
+        for group, marker, expected in (
+            (("custom-pg15", "postgres15"), {"Marker": "next"}, {}),
+            (("default.postgres14", "postgres14"), {}, {"Marker": "next"}),
+        ):
+            stubber.add_response(
+                "describe_db_parameter_groups",
+                {
+                    "DBParameterGroups": [
+                        {
+                            "DBParameterGroupName": group[0],
+                            "DBParameterGroupFamily": group[1],
+                        }
+                    ],
+                    **marker,
+                },
+                expected,
+            )
+        assert not validator.validate()
+        stubber.assert_no_pending_responses()
+
+    assert validator.errors == [
+        "parameter_group_name nope does not exist in us-east-1 and is not created by the plan",
+        "parameter_group_name default.postgres14 has family postgres14, postgres 15.2 requires postgres15",
+    ]
+    assert api.get_rds_parameter_groups("postgres15") == {"custom-pg15"}
+
+
+def test_parameter_groups_check_without_engine(tmp_path: Path) -> None:
+    """Replica and snapshot creates don't plan the engine, only existence is checked"""
+
+    def instance(name: str, after: dict, after_unknown: dict) -> dict:
+        return {
+            "address": f"aws_db_instance.{name}",
+            "type": "aws_db_instance",
+            "name": name,
+            "change": {
+                "actions": ["create"],
+                "before": None,
+                "after": after,
+                "after_unknown": after_unknown,
+            },
+        }
+
+    plan = tmp_path / "plan.json"
+    plan.write_text(
+        json.dumps({
+            "resource_changes": [
+                instance(
+                    "replica",
+                    {"replicate_source_db": "src", "parameter_group_name": "pg15"},
+                    {"engine": True, "engine_version": True},
+                ),
+                instance(
+                    "snapshot",
+                    {"snapshot_identifier": "snap", "parameter_group_name": "nope"},
+                    {},
+                ),
+                {
+                    "address": "aws_db_parameter_group.pg15",
+                    "type": "aws_db_parameter_group",
+                    "name": "pg15",
+                    "change": {
+                        "actions": ["create"],
+                        "after": {"name": "pg15", "family": "postgres15"},
+                        "after_unknown": {},
+                    },
+                },
+            ]
+        })
+    )
+    registry = ClientRegistry()
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(str(plan)),
+        input_object(),
+        checks=[CHECKS["parameter_groups"]],
+        aws_api=AWSApi(
+            config_options={"region_name": "us-east-1"},
+            registry=registry,
+            cache=LookupCache(),
+        ),
+    )
+    with Stubber(registry.rds("us-east-1")) as stubber:
+        stubber.add_response("describe_db_parameter_groups", {"DBParameterGroups": []})
+        assert not validator.validate()
+
+    assert validator.errors == [
+        "parameter_group_name nope does not exist in us-east-1 and is not created by the plan",
+    ]
+
+
+def test_old_parameter_group_after_upgrade(tmp_path: Path) -> None:
+    """The old group family is only checked while the plan upgrades the engine"""
+
+    def instance(name: str, before_version: str) -> dict:
+        return {
+            "address": f"aws_db_instance.{name}",
+            "type": "aws_db_instance",
+            "name": name,
+            "change": {
+                "actions": ["update"],
+                "before": {"engine": "postgres", "engine_version": before_version},
+                "after": {
+                    "engine": "postgres",
+                    "engine_version": "14.6",
+                    "parameter_group_name": "test-rds-postgres-14",
+                },
+                "after_unknown": {},
+            },
+        }
+
+    plan = tmp_path / "plan.json"
+    plan.write_text(
+        json.dumps({
+            "resource_changes": [
+                instance("upgraded", "14.6"),
+                instance("upgrading", "13.4"),
+                instance("skipping", "12.9"),
+            ]
+        })
+    )
+    raw = input_data(parameters=None)
+    raw["data"]["parameter_group"]["family"] = "postgres14"
+    raw["data"]["old_parameter_group"] = {
+        "name": "postgres-13",
+        "family": "postgres13",
+    }
+    registry = ClientRegistry()
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(str(plan)),
+        AppInterfaceInput.model_validate(raw),
+        checks=[CHECKS["parameter_groups"]],
+        aws_api=AWSApi(
+            config_options={"region_name": "us-east-1"},
+            registry=registry,
+            cache=LookupCache(),
+        ),
+    )
+    with Stubber(registry.rds("us-east-1")) as stubber:
+        stubber.add_response(
+            "describe_db_parameter_groups",
+            {
+                "DBParameterGroups": [
+                    {
+                        "DBParameterGroupName": f"test-rds-postgres-{version}",
+                        "DBParameterGroupFamily": f"postgres{version}",
+                    }
+                    for version in (13, 14)
+                ]
+            },
+        )
+        assert not validator.validate()
+
+    assert validator.errors == [
+        "old_parameter_group test-rds-postgres-13 has family postgres13, postgres 12.9 requires postgres12",
+    ]
+
+
+def test_checks_run_concurrently(tmp_path: Path) -> None:
+    """Checks run on a thread pool, only on the changes they apply to"""
+    plan = write_plan(
+        tmp_path / "plan.json",
+        {"engine": "postgres", "engine_version": "14.6"},
+        {"engine": "postgres", "engine_version": "14.6"},
+    )
+    barrier = threading.Barrier(2, timeout=5)
+
+    def waits(_: RDSPlanValidator, change: ResourceChange) -> list[str]:
+        barrier.wait()
+        return [f"waited on {change.address}"]
+
+    def fails(_: RDSPlanValidator, __: ResourceChange) -> list[str]:
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    checks = [
+        PlanCheck(
+            "a", waits, frozenset({"aws_db_instance"}), frozenset({Action.ActionUpdate})
+        ),
+        PlanCheck(
+            "b", waits, frozenset({"aws_db_instance"}), frozenset({Action.ActionUpdate})
+        ),
+        PlanCheck(
+            "c", fails, frozenset({"aws_db_instance"}), frozenset({Action.ActionCreate})
+        ),
+        PlanCheck(
+            "d",
+            fails,
+            frozenset({"aws_db_parameter_group"}),
+            frozenset({Action.ActionUpdate}),
+        ),
+    ]
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(plan), input_object(), checks=checks, max_workers=2
+    )
+
+    assert not validator.validate()
+    assert [r.check for r in validator.results] == ["a", "b"]
+    assert validator.errors == ["waited on aws_db_instance.test-rds"] * 2
+    assert all(r.duration_ms > 0 for r in validator.results)
+    assert checked_types(checks) == {"aws_db_instance", "aws_db_parameter_group"}
+
+
+def test_check_exceptions_are_errors(tmp_path: Path) -> None:
+    """A failing check is reported as an error of the change"""
+    plan = write_plan(tmp_path / "plan.json", {}, {})
+
+    validator = RDSPlanValidator(
+        TerraformJsonPlanParser(plan),
+        input_object(),
+        checks=[CHECKS["engine_version"]],
+    )
+
+    assert not validator.validate()
+    assert validator.errors == [
+        "Check engine_version failed on aws_db_instance.test-rds: 'engine_version'"
+    ]
+
+
+def test_validate_plans(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+) -> None:
+    """Pairs of a manifest and a directory are validated in one report"""
+    UpgradeGraph.from_engine_versions(ENGINE_VERSIONS, region="us-east-1").dump(
+        tmp_path / "graph.json"
+    )
+    monkeypatch.setenv("ER_UPGRADE_GRAPH", str(tmp_path / "graph.json"))
+    for name, desired in (("ok", "13.4"), ("bad", "15.2")):
+        (tmp_path / "plans" / name).mkdir(parents=True)
+        write_plan(
+            tmp_path / "plans" / name / "plan.json",
+            {"engine": "postgres", "engine_version": "13.4"},
+            {"engine": "postgres", "engine_version": desired},
+        )
+        (tmp_path / "plans" / name / "input.json").write_text(
+            json.dumps(input_data(parameters=None))
+        )
+    (tmp_path / "manifest.json").write_text(
+        json.dumps([{"plan": "plans/ok/plan.json", "input": "missing.json"}])
+    )
+
+    pairs = plan_pairs(str(tmp_path / "manifest.json"), str(tmp_path / "plans"))
+    results = validate_plans(pairs, workers=3)
+
+    assert [(Path(r.plan).parent.name, r.valid) for r in results] == [
+        ("ok", False),
+        ("bad", False),
+        ("ok", True),
+    ]
+    assert "missing.json" in results[0].errors[0]
+    assert "Upgrade path: 13.4 -> 14.1 -> 15.2" in results[1].errors[0]
+    assert [c.check for c in results[1].checks] == [
+        "engine_version",
+        "parameter_groups",
+    ]
+
+    assert main(["--directory", str(tmp_path / "plans")]) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert (report["total"], report["invalid"]) == (2, 1)
+
+
+def test_validate_plans_loads_each_graph_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Concurrent validations of a partition and region share one graph load"""
+    calls = []
+
+    def load(partition: str, region: str) -> UpgradeGraph:
+        calls.append((partition, region))
+        time.sleep(0.05)
+        return UpgradeGraph.from_engine_versions(ENGINE_VERSIONS, region=region)
+
+    monkeypatch.setattr("validate_plan.load_upgrade_graph", load)
+    pairs = []
+    for i in range(4):
+        plan = write_plan(
+            tmp_path / f"plan-{i}.json",
+            {"engine": "postgres", "engine_version": "13.4"},
+            {"engine": "postgres", "engine_version": "13.4"},
+        )
+        (tmp_path / f"input-{i}.json").write_text(
+            json.dumps(input_data(parameters=None))
+        )
+        pairs.append((plan, str(tmp_path / f"input-{i}.json")))
+
+    results = validate_plans(pairs, workers=4)
+
+    assert [r.valid for r in results] == [True] * 4
+    assert calls == [("aws", "us-east-1")]
@@ -0,0 +1,75 @@
+import json
+import socket
+from pathlib import Path
+
+import pytest
+
+from er_aws_rds.cache import SynthCache
+from er_aws_rds.worker import Worker, remove_stale_socket
+
+from .conftest import input_data
+
+
+def test_worker_serves_jobs_until_recycle(tmp_path: Path) -> None:
+    """Worker answers every request and stops once max_jobs is reached"""
+    outdir = tmp_path / "out"
+    lines = [
+        json.dumps({"op": "health"}),
+        json.dumps({"input": {"data": {}}, "outdir": str(tmp_path / "broken")}),
+        json.dumps({"input": input_data(parameters=None), "outdir": str(outdir)}),
+        json.dumps({"op": "stats"}),
+    ]
+    responses: list[str] = []
+
+    Worker(max_jobs=2).serve_lines(lines, responses.append)
+
+    health, broken, job = (json.loads(r) for r in responses)
+    assert health["status"] == "ok"
+    assert not broken["ok"]
+    assert broken["error"].startswith("ValidationError")
+    assert job["ok"]
+    assert job["recycle"]
+    assert not job["cached"]
+    assert set(job["timings"]) == {"parse", "synth", "total"}
+    assert (outdir / "stacks" / "CDKTF" / "cdk.tf.json").exists()
+
+
+def test_worker_uses_synth_settings(tmp_path: Path) -> None:
+    """Jobs go through er_aws_rds.app.synth, with the cache and backend of the worker"""
+    worker = Worker(cache=SynthCache(tmp_path / "cache"), backend="native")
+    lines = [
+        json.dumps({"input": input_data(parameters=None), "outdir": str(tmp_path / n)})
+        for n in ("first", "second")
+    ]
+    responses: list[str] = []
+
+    worker.serve_lines(lines, responses.append)
+
+    first, second = (json.loads(r) for r in responses)
+    assert (first["cached"], second["cached"]) == (False, True)
+    stack = Path("stacks") / "CDKTF" / "cdk.tf.json"
+    assert (tmp_path / "first" / stack).read_text() == (
+        tmp_path / "second" / stack
+    ).read_text()
+
+
+def test_remove_stale_socket(tmp_path: Path) -> None:
+    """Only a socket nobody listens on is removed"""
+    path = tmp_path / "worker.sock"
+    remove_stale_socket(str(path))
+
+    path.write_text("data")
+    with pytest.raises(FileExistsError, match="not a socket"):
+        remove_stale_socket(str(path))
+    assert path.read_text() == "data"
+    path.unlink()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        with pytest.raises(FileExistsError, match="listening"):
+            remove_stale_socket(str(path))
+        assert path.exists()
+
+    remove_stale_socket(str(path))
+    assert not path.exists()
@@ -1,73 +1,275 @@
+import argparse
+import json
 import logging
+import os
 import sys
-from collections.abc import Mapping
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
-from boto3 import Session
-from botocore.config import Config
 from external_resources_io.input import parse_model, read_input_from_file
 from external_resources_io.terraform import (
     Action,
     ResourceChange,
     TerraformJsonPlanParser,
 )
-from mypy_boto3_rds import RDSClient
 
 if TYPE_CHECKING:
-    from mypy_boto3_rds.type_defs import FilterTypeDef
+    from mypy_boto3_rds import RDSClient
+    from mypy_boto3_rds.type_defs import DBParameterGroupTypeDef
 
 
+from er_aws_rds.aws import ClientRegistry, default_registry
 from er_aws_rds.input import AppInterfaceInput
+from er_aws_rds.lookup_cache import LookupCache, lookup_cache_from_env
+from er_aws_rds.metrics import Metrics, default_metrics, timed, write_metrics
+from er_aws_rds.plan import StreamingPlanParser
+from er_aws_rds.shared import db_parameter_group_name
+from er_aws_rds.upgrade_graph import UpgradeGraph
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("botocore")
 logger.setLevel(logging.ERROR)
 
 
+UPGRADE_GRAPH_MAX_AGE = 7 * 24 * 3600
+
+
+def load_upgrade_graph(partition: str, region: str) -> UpgradeGraph | None:
+    """The UpgradeGraph file set in ER_UPGRADE_GRAPH, if it matches partition and region
+
+    Graphs older than ER_UPGRADE_GRAPH_MAX_AGE seconds (7 days by default) are
+    ignored, upgrade targets change with every engine release. A graph
+    without region is used with a warning.
+    """
+    path = os.environ.get("ER_UPGRADE_GRAPH")
+    if not path:
+        return None
+    graph = UpgradeGraph.load(path)
+    if graph.partition != partition:
+        logging.warning(
+            "Ignoring upgrade graph %s of partition %s", path, graph.partition
+        )
+        return None
+    if graph.region is None:
+        logging.warning("Upgrade graph %s has no region, using it for %s", path, region)
+    elif graph.region != region:
+        logging.warning("Ignoring upgrade graph %s of region %s", path, graph.region)
+        return None
+    max_age = float(os.environ.get("ER_UPGRADE_GRAPH_MAX_AGE", UPGRADE_GRAPH_MAX_AGE))
+    age = time.time() - graph.generated_at
+    if age > max_age:
+        logging.warning("Ignoring upgrade graph %s generated %d seconds ago", path, age)
+        return None
+    return graph
+
+
 class AWSApi:
     """AWS Api Class"""
 
-    def __init__(self, config_options: Mapping[str, Any]) -> None:
-        self.session = Session()
-        self.config = Config(**config_options)
+    def __init__(
+        self,
+        config_options: Mapping[str, Any],
+        registry: ClientRegistry | None = None,
+        cache: LookupCache | None = None,
+        partition: str = "aws",
+        graph: UpgradeGraph | None = None,
+    ) -> None:
+        # Only region_name is read, client options belong to the ClientRegistry
+        self.region = config_options["region_name"]
+        self.registry = registry or default_registry()
+        self.cache = cache or lookup_cache_from_env()
+        self.partition = partition
+        self.graph = graph
 
-    def get_rds_client(self) -> RDSClient:
-        """Gets a boto RDS client"""
-        return self.session.client("rds", config=self.config)
+    def get_rds_client(self) -> "RDSClient":
+        """Gets the shared boto RDS client of the region"""
+        return self.registry.rds(self.region)
 
     def get_rds_valid_update_versions(self, engine: str, version: str) -> set[str]:
         """Gets the valid update versions"""
-        data = self.get_rds_client().describe_db_engine_versions(
-            Engine=engine, EngineVersion=version, IncludeAll=True
+        if self.graph and self.graph.knows(engine, version):
+            return self.graph.targets(engine, version)
+
+        def describe() -> list[str]:
+            data = self.get_rds_client().describe_db_engine_versions(
+                Engine=engine, EngineVersion=version, IncludeAll=True
+            )
+            if data["DBEngineVersions"] and len(data["DBEngineVersions"]) == 1:
+                return sorted({
+                    item.get("EngineVersion", "-1")
+                    for item in data["DBEngineVersions"][0].get(
+                        "ValidUpgradeTarget", []
+                    )
+                })
+            return []
+
+        return set(
+            self.cache.get_or_set(
+                "describe_db_engine_versions",
+                (self.partition, self.region, engine, version),
+                describe,
+            )
         )
 
-        if data["DBEngineVersions"] and len(data["DBEngineVersions"]) == 1:
+    def iter_rds_parameter_groups(self) -> Iterator["DBParameterGroupTypeDef"]:
+        """Yields every DB parameter group of the region, page by page"""
+        paginator = self.get_rds_client().get_paginator("describe_db_parameter_groups")
+        for page in paginator.paginate():
+            yield from page["DBParameterGroups"]
+
+    def get_rds_parameter_group_inventory(self) -> dict[str, str]:
+        """Families of the DB parameter groups of the region, by name"""
+        return self.cache.get_or_set(
+            "describe_db_parameter_groups",
+            (self.partition, self.region),
+            lambda: {
+                group["DBParameterGroupName"]: group["DBParameterGroupFamily"]
+                for group in self.iter_rds_parameter_groups()
+            },
+        )
+
+    def get_rds_parameter_group_parameters(self, name: str) -> dict[str, str]:
+        """Values of the parameters set in the DB parameter group name"""
+
+        def describe() -> dict[str, str]:
+            paginator = self.get_rds_client().get_paginator("describe_db_parameters")
             return {
-                item.get("EngineVersion", "-1")
-                for item in data["DBEngineVersions"][0].get("ValidUpgradeTarget", [])
+                parameter["ParameterName"]: parameter["ParameterValue"]
+                for page in paginator.paginate(DBParameterGroupName=name)
+                for parameter in page["Parameters"]
+                if "ParameterValue" in parameter
             }
-        return set[str]()
+
+        return self.cache.get_or_set(
+            "describe_db_parameters", (self.partition, self.region, name), describe
+        )
 
     def get_rds_parameter_groups(self, engine: str) -> set[str]:
         """Gets the existing parameter groups by engine"""
-        filters: list[FilterTypeDef] = [
-            {"Name": "db-parameter-group-family", "Values": [engine]},
-        ]
-        resp = self.get_rds_client().describe_db_parameter_groups(Filters=filters)
-        return {group["DBParameterGroupName"] for group in resp["DBParameterGroups"]}
+        return {
+            name
+            for name, family in self.get_rds_parameter_group_inventory().items()
+            if family == engine
+        }
+
+
+CheckFunction = Callable[["RDSPlanValidator", ResourceChange], list[str]]
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    """A check of the resource changes of some types and actions"""
+
+    name: str
+    function: CheckFunction
+    types: frozenset[str]
+    actions: frozenset[Action]
+    # Other resource types the check reads from the plan
+    context_types: frozenset[str] = frozenset()
+
+    def applies(self, change: ResourceChange) -> bool:
+        """Whether the check runs on change"""
+        return (
+            change.type in self.types
+            and change.change is not None
+            and not self.actions.isdisjoint(change.change.actions)
+        )
+
+
+@dataclass
+class CheckResult:
+    """Outcome of a check on a resource change"""
+
+    check: str
+    address: str | None
+    errors: list[str] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+CHECKS: dict[str, PlanCheck] = {}
+
+
+def plan_check(
+    name: str,
+    types: Iterable[str],
+    actions: Iterable[Action],
+    context_types: Iterable[str] = (),
+) -> Callable[[CheckFunction], CheckFunction]:
+    """Registers a check of the changes of types with any of actions"""
+
+    def register(function: CheckFunction) -> CheckFunction:
+        CHECKS[name] = PlanCheck(
+            name,
+            function,
+            frozenset(types),
+            frozenset(actions),
+            frozenset(context_types),
+        )
+        return function
+
+    return register
+
+
+def checked_types(checks: Iterable[PlanCheck] | None = None) -> set[str]:
+    """The resource types the checks need from the plan"""
+    return {
+        t
+        for check in checks or CHECKS.values()
+        for t in check.types | check.context_types
+    }
+
+
+def engine_family(engine: str, version: str) -> str | None:
+    """DB parameter group family of engine version, None if unknown"""
+    parts = version.split(".")
+    if engine == "postgres" and parts[0].isdigit():
+        # postgres9.6, postgres10 onwards
+        major = parts[0] if int(parts[0]) >= 10 else ".".join(parts[:2])  # noqa: PLR2004
+        return f"postgres{major}"
+    if engine in {"mysql", "mariadb"}:
+        return engine + ".".join(parts[:2])
+    return None
 
 
 class RDSPlanValidator:
-    """The plan validator class"""
+    """The plan validator class
 
-    def __init__(
-        self, plan: TerraformJsonPlanParser, app_interface_input: AppInterfaceInput
+    Every registered check runs on each resource change it applies to, on a
+    thread pool of max_workers (ER_PLAN_CHECK_WORKERS, 8 by default). The
+    checks share the AWSApi clients and lookup cache. Check durations are
+    recorded in metrics (default_metrics() when not given).
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        plan: TerraformJsonPlanParser | StreamingPlanParser,
+        app_interface_input: AppInterfaceInput,
+        checks: Iterable[PlanCheck] | None = None,
+        max_workers: int | None = None,
+        aws_api: AWSApi | None = None,
+        *,
+        metrics: Metrics | None = None,
     ) -> None:
         self.plan = plan
         self.input = app_interface_input
-        self.aws_api = AWSApi(
-            config_options={"region_name": app_interface_input.data.region}
+        partition = app_interface_input.data.aws_partition or "aws"
+        self.aws_api = aws_api or AWSApi(
+            config_options={"region_name": app_interface_input.data.region},
+            partition=partition,
+            graph=load_upgrade_graph(partition, app_interface_input.data.region),
+        )
+        self.checks = list(CHECKS.values() if checks is None else checks)
+        self.max_workers = max_workers or int(
+            os.environ.get("ER_PLAN_CHECK_WORKERS", "8")
         )
+        self.metrics = metrics or default_metrics()
+        self.results: list[CheckResult] = []
         self.errors: list[str] = []
 
     @property
@@ -81,45 +283,328 @@ class RDSPlanValidator:
             and Action.ActionUpdate in c.change.actions
         ]
 
-    def _validate_major_version_upgrade(self) -> None:
-        for u in self.aws_db_instance_updates:
-            if not u.change:
-                continue
-            current_version = u.change.before["engine_version"]
-            desired_version = u.change.after["engine_version"]
-            if current_version != desired_version:
-                valid_update_versions = self.aws_api.get_rds_valid_update_versions(
-                    u.change.before["engine"], current_version
-                )
-                if desired_version not in valid_update_versions:
-                    self.errors.append(
-                        "Engine version cannot be updated. "
-                        f"Current_version: {current_version}, "
-                        f"Desired_version: {desired_version}, "
-                        f"Valid update versions: %{valid_update_versions}"
-                    )
-                if not self.input.data.allow_major_version_upgrade:
-                    self.errors.append(
-                        "To enable major version ugprades, allow_major_version_ugprade attribute must be set to True"
-                    )
+    def upgrade_path_hint(self, engine: str, current: str, desired: str) -> str:
+        """The upgrade path from current to desired, if there is an upgrade graph"""
+        graph = self.aws_api.graph
+        if not graph or not graph.knows(engine, current):
+            return ""
+        path = graph.shortest_path(engine, current, desired)
+        if not path:
+            return f". {desired} is not reachable from {current}"
+        return f". Upgrade path: {' -> '.join(path)}"
+
+    @cached_property
+    def planned_parameter_groups(self) -> dict[str, str]:
+        """Families of the DB parameter groups the plan creates or keeps, by name"""
+        return {
+            c.change.after["name"]: c.change.after["family"]
+            for c in self.plan.plan.resource_changes
+            if c.type == "aws_db_parameter_group"
+            and c.change
+            and c.change.after
+            and c.change.after.get("name")
+        }
+
+    def _run_check(self, check: PlanCheck, change: ResourceChange) -> CheckResult:
+        result = CheckResult(check=check.name, address=change.address)
+        start = time.perf_counter()
+        try:
+            result.errors = check.function(self, change)
+        except Exception as e:  # noqa: BLE001
+            result.errors = [f"Check {check.name} failed on {change.address}: {e}"]
+        duration = time.perf_counter() - start
+        result.duration_ms = duration * 1000
+        if self.metrics:
+            self.metrics.observe(
+                "plan_check_duration_seconds", duration, check=check.name
+            )
+        return result
+
+    def run_checks(self) -> list[CheckResult]:
+        """Runs every check on the changes it applies to, in plan order"""
+        tasks = [
+            (check, change)
+            for change in self.plan.plan.resource_changes
+            for check in self.checks
+            if check.applies(change)
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda task: self._run_check(*task), tasks))
 
     def validate(self) -> bool:
         """Validate method"""
-        self._validate_major_version_upgrade()
+        self.results = self.run_checks()
+        self.errors = [e for result in self.results for e in result.errors]
         return not self.errors
 
 
-if __name__ == "__main__":
-    app_interface_input: AppInterfaceInput = parse_model(
-        AppInterfaceInput,
-        read_input_from_file(),
+@plan_check(
+    "engine_version",
+    types=["aws_db_instance"],
+    actions=[Action.ActionUpdate],
+)
+def validate_engine_version_upgrade(
+    validator: RDSPlanValidator, change: ResourceChange
+) -> list[str]:
+    """Checks the engine version upgrade is valid and allowed"""
+    if not change.change or change.change.before is None or change.change.after is None:
+        return []
+    before, after = change.change.before, change.change.after
+    errors = []
+    current_version = before["engine_version"]
+    desired_version = after["engine_version"]
+    if current_version != desired_version:
+        engine = before["engine"]
+        valid_update_versions = validator.aws_api.get_rds_valid_update_versions(
+            engine, current_version
+        )
+        if desired_version not in valid_update_versions:
+            errors.append(
+                "Engine version cannot be updated. "
+                f"Current_version: {current_version}, "
+                f"Desired_version: {desired_version}, "
+                f"Valid update versions: %{valid_update_versions}"
+                + validator.upgrade_path_hint(engine, current_version, desired_version)
+            )
+        if not validator.input.data.allow_major_version_upgrade:
+            errors.append(
+                "To enable major version ugprades, allow_major_version_ugprade attribute must be set to True"
+            )
+    return errors
+
+
+@plan_check(
+    "parameter_groups",
+    types=["aws_db_instance"],
+    actions=[Action.ActionCreate, Action.ActionUpdate],
+    context_types=["aws_db_parameter_group"],
+)
+def validate_parameter_groups(
+    validator: RDSPlanValidator, change: ResourceChange
+) -> list[str]:
+    """Checks the parameter groups exist and match the engine version family"""
+    if not change.change or not change.change.after:
+        return []
+    before = change.change.before or {}
+    after = change.change.after
+    unknown = change.change.after_unknown or {}
+    # Replicas and snapshot restores inherit the engine, the plan may not know it
+    after_engine = None if unknown.get("engine") else after.get("engine")
+    after_version = (
+        None if unknown.get("engine_version") else after.get("engine_version")
     )
-    logging.info("Running RDS terraform plan validation")
-    plan = TerraformJsonPlanParser(plan_path=sys.argv[1])
-    validator = RDSPlanValidator(plan, app_interface_input)
-    if not validator.validate():
-        logging.error(validator.errors)
-        sys.exit(1)
-    else:
+    references: list[tuple[str, str | None, str | None, str | None]] = []
+    if not unknown.get("parameter_group_name"):
+        references.append((
+            "parameter_group_name",
+            after.get("parameter_group_name"),
+            after_engine,
+            after_version,
+        ))
+    old = validator.input.data.old_parameter_group
+    if old:
+        # The old group only matches the current version during an upgrade,
+        # afterwards it keeps the previous family and only has to exist
+        before_version = before.get("engine_version")
+        upgrading = bool(before_version and after_version) and (
+            before_version != after_version
+        )
+        references.append((
+            "old_parameter_group",
+            db_parameter_group_name(old, validator.input.data.identifier),
+            before.get("engine", after_engine) if upgrading else None,
+            before_version if upgrading else None,
+        ))
+
+    errors = []
+    for reference, name, engine, version in references:
+        if not name:
+            continue
+        family = validator.planned_parameter_groups.get(name)
+        if family is None:
+            family = validator.aws_api.get_rds_parameter_group_inventory().get(name)
+        expected = engine_family(engine, version) if engine and version else None
+        if family is None:
+            errors.append(
+                f"{reference} {name} does not exist in {validator.aws_api.region} "
+                "and is not created by the plan"
+            )
+        elif expected and family != expected:
+            errors.append(
+                f"{reference} {name} has family {family}, "
+                f"{engine} {version} requires {expected}"
+            )
+    return errors
+
+
+@dataclass
+class PlanValidation:
+    """Outcome of the validation of a (plan, input) pair"""
+
+    plan: str
+    input: str
+    valid: bool
+    errors: list[str] = field(default_factory=list)
+    checks: list[CheckResult] = field(default_factory=list)
+    duration_ms: float = 0.0
+
+
+def plan_pairs(
+    manifest: str | None = None, directory: str | None = None
+) -> list[tuple[str, str]]:
+    """(plan, input) paths of a manifest and of a directory
+
+    The manifest is a JSON list of {"plan": ..., "input": ...} objects, relative
+    paths are resolved from the manifest directory. Every subdirectory of
+    directory holding a plan.json and an input.json is a pair.
+    """
+    pairs: list[tuple[str, str]] = []
+    if manifest:
+        base = Path(manifest).parent
+        pairs.extend(
+            (str(base / item["plan"]), str(base / item["input"]))
+            for item in json.loads(Path(manifest).read_text(encoding="utf-8"))
+        )
+    if directory:
+        pairs.extend(
+            (str(d / "plan.json"), str(d / "input.json"))
+            for d in sorted(Path(directory).iterdir())
+            if (d / "plan.json").is_file() and (d / "input.json").is_file()
+        )
+    return pairs
+
+
+def validate_plans(
+    pairs: Iterable[tuple[str, str]], workers: int = 4
+) -> list[PlanValidation]:
+    """Validates every (plan, input) pair on a thread pool of workers
+
+    The validations share the AWS clients, the lookup cache and the upgrade
+    graph of each partition and region.
+    """
+    registry = default_registry()
+    cache = lookup_cache_from_env()
+    metrics = default_metrics()
+    graphs: dict[tuple[str, str], UpgradeGraph | None] = {}
+    graphs_lock = threading.Lock()
+
+    def validate(pair: tuple[str, str]) -> PlanValidation:
+        plan_path, input_path = pair
+        start = time.perf_counter()
+        try:
+            app_interface_input = parse_model(
+                AppInterfaceInput, read_input_from_file(input_path)
+            )
+            partition = app_interface_input.data.aws_partition or "aws"
+            region = app_interface_input.data.region
+            with graphs_lock:
+                if (partition, region) not in graphs:
+                    graphs[partition, region] = load_upgrade_graph(partition, region)
+                graph = graphs[partition, region]
+            with timed(metrics, "plan_parse_seconds"):
+                plan = StreamingPlanParser(plan_path, types=checked_types())
+            validator = RDSPlanValidator(
+                plan,
+                app_interface_input,
+                aws_api=AWSApi(
+                    config_options={"region_name": app_interface_input.data.region},
+                    registry=registry,
+                    cache=cache,
+                    partition=partition,
+                    graph=graph,
+                ),
+            )
+            valid = validator.validate()
+        except Exception as e:  # noqa: BLE001
+            return PlanValidation(
+                plan=plan_path,
+                input=input_path,
+                valid=False,
+                errors=[f"Validation failed: {e}"],
+                duration_ms=(time.perf_counter() - start) * 1000,
+            )
+        return PlanValidation(
+            plan=plan_path,
+            input=input_path,
+            valid=valid,
+            errors=validator.errors,
+            checks=validator.results,
+            duration_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(validate, pairs))
+    if metrics:
+        for result in results:
+            metrics.observe("plan_validation_seconds", result.duration_ms / 1000)
+    return results
+
+
+def report(results: Sequence[PlanValidation]) -> dict[str, Any]:
+    """JSON serializable summary of results"""
+    return {
+        "total": len(results),
+        "invalid": sum(not r.valid for r in results),
+        "results": [asdict(r) for r in results],
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Validates a plan against /inputs/input.json, or many plans with --manifest/--directory"""
+    parser = argparse.ArgumentParser(prog="validate_plan.py")
+    parser.add_argument("plan", nargs="?", help="Plan of /inputs/input.json")
+    parser.add_argument("--manifest", help="JSON list of plan and input paths")
+    parser.add_argument(
+        "--directory", help="Directory of <name>/plan.json and <name>/input.json"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output", help="JSON report path, stdout by default")
+    args = parser.parse_args(argv)
+    try:
+        return _run(parser, args)
+    finally:
+        # ER_METRICS_FILE, written on failures too
+        write_metrics()
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    if args.plan:
+        app_interface_input: AppInterfaceInput = parse_model(
+            AppInterfaceInput,
+            read_input_from_file(),
+        )
+        logging.info("Running RDS terraform plan validation")
+        metrics = default_metrics()
+        with timed(metrics, "plan_validation_seconds"):
+            with timed(metrics, "plan_parse_seconds"):
+                plan = StreamingPlanParser(args.plan, types=checked_types())
+            validator = RDSPlanValidator(plan, app_interface_input)
+            valid = validator.validate()
+        for result in validator.results:
+            logging.info(
+                "Check %s on %s: %.1fms",
+                result.check,
+                result.address,
+                result.duration_ms,
+            )
+        if not valid:
+            logging.error(validator.errors)
+            return 1
         logging.info("Validation ended succesfully")
-        sys.exit(0)
+        return 0
+
+    if not args.manifest and not args.directory:
+        parser.error("a plan, --manifest or --directory is required")
+    results = validate_plans(
+        plan_pairs(args.manifest, args.directory), workers=args.workers
+    )
+    output = json.dumps(report(results), indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)  # noqa: T201
+    return 0 if all(r.valid for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())